@@ -27,6 +27,7 @@ from .core import AstralBeing, SoulTemplate
 from .generators import BeingGenerator, SoulGenerator  
 from .templates import BasicTemplates
 from .examples import QuickStart
+from .load_generator import LoadGenerator
 
 __version__ = "1.0.0"
 __author__ = "LuxDB Astral Council"
@@ -45,7 +46,10 @@ __all__ = [
     'BasicTemplates',
     
     # Przykłady
-    'QuickStart'
+    'QuickStart',
+    
+    # Generator obciążenia
+    'LoadGenerator'
 ]
 
 # Magiczna inicjalizacja astralnej przestrzeni
@@ -7,6 +7,7 @@ Podstawowe klasy dla systemu astralnych bytów.
 """
 
 import asyncio
+import inspect
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from luxdb.models.soul import Soul
@@ -20,7 +21,8 @@ class SoulTemplate:
     
     @staticmethod
     def create(archetype: str, attributes: Dict[str, Any], 
-               abilities: List[str] = None, description: str = None) -> Soul:
+               abilities: List[str] = None, description: str = None,
+               execution_policy: str = None) -> Soul:
         """
         Tworzy szablon duszy na podstawie archetypu.
         
@@ -29,6 +31,7 @@ class SoulTemplate:
             attributes: Atrybuty duszy (power, wisdom, agility, etc.)
             abilities: Lista zdolności
             description: Opis duszy
+            execution_policy: Polityka wykonania funkcji (inline, thread, process)
             
         Returns:
             Soul object gotowy do manifestacji
@@ -77,6 +80,9 @@ class SoulTemplate:
             }
         }
         
+        if execution_policy:
+            genotype["execution_policy"] = execution_policy
+        
         # Dodaj moduł z podstawowymi funkcjami astralnymi
         if abilities:
             genotype["module_source"] = SoulTemplate._generate_astral_module(archetype, abilities)
@@ -251,13 +257,18 @@ class AstralBeing:
         if initial_attributes:
             manifest_attributes.update(initial_attributes)
         
-        # Materializuj Being
-        being = await Being.create(
-            soul=soul_template,
-            alias=f"astral_{name.lower().replace(' ', '_')}",
-            attributes=manifest_attributes,
-            persistent=True
-        )
+        # SoulTemplate.create zwraca korutynę Soul.create
+        if inspect.isawaitable(soul_template):
+            soul_template = await soul_template
+        
+        # Materializuj Being (Soul musi być w bazie przed zapisem Being)
+        from luxdb.repository.soul_repository import SoulRepository
+        await SoulRepository.set(soul_template)
+        being = await Being.create(soul=soul_template, attributes=manifest_attributes)
+        being.alias = f"astral_{name.lower().replace(' ', '_')}"
+        save_result = await being.save()
+        if not save_result.get('success'):
+            raise RuntimeError(f"Failed to manifest '{name}': {save_result.get('error')}")
         
         astral_being = AstralBeing(being)
         astral_being.soul_template = soul_template
@@ -0,0 +1,370 @@
+"""
+Astral Load Generator
+=====================
+
+Generator syntetycznego obciążenia do planowania pojemności LuxDB.
+
+Dusze i byty pochodzą z generatorów astralnych (SoulGenerator.create_random_soul,
+BeingGenerator.create_party), więc obciążenie ma zróżnicowane genotypy i dane.
+Generator wykonuje ważoną mieszankę operacji (create/save/get/execute/
+communicate/relate) przez API biblioteki albo po HTTP na LuxDBServer.
+
+Tryby:
+- closed loop - N wirtualnych użytkowników wykonuje operacje jedna po drugiej,
+- open loop - operacje przychodzą w zadanym tempie (proces Poissona) niezależnie
+  od czasu odpowiedzi; użytkownicy obsługują kolejkę przybyć, a opóźnienie
+  liczone jest od zaplanowanego startu, więc przeciążenie widać w percentylach.
+
+Użycie:
+    python -m astral_beings.load_generator --target library --users 16 --duration 60
+    python -m astral_beings.load_generator --target http --rate 200 --mix get=70,save=20,create=10
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import math
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .generators import BeingGenerator, SoulGenerator
+
+OPERATIONS = ("create", "save", "get", "execute", "communicate", "relate")
+
+DEFAULT_MIX = {"create": 10, "save": 20, "get": 40, "execute": 15, "communicate": 10, "relate": 5}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parsuje mieszankę operacji w formacie 'get=60,save=30,create=10'"""
+    mix = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {name}. Available: {', '.join(OPERATIONS)}")
+        mix[name] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("Operation mix must have a positive total weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentyl metodą najbliższej rangi (wartości posortowane rosnąco)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def _resolve(value):
+    """SoulTemplate.create zwraca korutynę Soul.create - dopełnia ją"""
+    return await value if inspect.isawaitable(value) else value
+
+
+def _check_result(result: Any) -> Any:
+    """Wynik {'success': False, ...} z API biblioteki liczy się jako błąd"""
+    if isinstance(result, dict) and result.get("success") is False:
+        raise RuntimeError(result.get("error") or "operation failed")
+    return result
+
+
+class OperationStats:
+    """Opóźnienia i błędy jednej operacji"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.error_types: Counter = Counter()
+
+    def record(self, latency: float, error: Optional[BaseException] = None) -> None:
+        self.latencies.append(latency)
+        if error is not None:
+            self.errors += 1
+            self.error_types[f"{type(error).__name__}: {str(error)[:80]}"] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput": round(count / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(latencies) / count * 1000, 2) if count else 0.0,
+            **{f"p{pct}_ms": round(percentile(latencies, pct) * 1000, 2) for pct in PERCENTILES},
+            "max_ms": round(latencies[-1] * 1000, 2) if count else 0.0,
+            "top_errors": dict(self.error_types.most_common(3))
+        }
+
+
+class LibraryTarget:
+    """Operacje przez API biblioteki (Soul/Being, menedżery relacji i komunikacji)"""
+
+    name = "library"
+    supported = set(OPERATIONS)
+
+    def __init__(self):
+        self.beings: List[Any] = []
+
+    async def setup(self, seed_beings: int) -> None:
+        party = await BeingGenerator.create_party(seed_beings)
+        self.beings = [astral.being for astral in party]
+
+    async def close(self) -> None:
+        pass
+
+    def _pick(self, count: int = 1) -> List[Any]:
+        if len(self.beings) < count:
+            raise LookupError("Not enough beings - increase --seed")
+        return random.sample(self.beings, count)
+
+    async def create(self) -> None:
+        soul = await _resolve(SoulGenerator.create_random_soul())
+        archetype = soul.genotype.get("genesis", {}).get("archetype", "guardian")
+        name = random.choice(BeingGenerator.NAMES.get(archetype, ["Astral"]))
+        from .core import AstralBeing
+        astral = await AstralBeing.manifest(soul, name)
+        self.beings.append(astral.being)
+
+    async def save(self) -> None:
+        being, = self._pick()
+        being.data["astral_energy"] = random.randint(0, 100)
+        _check_result(await being.save())
+
+    async def get(self) -> None:
+        being, = self._pick()
+        from luxdb.models.being import Being
+        if await Being.get_by_ulid(being.ulid) is None:
+            raise LookupError(f"Being {being.ulid} not found")
+
+    async def execute(self) -> None:
+        being, = self._pick()
+        soul = await being.get_soul()
+        abilities = soul.genotype.get("capabilities", {}).get("abilities") or ["meditate"]
+        _check_result(await being.execute_soul_function("channel_energy", ability=random.choice(abilities)))
+
+    async def communicate(self) -> None:
+        source, target = self._pick(2)
+        _check_result(await source.send_intention_to(target.ulid, "load_test", "ping", {"sent_at": time.time()}))
+
+    async def relate(self) -> None:
+        source, target = self._pick(2)
+        from luxdb.core.relationships_manager import RelationshipsManager
+        _check_result(await RelationshipsManager.create_relationship(
+            source.ulid, target.ulid, relation_type="load_test", strength=round(random.random(), 3)
+        ))
+
+
+class HttpTarget:
+    """
+    Operacje po HTTP na LuxDBServer (LuxDBClient).
+
+    Serwer nie wystawia execute/communicate/relate - tylko create, save
+    (upsert przez /beings:batch) i get (strona listy bytów).
+    """
+
+    name = "http"
+    supported = {"create", "save", "get"}
+
+    def __init__(self, server_url: str, namespace_id: str, auth_token: str = None, max_connections: int = 64):
+        from luxdb.server.client import LuxDBClient
+        self.client = LuxDBClient(server_url, namespace_id, auth_token, max_connections=max_connections)
+        self.beings: List[Dict[str, Any]] = []
+
+    async def setup(self, seed_beings: int) -> None:
+        await self.client.connect()
+        try:
+            await self.client.create_namespace()
+        except Exception:
+            pass  # Przestrzeń nazw już istnieje
+        items = [await self._generated_being() for _ in range(seed_beings)]
+        await self.client.create_souls([item["soul"] for item in items])
+        result = await self.client.create_beings([item["being"] for item in items])
+        self.beings = result["beings"]
+        for entry, item in zip(self.beings, items):
+            entry["data"] = item["being"]["data"]
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def _generated_being(self) -> Dict[str, Any]:
+        soul = await _resolve(SoulGenerator.create_random_soul())
+        data = {
+            name: attribute.get("default")
+            for name, attribute in soul.genotype.get("attributes", {}).items()
+        }
+        return {
+            "soul": {"genotype": soul.genotype, "alias": soul.alias},
+            "being": {"soul_hash": soul.soul_hash, "data": data}
+        }
+
+    async def create(self) -> None:
+        item = await self._generated_being()
+        await self.client.create_souls([item["soul"]], retries=0)
+        result = await self.client.create_beings([item["being"]], retries=0)
+        entry = result["beings"][0]
+        entry["data"] = item["being"]["data"]
+        self.beings.append(entry)
+
+    async def save(self) -> None:
+        if not self.beings:
+            raise LookupError("Not enough beings - increase --seed")
+        entry = random.choice(self.beings)
+        entry["data"]["astral_energy"] = random.randint(0, 100)
+        await self.client.create_beings([entry], retries=0)
+
+    async def get(self) -> None:
+        await self.client.list_page('/beings', limit=20)
+
+
+class LoadGenerator:
+    """Wykonuje mieszankę operacji na celu i zbiera statystyki per operacja"""
+
+    def __init__(self, target, mix: Dict[str, float] = None, users: int = 8,
+                 duration: float = 30.0, rate: float = None, think_time: float = 0.0):
+        mix = mix or {op: weight for op, weight in DEFAULT_MIX.items() if op in target.supported}
+        unsupported = set(mix) - target.supported
+        if unsupported:
+            raise ValueError(f"Target '{target.name}' does not support: {', '.join(sorted(unsupported))}")
+
+        self.target = target
+        self.mix = mix
+        self.users = max(1, users)
+        self.duration = duration
+        self.rate = rate
+        self.think_time = think_time
+        self.stats: Dict[str, OperationStats] = {op: OperationStats() for op in mix}
+        self.missed = 0
+
+    def _choose(self) -> str:
+        return random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+
+    async def _perform(self, operation: str, scheduled: float) -> None:
+        error = None
+        try:
+            await getattr(self.target, operation)()
+        except Exception as e:
+            error = e
+        self.stats[operation].record(time.perf_counter() - scheduled, error)
+
+    async def _closed_loop_user(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            await self._perform(self._choose(), time.perf_counter())
+            if self.think_time:
+                await asyncio.sleep(random.expovariate(1 / self.think_time))
+
+    async def _arrivals(self, queue: asyncio.Queue, deadline: float) -> None:
+        """Przybycia Poissona w tempie `rate`; harmonogram nie czeka na odpowiedzi"""
+        next_arrival = time.perf_counter()
+        while next_arrival < deadline:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            queue.put_nowait((self._choose(), next_arrival))
+            next_arrival += random.expovariate(self.rate)
+
+    async def _open_loop_user(self, queue: asyncio.Queue, deadline: float) -> None:
+        while True:
+            operation, scheduled = await queue.get()
+            try:
+                if time.perf_counter() >= deadline:
+                    self.missed += 1  # Przybycie nieobsłużone przed końcem testu
+                else:
+                    await self._perform(operation, scheduled)
+            finally:
+                queue.task_done()
+
+    async def run(self, seed_beings: int = 8) -> Dict[str, Any]:
+        """Przygotowuje dane startowe, generuje obciążenie i zwraca raport"""
+        await self.target.setup(seed_beings)
+        try:
+            started = time.perf_counter()
+            deadline = started + self.duration
+            if self.rate:
+                queue: asyncio.Queue = asyncio.Queue()
+                users = [asyncio.create_task(self._open_loop_user(queue, deadline)) for _ in range(self.users)]
+                await self._arrivals(queue, deadline)
+                await queue.join()
+                for user in users:
+                    user.cancel()
+                await asyncio.gather(*users, return_exceptions=True)
+            else:
+                await asyncio.gather(*(self._closed_loop_user(deadline) for _ in range(self.users)))
+            elapsed = time.perf_counter() - started
+        finally:
+            await self.target.close()
+
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        operations = {op: stats.summary(elapsed) for op, stats in self.stats.items()}
+        total = sum(op["count"] for op in operations.values())
+        errors = sum(op["errors"] for op in operations.values())
+        return {
+            "target": self.target.name,
+            "mode": "open" if self.rate else "closed",
+            "users": self.users,
+            "rate": self.rate,
+            "duration": round(elapsed, 2),
+            "total": total,
+            "errors": errors,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "throughput": round(total / elapsed, 2) if elapsed else 0.0,
+            "missed_arrivals": self.missed,
+            "operations": operations
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Tabela percentyli i błędów per operacja"""
+    mode = f"open loop @ {report['rate']}/s" if report["mode"] == "open" else "closed loop"
+    print(f"📊 Load test: {report['target']}, {mode}, {report['users']} users, {report['duration']}s")
+    header = f"{'operation':<12}{'count':>8}{'err%':>8}{'ops/s':>9}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f"{'max':>9}"
+    print(header)
+    for name, op in report["operations"].items():
+        print(f"{name:<12}{op['count']:>8}{op['error_rate'] * 100:>7.1f}%{op['throughput']:>9.1f}"
+              + "".join(f"{op[f'p{p}_ms']:>9.1f}" for p in PERCENTILES) + f"{op['max_ms']:>9.1f}")
+        for error, count in op["top_errors"].items():
+            print(f"    ❌ {count}x {error}")
+    print(f"✅ {report['total']} operations, {report['throughput']} ops/s, error rate {report['error_rate'] * 100:.2f}%"
+          + (f", {report['missed_arrivals']} arrivals missed" if report["missed_arrivals"] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Astral Beings load generator for LuxDB")
+    parser.add_argument("--target", choices=["library", "http"], default="library", help="Library API or LuxDBServer")
+    parser.add_argument("--mix", help=f"Operation weights, e.g. get=60,save=30,create=10 (operations: {', '.join(OPERATIONS)})")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent virtual users")
+    parser.add_argument("--rate", type=float, help="Open-loop arrival rate (ops/s); closed loop when omitted")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between closed-loop operations (s)")
+    parser.add_argument("--seed", type=int, default=8, help="Beings created (create_party) before the test")
+    parser.add_argument("--server-url", default="http://localhost:5000", help="Server URL (http target)")
+    parser.add_argument("--namespace", default="loadtest", help="Namespace (http target)")
+    parser.add_argument("--token", help="Authentication token (http target)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.target == "http":
+        target = HttpTarget(args.server_url, args.namespace, args.token, max_connections=max(args.users, 8))
+    else:
+        target = LibraryTarget()
+
+    generator = LoadGenerator(target, parse_mix(args.mix) if args.mix else None, users=args.users,
+                              duration=args.duration, rate=args.rate, think_time=args.think_time)
+    report = asyncio.run(generator.run(seed_beings=args.seed))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,12 @@ import time
 import ulid
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
-import openai
 import os
 # Embedding będzie obsłużony przez OpenAI bezpośrednio
 from luxdb.models.soul import Soul
 from luxdb.models.being import Being
 from luxdb.repository.soul_repository import BeingRepository
+from luxdb.core.llm_gateway import OpenAIBackend, llm_gateway
 
 class LuxAssistant:
     """Revolutionary AI Assistant that manages beings, tools and knowledge"""
@@ -228,13 +228,14 @@ class LuxAssistant:
         """
 
         try:
-            response = await openai.ChatCompletion.acreate(
+            response = await llm_gateway.chat(
+                [{"role": "user", "content": prompt}],
                 model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=200
+                max_tokens=200,
+                backend=self._llm_backend()
             )
 
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(response.content)
             return result
 
         except Exception as e:
@@ -268,13 +269,14 @@ class LuxAssistant:
             Provide recommendation and code if needed.
             """
 
-            response = await openai.ChatCompletion.acreate(
+            response = await llm_gateway.chat(
+                [{"role": "user", "content": suggestion_prompt}],
                 model="gpt-4",
-                messages=[{"role": "user", "content": suggestion_prompt}],
-                max_tokens=800
+                max_tokens=800,
+                backend=self._llm_backend()
             )
 
-            return f"🔍 Found similar tools!\n\n{response.choices[0].message.content}"
+            return f"🔍 Found similar tools!\n\n{response.content}"
 
         else:
             # Create new tool/being
@@ -317,14 +319,15 @@ class LuxAssistant:
         Make it functional and specific to the user's needs.
         """
 
-        response = await openai.ChatCompletion.acreate(
+        response = await llm_gateway.chat(
+            [{"role": "user", "content": genotype_prompt}],
             model="gpt-4",
-            messages=[{"role": "user", "content": genotype_prompt}],
-            max_tokens=600
+            max_tokens=600,
+            backend=self._llm_backend()
         )
 
         try:
-            genotype = json.loads(response.choices[0].message.content)
+            genotype = json.loads(response.content)
 
             # Create embeddings for the tool
             description = genotype.get("genesis", {}).get("description", analysis["description"])
@@ -438,13 +441,20 @@ class LuxAssistant:
         Respond as Lux - helpful, intelligent, and focused on creating/finding tools and managing knowledge.
         """
 
-        response = await openai.ChatCompletion.acreate(
+        response = await llm_gateway.chat(
+            [{"role": "user", "content": prompt}],
             model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=400
+            max_tokens=400,
+            backend=self._llm_backend()
         )
 
-        return response.choices[0].message.content
+        return response.content
+
+    def _llm_backend(self) -> OpenAIBackend:
+        """Backend bramy LLM oparty na kliencie tego asystenta"""
+        if getattr(self, "_gateway_backend", None) is None or self._gateway_backend.client is not self.client:
+            self._gateway_backend = OpenAIBackend(client=self.client, api_key=self.openai_api_key)
+        return self._gateway_backend
 
     async def _chat_with_openai(self, message: str, conversation_history: List[Dict] = None) -> str:
         """Handles chat with OpenAI API"""
@@ -461,11 +471,12 @@ class LuxAssistant:
         messages.append({"role": "user", "content": message})
 
         try:
-            completion = await self.client.chat.completions.create(
+            completion = await llm_gateway.chat(
+                messages,
                 model="gpt-4",  # Or any other suitable model
-                messages=messages
+                backend=self._llm_backend()
             )
-            return completion.choices[0].message.content
+            return completion.content
         except Exception as e:
             print(f"❌ Error calling OpenAI API: {e}")
             raise e
@@ -11,6 +11,7 @@ from typing import Optional
 
 from .server.server import LuxDBServer
 from .server.client import LuxDBClient
+from .cli_bulk_transfer import BulkTransfer, TRANSFER_FORMATS, TRANSFER_TABLES, open_database, print_summary
 
 
 async def start_server_command(args):
@@ -31,6 +32,35 @@ async def start_server_command(args):
     await server.start()
 
 
+def _print_progress(table: str, transferred: int, done: bool):
+    """Print per-table transfer progress (at most once per MiB)"""
+    if done or transferred // (1 << 20) != _progress_marks.get(table):
+        _progress_marks[table] = transferred // (1 << 20)
+        status = "done" if done else "..."
+        print(f"  📦 {table}: {transferred / (1 << 20):.1f} MiB {status}")
+
+
+_progress_marks = {}
+
+
+def _print_memory(snapshot):
+    """Table of registered containers, largest first"""
+    mib = 1 << 20
+    process = snapshot.get("process", {})
+    if process.get("rss_bytes") is not None:
+        print(f"🧠 RSS {process['rss_bytes'] / mib:.1f} MiB, peak {(process.get('peak_rss_bytes') or 0) / mib:.1f} MiB, "
+              f"tracked ~{snapshot['tracked_bytes'] / mib:.1f} MiB")
+    print(f"{'container':<40} {'entries':>10} {'~MiB':>10} {'Δ entries':>10} {'Δ MiB':>10}")
+    for entry in snapshot.get("containers", []):
+        delta_entries = entry.get("delta_entries")
+        delta_bytes = entry.get("delta_bytes")
+        print(f"{entry['name']:<40} {entry['entries']:>10} {entry['approx_bytes'] / mib:>10.2f} "
+              f"{'' if delta_entries is None else f'{delta_entries:+d}':>10} "
+              f"{'' if delta_bytes is None else f'{delta_bytes / mib:+.2f}':>10}")
+    for name, error in snapshot.get("errors", {}).items():
+        print(f"❌ {name}: {error}")
+
+
 async def client_command(args):
     """Client operations"""
     client = LuxDBClient(
@@ -56,16 +86,16 @@ async def client_command(args):
             print(json.dumps(result, indent=2))
         
         elif args.client_action == "export-schema":
-            schema = await client.export_schema()
             filename = args.output or f"{args.namespace}_schema.json"
-            await client.save_schema_to_file(filename)
+            await client.save_schema_to_file(filename, format=args.format, jobs=args.jobs,
+                                             progress=_print_progress)
             print(f"✅ Schema exported to {filename}")
         
         elif args.client_action == "import-schema":
             if not args.input:
                 print("❌ Input file required for import-schema")
                 return
-            result = await client.load_schema_from_file(args.input)
+            result = await client.load_schema_from_file(args.input, jobs=args.jobs, progress=_print_progress)
             print(f"✅ Schema imported from {args.input}")
             print(json.dumps(result, indent=2))
         
@@ -80,6 +110,41 @@ async def client_command(args):
             print(f"Beings in namespace '{args.namespace}':")
             for being in beings:
                 print(f"  - {being.get('alias', 'unnamed')}: {being.get('ulid', '')}")
+        
+        elif args.client_action == "memory":
+            _print_memory(await client.get_memory_stats())
+
+
+async def transfer_command(args):
+    """Parallel bulk export/import straight against the database"""
+    db, connection_manager = open_database(
+        args.db_host, args.db_port, args.db_user, args.db_password, args.db_name,
+        namespace_id=args.namespace, max_connections=args.jobs + 1
+    )
+    try:
+        if args.command == "export":
+            transfer = BulkTransfer(db, args.output, fmt=args.format, jobs=args.jobs,
+                                    batch_size=args.batch_size, namespace_id=args.namespace)
+            summary = await transfer.export(args.tables.split(",") if args.tables else None, fresh=args.fresh)
+        else:
+            transfer = BulkTransfer(db, args.input, jobs=args.jobs,
+                                    batch_size=args.batch_size, namespace_id=args.namespace)
+            summary = await transfer.import_dump(fresh=args.fresh)
+        print_summary(summary)
+    finally:
+        await connection_manager.close()
+
+
+def _add_transfer_arguments(parser):
+    parser.add_argument("--db-host", default="localhost", help="Database host")
+    parser.add_argument("--db-port", type=int, default=5432, help="Database port")
+    parser.add_argument("--db-user", help="Database user")
+    parser.add_argument("--db-password", help="Database password")
+    parser.add_argument("--db-name", default="luxdb", help="Database name")
+    parser.add_argument("--namespace", help="Namespace schema (default: public tables)")
+    parser.add_argument("--jobs", type=int, default=4, help="Parallel workers (key ranges per table)")
+    parser.add_argument("--batch-size", type=int, help="Rows per batch and checkpoint")
+    parser.add_argument("--fresh", action="store_true", help="Ignore the checkpoint of an interrupted run")
 
 
 def main():
@@ -105,11 +170,26 @@ def main():
     client_parser.add_argument("--token", help="Authentication token")
     client_parser.add_argument("client_action", choices=[
         "info", "namespaces", "create-namespace", "export-schema", 
-        "import-schema", "souls", "beings"
+        "import-schema", "souls", "beings", "memory"
     ], help="Client action to perform")
     client_parser.add_argument("--output", help="Output file for export operations")
     client_parser.add_argument("--input", help="Input file for import operations")
+    client_parser.add_argument("--format", choices=["ndjson", "copy"], default="ndjson",
+                               help="Table format for directory exports (gzip NDJSON or binary COPY)")
+    client_parser.add_argument("--jobs", type=int, default=4, help="Tables transferred in parallel")
     
+    # Bulk export/import commands
+    export_parser = subparsers.add_parser("export", help="Parallel export of souls, beings and relationships")
+    export_parser.add_argument("output", help="Dump directory")
+    export_parser.add_argument("--format", choices=TRANSFER_FORMATS, default="ndjson",
+                               help="Part file format (gzip NDJSON or Parquet, which needs pyarrow)")
+    export_parser.add_argument("--tables", help=f"Comma-separated tables (default: {','.join(TRANSFER_TABLES)})")
+    _add_transfer_arguments(export_parser)
+
+    import_parser = subparsers.add_parser("import", help="Parallel import of a dump directory")
+    import_parser.add_argument("input", help="Dump directory")
+    _add_transfer_arguments(import_parser)
+
     args = parser.parse_args()
     
     if not args.command:
@@ -121,8 +201,12 @@ def main():
             asyncio.run(start_server_command(args))
         elif args.command == "client":
             asyncio.run(client_command(args))
+        elif args.command in ("export", "import"):
+            asyncio.run(transfer_command(args))
     except KeyboardInterrupt:
         print("\n🔄 Operation cancelled")
+        if args.command in ("export", "import"):
+            print("   Run the same command again to resume from the checkpoint")
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
@@ -0,0 +1,555 @@
+"""
+Bulk Transfer - parallel export/import of souls, beings and relationships
+
+`luxdb export` / `luxdb import` talk to PostgreSQL directly, without a
+server. Every table is split into `--jobs` key ranges - beings by ULID
+timestamp, souls and relationships by their (uniformly spread) hash and
+UUID keyspace - and every range becomes one part file written by its own
+worker through a server-side cursor: gzip NDJSON by default, Parquet when
+pyarrow is installed. Export workers share one exported snapshot, so the
+parts form a consistent dump.
+
+Progress is checkpointed after every batch. An interrupted export cuts
+each part back to its last checkpoint and continues after the last
+written key; an interrupted import skips the rows already merged. Imports
+load parts in parallel, stage by stage in foreign key order, and merge
+every batch with an upsert, so replaying a batch is harmless.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from itertools import groupby
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .core.connection import ConnectionManager
+from .core.luxdb import LuxDB
+from .server.schema_exporter import (
+    SchemaExporter, _decode_value, _encode_value, read_manifest, write_manifest
+)
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+
+TRANSFER_FORMATS = ("ndjson", "parquet")
+TRANSFER_BATCH_SIZE = int(os.getenv("LUXDB_TRANSFER_BATCH_SIZE", "5000"))
+EXPORT_CHECKPOINT = "export.checkpoint.json"
+IMPORT_CHECKPOINT = "import.checkpoint.json"
+MB = 1 << 20
+
+# Range key of every transferable table and how its keyspace is split
+TRANSFER_TABLES = {
+    "souls": {"key": "soul_hash", "keyspace": "hex"},
+    "beings": {"key": "ulid", "keyspace": "ulid"},
+    "relationships": {"key": "id", "keyspace": "uuid"},
+}
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+
+# --- key ranges ---
+
+def ulid_timestamp(value: str) -> int:
+    """Milliseconds encoded in the first 10 characters of a ULID"""
+    ms = 0
+    for char in value[:10].upper():
+        ms = ms * 32 + _CROCKFORD.index(char)
+    return ms
+
+
+def ulid_floor(ms: int) -> str:
+    """Smallest ULID of the given millisecond"""
+    chars = []
+    for _ in range(10):
+        ms, digit = divmod(ms, 32)
+        chars.append(_CROCKFORD[digit])
+    return "".join(reversed(chars)) + "0" * 16
+
+
+def split_keyspace(keyspace: str, parts: int, low: str = None,
+                   high: str = None) -> List[Tuple[Optional[str], Optional[str]]]:
+    """[lo, hi) bounds of up to `parts` ranges covering the whole keyspace (open ends)"""
+    if parts <= 1:
+        return [(None, None)]
+
+    if keyspace == "ulid":
+        try:
+            start, stop = ulid_timestamp(low), ulid_timestamp(high) + 1
+        except (TypeError, ValueError):
+            return [(None, None)]
+        cuts = sorted({ulid_floor(start + (stop - start) * i // parts) for i in range(1, parts)} - {ulid_floor(start)})
+    else:
+        width = 16 ** 4
+        cuts = [f"{width * i // parts:04x}" for i in range(1, parts)]
+        if keyspace == "uuid":
+            cuts = [f"{cut}0000-0000-0000-0000-000000000000" for cut in cuts]
+
+    bounds = [None] + cuts + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def range_query(info: Dict[str, Any], part: Dict[str, Any], after: Optional[str]) -> Tuple[str, list]:
+    """SELECT of one key range, continuing after the last exported key"""
+    spec = TRANSFER_TABLES[info["name"]]
+    key = f'"{spec["key"]}"'
+    cast = "::uuid" if spec["keyspace"] == "uuid" else ""
+    conditions, params = [], []
+    for operator, value in ((">=", part.get("lo")), ("<", part.get("hi")), (">", after)):
+        if value is not None:
+            params.append(value)
+            conditions.append(f"{key} {operator} ${len(params)}{cast}")
+
+    column_list = ", ".join(f'"{column["name"]}"' for column in info["columns"])
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"SELECT {column_list} FROM {info['name']} {where} ORDER BY {key}", params
+
+
+# --- part files ---
+
+def _arrow_type(data_type: str):
+    if data_type in ("integer", "bigint", "smallint"):
+        return pyarrow.int64()
+    if data_type in ("double precision", "real"):
+        return pyarrow.float64()
+    if data_type == "boolean":
+        return pyarrow.bool_()
+    if data_type.startswith("timestamp"):
+        return pyarrow.timestamp("us")
+    if data_type == "date":
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+class NdjsonPartWriter:
+    """Appends every batch as a complete gzip member, so a part can be cut at any checkpoint"""
+
+    def __init__(self, filename: str, columns: List[Dict[str, str]], offset: int = 0):
+        self.columns = [(column["name"], column["type"]) for column in columns]
+        self.file = open(filename, "r+b" if os.path.exists(filename) else "wb")
+        self.file.truncate(offset)
+        self.file.seek(offset)
+
+    @property
+    def position(self) -> int:
+        return self.file.tell()
+
+    def write(self, rows: List[Any]) -> int:
+        payload = "".join(
+            json.dumps({name: _encode_value(row[name], data_type) for name, data_type in self.columns},
+                       ensure_ascii=False, default=str) + "\n"
+            for row in rows
+        ).encode("utf-8")
+        data = gzip.compress(payload, compresslevel=6)
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())  # the checkpoint must never point past durable data
+        return len(data)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetPartWriter:
+    """Columnar part file (one row group per batch); an interrupted part is rewritten"""
+
+    def __init__(self, filename: str, columns: List[Dict[str, str]], offset: int = 0):
+        if pyarrow is None:
+            raise RuntimeError("Parquet format requires pyarrow (pip install luxdb[parquet])")
+        self.schema = pyarrow.schema([(column["name"], _arrow_type(column["type"])) for column in columns])
+        self.writer = pq.ParquetWriter(filename, self.schema, compression="zstd")
+        self.position = 0
+
+    @staticmethod
+    def _value(value: Any, arrow_type) -> Any:
+        if value is None or arrow_type != pyarrow.string() or isinstance(value, str):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value).hex()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        return str(value)
+
+    def write(self, rows: List[Any]) -> int:
+        arrays = [
+            pyarrow.array([self._value(row[field.name], field.type) for row in rows], type=field.type)
+            for field in self.schema
+        ]
+        table = pyarrow.Table.from_arrays(arrays, schema=self.schema)
+        self.writer.write_table(table)
+        self.position += table.nbytes
+        return table.nbytes
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+PART_WRITERS = {"ndjson": NdjsonPartWriter, "parquet": ParquetPartWriter}
+
+
+def read_ndjson_part(filename: str, columns: List[Dict[str, str]],
+                     batch_size: int) -> Iterator[Tuple[List[tuple], int]]:
+    """Batches of COPY records and the number of file bytes they took"""
+    types = [(column["name"], column["type"]) for column in columns]
+    with open(filename, "rb") as raw, gzip.GzipFile(fileobj=raw) as f:
+        records: List[tuple] = []
+        position = 0
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            records.append(tuple(_decode_value(record.get(name), data_type) for name, data_type in types))
+            if len(records) >= batch_size:
+                yield records, raw.tell() - position
+                position = raw.tell()
+                records = []
+        if records:
+            yield records, raw.tell() - position
+
+
+def read_parquet_part(filename: str, columns: List[Dict[str, str]],
+                      batch_size: int) -> Iterator[Tuple[List[tuple], int]]:
+    if pyarrow is None:
+        raise RuntimeError("Parquet format requires pyarrow (pip install luxdb[parquet])")
+    types = [(column["name"], column["type"]) for column in columns]
+    parquet = pq.ParquetFile(filename)
+    file_size = os.path.getsize(filename)
+    total_rows = max(parquet.metadata.num_rows, 1)
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=[name for name, _ in types]):
+        records = [
+            tuple(_decode_value(row.get(name), data_type) for name, data_type in types)
+            for row in batch.to_pylist()
+        ]
+        yield records, file_size * len(records) // total_rows
+
+
+PART_READERS = {"ndjson": read_ndjson_part, "parquet": read_parquet_part}
+
+
+# --- progress and checkpoints ---
+
+class TransferProgress:
+    """Live progress line and the throughput summary"""
+
+    def __init__(self, action: str, expected_rows: int = 0, interval: float = 0.5, stream=None):
+        self.action = action
+        self.expected_rows = expected_rows
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.tables: Dict[str, Dict[str, int]] = {}
+        self.started = time.monotonic()
+        self._last_render = 0.0
+        self._line_length = 0
+
+    def advance(self, table: str, rows: int, nbytes: int) -> None:
+        counters = self.tables.setdefault(table, {"rows": 0, "bytes": 0})
+        counters["rows"] += rows
+        counters["bytes"] += nbytes
+        now = time.monotonic()
+        if now - self._last_render >= self.interval:
+            self._last_render = now
+            self.render()
+
+    def totals(self) -> Tuple[int, int]:
+        return (sum(counters["rows"] for counters in self.tables.values()),
+                sum(counters["bytes"] for counters in self.tables.values()))
+
+    def render(self) -> None:
+        rows, nbytes = self.totals()
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        percent = f" ({min(rows / self.expected_rows, 1.0):.0%})" if self.expected_rows else ""
+        line = (f"⏳ {self.action}: {rows:,} rows{percent}, {nbytes / MB:.1f} MB | "
+                f"{rows / elapsed:,.0f} rows/s, {nbytes / MB / elapsed:.2f} MB/s")
+        self.stream.write("\r" + line.ljust(self._line_length))
+        self.stream.flush()
+        self._line_length = len(line)
+
+    def summary(self) -> Dict[str, Any]:
+        self.render()
+        self.stream.write("\n")
+        rows, nbytes = self.totals()
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return {
+            "tables": {table: dict(counters) for table, counters in self.tables.items()},
+            "rows": rows,
+            "bytes": nbytes,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_sec": round(rows / elapsed, 1),
+            "mb_per_sec": round(nbytes / MB / elapsed, 3)
+        }
+
+
+class TransferCheckpoint:
+    """Checkpoint file of a dump directory, replaced atomically on every save"""
+
+    def __init__(self, path: str, filename: str, identity: Dict[str, Any]):
+        self.filename = os.path.join(path, filename)
+        self.identity = identity
+        self.state: Dict[str, Any] = {"identity": identity, "parts": {}}
+
+    def load(self) -> bool:
+        """Resume state of the same transfer, if one was interrupted"""
+        if not os.path.exists(self.filename):
+            return False
+        with open(self.filename, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("identity") != self.identity:
+            return False
+        self.state = state
+        return True
+
+    def part(self, name: str) -> Dict[str, Any]:
+        return self.state["parts"].setdefault(name, {"rows": 0, "bytes": 0, "after": None, "done": False})
+
+    def save(self) -> None:
+        temporary = f"{self.filename}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, default=str)
+        os.replace(temporary, self.filename)
+
+    def clear(self) -> None:
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+
+# --- transfer ---
+
+class BulkTransfer:
+    """Parallel, resumable table transfer between a database (or namespace) and a dump directory"""
+
+    def __init__(self, db: LuxDB, path: str, fmt: str = "ndjson", jobs: int = 4,
+                 batch_size: int = None, namespace_id: str = None):
+        if fmt not in TRANSFER_FORMATS:
+            raise ValueError(f"Unsupported transfer format: {fmt}")
+        self.db = db
+        self.path = path
+        self.fmt = fmt
+        self.jobs = max(1, jobs)
+        self.batch_size = batch_size or TRANSFER_BATCH_SIZE
+        self.namespace_id = namespace_id
+        self.exporter = SchemaExporter()
+
+    # --- export ---
+
+    async def export(self, tables: List[str] = None, fresh: bool = False) -> Dict[str, Any]:
+        """Dump the tables into part files; resumes an interrupted export unless `fresh`"""
+        os.makedirs(self.path, exist_ok=True)
+        checkpoint = TransferCheckpoint(self.path, EXPORT_CHECKPOINT, {"format": self.fmt, "tables": tables})
+        resumed = not fresh and checkpoint.load()
+        if resumed:
+            manifest = checkpoint.state["manifest"]
+            print(f"🔄 Resuming export into {self.path}")
+        else:
+            manifest = await self._plan(tables)
+            checkpoint.state["manifest"] = manifest
+            checkpoint.save()
+
+        if self.fmt == "parquet":
+            # Parquet parts cannot be appended to - unfinished ones start over
+            for info in manifest["tables"]:
+                for part in info["parts"]:
+                    state = checkpoint.part(part["name"])
+                    if not state["done"]:
+                        state.update(rows=0, bytes=0, after=None)
+
+        remaining = sum(
+            max(info["estimated_rows"] - sum(checkpoint.part(part["name"])["rows"] for part in info["parts"]), 0)
+            for info in manifest["tables"]
+        )
+        progress = TransferProgress("export", remaining)
+        pool = await self.db.connection_manager.get_pool()
+        semaphore = asyncio.Semaphore(self.jobs)
+
+        async with pool.acquire() as coordinator:
+            async with coordinator.transaction(isolation='repeatable_read', readonly=True):
+                snapshot = await self._export_snapshot(coordinator)
+
+                async def run(info: Dict[str, Any], part: Dict[str, Any]) -> None:
+                    async with semaphore:
+                        await self._export_part(pool, info, part, checkpoint, snapshot, progress)
+
+                await asyncio.gather(*(run(info, part) for info in manifest["tables"] for part in info["parts"]))
+
+        for info in manifest["tables"]:
+            for part in info["parts"]:
+                part["rows"] = checkpoint.part(part["name"])["rows"]
+            info["rows"] = sum(part["rows"] for part in info["parts"])
+        write_manifest(self.path, manifest)
+        checkpoint.clear()
+        return {"action": "export", "path": self.path, "format": self.fmt, "resumed": resumed, **progress.summary()}
+
+    async def _plan(self, tables: List[str] = None) -> Dict[str, Any]:
+        """Manifest with the key ranges (parts) of every table"""
+        tables = tables or list(TRANSFER_TABLES)
+        unknown = set(tables) - set(TRANSFER_TABLES)
+        if unknown:
+            raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+        manifest = await self.exporter.describe_namespace(self.namespace_id, self.db)
+        manifest["tables"] = [info for info in manifest["tables"] if info["name"] in tables]
+        manifest["export_info"].update(format=self.fmt, layout="parts", batch_size=self.batch_size)
+
+        pool = await self.db.connection_manager.get_pool()
+        async with pool.acquire() as conn:
+            for info in manifest["tables"]:
+                spec = TRANSFER_TABLES[info["name"]]
+                parts = self.jobs if info["estimated_rows"] > self.batch_size else 1
+                low = high = None
+                if spec["keyspace"] == "ulid" and parts > 1:
+                    bounds = await conn.fetchrow(f'SELECT MIN("{spec["key"]}") AS low, MAX("{spec["key"]}") AS high FROM {info["name"]}')
+                    low, high = bounds["low"], bounds["high"]
+
+                extension = "ndjson.gz" if self.fmt == "ndjson" else "parquet"
+                info["parts"] = [
+                    {"name": f"{info['name']}.{index:03d}", "file": f"{info['name']}.{index:03d}.{extension}", "lo": lo, "hi": hi}
+                    for index, (lo, hi) in enumerate(split_keyspace(spec["keyspace"], parts, low, high))
+                ]
+        return manifest
+
+    async def _export_snapshot(self, conn) -> Optional[str]:
+        """Snapshot shared by all export workers (not available through transaction poolers)"""
+        try:
+            async with conn.transaction():
+                return await conn.fetchval("SELECT pg_export_snapshot()")
+        except Exception as e:
+            print(f"⚠️ Snapshot export unavailable, parts use their own snapshots: {e}")
+            return None
+
+    async def _export_part(self, pool, info: Dict[str, Any], part: Dict[str, Any],
+                           checkpoint: TransferCheckpoint, snapshot: Optional[str],
+                           progress: TransferProgress) -> None:
+        state = checkpoint.part(part["name"])
+        if state["done"]:
+            return
+
+        key = TRANSFER_TABLES[info["name"]]["key"]
+        query, params = range_query(info, part, state["after"])
+        writer = PART_WRITERS[self.fmt](os.path.join(self.path, part["file"]), info["columns"], state["bytes"])
+
+        def flush(rows: List[Any]) -> None:
+            nbytes = writer.write(rows)
+            state.update(rows=state["rows"] + len(rows), bytes=writer.position, after=str(rows[-1][key]))
+            checkpoint.save()
+            progress.advance(info["name"], len(rows), nbytes)
+
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction(isolation='repeatable_read', readonly=True):
+                    if snapshot:
+                        await conn.execute(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+                    rows: List[Any] = []
+                    async for row in conn.cursor(query, *params, prefetch=self.batch_size):
+                        rows.append(row)
+                        if len(rows) >= self.batch_size:
+                            flush(rows)
+                            rows = []
+                    if rows:
+                        flush(rows)
+        finally:
+            writer.close()
+
+        state["done"] = True
+        checkpoint.save()
+
+    # --- import ---
+
+    async def import_dump(self, fresh: bool = False) -> Dict[str, Any]:
+        """Load a dump directory stage by stage; resumes an interrupted import unless `fresh`"""
+        manifest = read_manifest(self.path)
+        fmt = manifest["export_info"].get("format", "ndjson")
+        if fmt not in TRANSFER_FORMATS:
+            raise ValueError(f"Dumps in '{fmt}' format are imported with `luxdb client import-schema`")
+
+        for info in manifest["tables"]:
+            # Single-file dumps of `luxdb client export-schema` are one part per table
+            info.setdefault("parts", [{"name": f"{info['name']}.000", "file": info["file"]}])
+
+        identity = {"exported_at": manifest["export_info"].get("exported_at"), "namespace_id": self.namespace_id}
+        checkpoint = TransferCheckpoint(self.path, IMPORT_CHECKPOINT, identity)
+        resumed = not fresh and checkpoint.load()
+        if resumed:
+            print(f"🔄 Resuming import from {self.path}")
+        checkpoint.save()
+
+        remaining = sum(
+            max(info.get("rows", info.get("estimated_rows", 0)) - sum(checkpoint.part(part["name"])["rows"] for part in info["parts"]), 0)
+            for info in manifest["tables"]
+        )
+        progress = TransferProgress("import", remaining)
+        pool = await self.db.connection_manager.get_pool()
+        semaphore = asyncio.Semaphore(self.jobs)
+
+        async def run(info: Dict[str, Any], part: Dict[str, Any]) -> None:
+            async with semaphore:
+                await self._import_part(pool, fmt, info, part, checkpoint, progress)
+
+        # Stages run one after another (foreign keys), parts of a stage in parallel
+        infos = sorted(manifest["tables"], key=lambda info: info["stage"])
+        for _, stage in groupby(infos, key=lambda info: info["stage"]):
+            await asyncio.gather(*(run(info, part) for info in stage for part in info["parts"]))
+
+        checkpoint.clear()
+        return {"action": "import", "path": self.path, "format": fmt, "resumed": resumed, **progress.summary()}
+
+    async def _import_part(self, pool, fmt: str, info: Dict[str, Any], part: Dict[str, Any],
+                           checkpoint: TransferCheckpoint, progress: TransferProgress) -> None:
+        state = checkpoint.part(part["name"])
+        if state["done"]:
+            return
+
+        target = info["name"]
+        staging = f"bulk_import_{target}"
+        column_names = [column["name"] for column in info["columns"]]
+        merge_query = self.exporter._merge_query(info, target, staging)
+        skip = state["rows"]
+
+        async with pool.acquire() as conn:
+            for records, nbytes in PART_READERS[fmt](os.path.join(self.path, part["file"]), info["columns"], self.batch_size):
+                if skip >= len(records):
+                    skip -= len(records)
+                    continue
+                records, skip = records[skip:], 0
+
+                async with conn.transaction():
+                    await conn.execute(f"CREATE TEMP TABLE {staging} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+                    await conn.copy_records_to_table(staging, records=records, columns=column_names)
+                    await conn.execute(merge_query)
+
+                state["rows"] += len(records)
+                checkpoint.save()
+                progress.advance(target, len(records), nbytes)
+
+        state["done"] = True
+        checkpoint.save()
+
+
+def open_database(db_host: str, db_port: int, db_user: str, db_password: str, db_name: str,
+                  namespace_id: str = None, max_connections: int = 5) -> Tuple[LuxDB, ConnectionManager]:
+    """Direct database connection (routed to a namespace schema when one is given) and its pool owner"""
+    if namespace_id is None:
+        db = LuxDB(host=db_host, port=db_port, user=db_user, password=db_password, database=db_name,
+                   max_connections=max_connections, use_existing_pool=False)
+        return db, db.connection_manager
+
+    connection_manager = ConnectionManager(
+        host=db_host, port=db_port, user=db_user, password=db_password, database=db_name,
+        max_connections=max_connections
+    )
+
+    from .server.namespace import NamespaceConnectionManager, NamespacedLuxDB, namespace_schema_name
+    namespace_manager = NamespaceConnectionManager(connection_manager, namespace_schema_name(namespace_id))
+    return NamespacedLuxDB(namespace_id, namespace_manager), connection_manager
+
+
+def print_summary(summary: Dict[str, Any]) -> None:
+    """Per-table and total throughput"""
+    verb = "Exported" if summary["action"] == "export" else "Imported"
+    for table, counters in summary["tables"].items():
+        print(f"  📦 {table}: {counters['rows']:,} rows, {counters['bytes'] / MB:.1f} MB")
+    print(f"✅ {verb} {summary['rows']:,} rows ({summary['bytes'] / MB:.1f} MB) in {summary['elapsed_seconds']:.1f}s "
+          f"- {summary['rows_per_sec']:,.0f} rows/s, {summary['mb_per_sec']:.2f} MB/s")
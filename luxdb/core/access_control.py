@@ -241,3 +241,6 @@ class AccessController:
 
 # Globalna instancja kontrolera dostępu
 access_controller = AccessController()
+
+from .memory_accounting import memory_accountant
+memory_accountant.register("access_control.being_zones", lambda: access_controller.being_zones)
@@ -0,0 +1,234 @@
+"""
+Rejestr aliasów IntelligentKernel w dedykowanych tabelach.
+
+alias_registry trzyma aktualne mapowanie alias -> soul_hash (z wersją),
+alias_history - dopisywaną historię zmian. Zapis to jeden upsert wiersza
+plus jeden insert historii (jedno zapytanie), zamiast przepisywania
+całego dokumentu JSONB Being kernela. Odczyty idą z pamięci, a brak
+w pamięci kończy się zapytaniem po kluczu głównym.
+
+Starsze wdrożenia trzymały alias_mappings i alias_history w danych Being
+kernela - load() przenosi je do tabel i usuwa z Being w jednej transakcji
+(niezależnie od soul_hash kernela, więc zmiana genotypu niczego nie gubi).
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+# Klucze mapowania trzymane w osobnych kolumnach (reszta trafia do metadata)
+MAPPING_COLUMNS = {"soul_hash", "type", "being_ulid", "version", "registered_at"}
+
+LEGACY_KEYS = ("alias_mappings", "alias_history")
+
+
+def _json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _row_to_mapping(row) -> Dict[str, Any]:
+    metadata = row["metadata"]
+    if isinstance(metadata, str):
+        metadata = json.loads(metadata)
+    return {
+        **(metadata or {}),
+        "soul_hash": row["soul_hash"],
+        "type": row["alias_type"],
+        "being_ulid": row["being_ulid"],
+        "version": row["version"],
+        "registered_at": row["updated_at"].isoformat() if row["updated_at"] else None
+    }
+
+
+class AliasRegistry:
+    """Mapowania aliasów: cache w pamięci + tabele alias_registry / alias_history"""
+
+    def __init__(self):
+        self.mappings: Dict[str, Dict[str, Any]] = {}
+        self._by_soul_hash: Dict[str, Set[str]] = {}
+        self.loaded = False
+
+    def _cache(self, alias: str, mapping: Dict[str, Any]) -> None:
+        previous = self.mappings.get(alias)
+        if previous:
+            self._by_soul_hash.get(previous["soul_hash"], set()).discard(alias)
+        self.mappings[alias] = mapping
+        self._by_soul_hash.setdefault(mapping["soul_hash"], set()).add(alias)
+
+    def _uncache(self, alias: str) -> None:
+        previous = self.mappings.pop(alias, None)
+        if previous:
+            self._by_soul_hash.get(previous["soul_hash"], set()).discard(alias)
+
+    async def load(self) -> int:
+        """Ładuje rejestr do pamięci (po migracji aliasów i historii z danych Being kernela)"""
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await self._migrate_legacy(conn)
+            rows = await conn.fetch("SELECT * FROM alias_registry")
+
+        self.mappings.clear()
+        self._by_soul_hash.clear()
+        for row in rows:
+            self._cache(row["alias"], _row_to_mapping(row))
+        self.loaded = True
+        return len(rows)
+
+    async def _migrate_legacy(self, conn) -> None:
+        """Przenosi alias_mappings / alias_history z danych Being do tabel i usuwa je z Being"""
+        legacy_rows = await conn.fetch("""
+            SELECT ulid, data->'alias_mappings' AS alias_mappings, data->'alias_history' AS alias_history
+            FROM beings
+            WHERE data ? 'alias_mappings' OR data ? 'alias_history'
+            FOR UPDATE
+        """)
+        if not legacy_rows:
+            return
+
+        mappings, history = [], []
+        for row in legacy_rows:
+            legacy_mappings = _json(row["alias_mappings"]) or {}
+            alias_types = {}
+            for alias, mapping in legacy_mappings.items():
+                if not isinstance(mapping, dict):
+                    mapping = {"soul_hash": mapping, "type": "template"}
+                alias_types[alias] = mapping.get("type", "template")
+                if not mapping.get("soul_hash"):
+                    continue
+                metadata = {k: v for k, v in mapping.items() if k not in MAPPING_COLUMNS}
+                mappings.append((alias, mapping["soul_hash"], alias_types[alias],
+                                 mapping.get("being_ulid"), json.dumps(metadata, default=str)))
+
+            for alias, entries in (_json(row["alias_history"]) or {}).items():
+                version = 0
+                for entry in entries if isinstance(entries, list) else []:
+                    new_hash = entry.get("soul_hash") or entry.get("new_hash") if isinstance(entry, dict) else None
+                    if not new_hash:
+                        continue
+                    version += 1
+                    history.append((alias, entry.get("previous_hash") or entry.get("old_hash"), new_hash,
+                                    alias_types.get(alias, "template"), version,
+                                    _parse_timestamp(entry.get("updated_at") or entry.get("timestamp"))))
+
+        if mappings:
+            await conn.executemany("""
+                INSERT INTO alias_registry (alias, soul_hash, alias_type, being_ulid, metadata)
+                VALUES ($1, $2, $3, $4, $5)
+                ON CONFLICT (alias) DO NOTHING
+            """, mappings)
+        if history:
+            await conn.executemany("""
+                INSERT INTO alias_history (alias, old_soul_hash, new_soul_hash, alias_type, version, changed_at)
+                VALUES ($1, $2, $3, $4, $5, COALESCE($6, NOW()))
+            """, history)
+        await conn.execute(
+            "UPDATE beings SET data = data - $2::text[] WHERE ulid = ANY($1::text[])",
+            [row["ulid"] for row in legacy_rows], list(LEGACY_KEYS)
+        )
+        print(f"📦 Migrated {len(mappings)} aliases and {len(history)} history entries from kernel being data")
+
+    async def get(self, alias: str) -> Optional[Dict[str, Any]]:
+        """Mapowanie aliasu - z pamięci albo zapytaniem po kluczu"""
+        mapping = self.mappings.get(alias)
+        if mapping is not None:
+            return mapping
+
+        from .postgre_db import Postgre_db
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow("SELECT * FROM alias_registry WHERE alias = $1", alias)
+        if row is None:
+            return None
+
+        mapping = _row_to_mapping(row)
+        self._cache(alias, mapping)
+        return mapping
+
+    def aliases_for_soul(self, soul_hash: str, alias_type: str = None) -> List[str]:
+        """Aliasy wskazujące na soul_hash (z pamięci)"""
+        return [
+            alias for alias in self._by_soul_hash.get(soul_hash, ())
+            if alias_type is None or self.mappings[alias].get("type") == alias_type
+        ]
+
+    async def set(self, alias: str, soul_hash: str, alias_type: str = "template",
+                  being_ulid: str = None, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Upsert mapowania i wpis historii w jednym zapytaniu"""
+        from .postgre_db import Postgre_db
+
+        metadata = metadata or {}
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                WITH previous AS (
+                    SELECT soul_hash FROM alias_registry WHERE alias = $1
+                ), upserted AS (
+                    INSERT INTO alias_registry (alias, soul_hash, alias_type, being_ulid, metadata, version, updated_at)
+                    VALUES ($1, $2, $3, $4, $5, 1, NOW())
+                    ON CONFLICT (alias) DO UPDATE SET
+                        soul_hash = EXCLUDED.soul_hash,
+                        alias_type = EXCLUDED.alias_type,
+                        being_ulid = EXCLUDED.being_ulid,
+                        metadata = EXCLUDED.metadata,
+                        version = alias_registry.version + 1,
+                        updated_at = NOW()
+                    RETURNING *
+                ), history AS (
+                    INSERT INTO alias_history (alias, old_soul_hash, new_soul_hash, alias_type, version)
+                    SELECT $1, (SELECT soul_hash FROM previous), $2, $3, version FROM upserted
+                )
+                SELECT * FROM upserted
+            """, alias, soul_hash, alias_type, being_ulid, json.dumps(metadata, default=str))
+
+        mapping = _row_to_mapping(row)
+        self._cache(alias, mapping)
+        return mapping
+
+    async def delete(self, alias: str) -> bool:
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            result = await conn.execute("DELETE FROM alias_registry WHERE alias = $1", alias)
+        self._uncache(alias)
+        return result.endswith(" 1")
+
+    async def history(self, alias: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Historia zmian aliasu (najnowsze najpierw)"""
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT old_soul_hash, new_soul_hash, alias_type, version, changed_at
+                FROM alias_history WHERE alias = $1
+                ORDER BY changed_at DESC, id DESC
+                LIMIT $2
+            """, alias, limit)
+
+        return [
+            {
+                "old_hash": row["old_soul_hash"],
+                "new_hash": row["new_soul_hash"],
+                "type": row["alias_type"],
+                "version": row["version"],
+                "timestamp": row["changed_at"].isoformat() if row["changed_at"] else datetime.now().isoformat()
+            }
+            for row in rows
+        ]
+
+
+# Globalna instancja
+alias_registry = AliasRegistry()
@@ -3,7 +3,7 @@ Authentication and Session Management System for LuxOS
 """
 
 import asyncio
-import hashlib
+import os
 import secrets
 import time
 from typing import Dict, Any, Optional, List
@@ -11,12 +11,15 @@ from datetime import datetime, timedelta
 import ulid
 
 from .session_assistant import SessionManager, session_manager
+from .session_store import ExpiryIndex
+from .heartbeat_table import heartbeat_table
 from .access_control import access_controller, AccessLevel
 from ..models.being import Being
 from ..models.soul import Soul
 from ..models.event import Event
 from ..models.relationship import Relationship
 from luxdb.core.postgre_db import Postgre_db
+from ..utils.password_hasher import password_hasher, hash_password_sync, verify_password_sync
 
 class AuthenticationManager:
     """
@@ -27,7 +30,11 @@ class AuthenticationManager:
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
         self.user_credentials: Dict[str, Dict[str, Any]] = {}
         self.session_connections: Dict[str, str] = {}  # session_id -> connection_ulid
+        self.session_tokens: Dict[str, str] = {}  # session_token -> session_id
+        self.session_expiry = ExpiryIndex()  # session_id -> expires_at (timestamp)
         self.is_initialized = False
+        self.maintenance_interval = float(os.getenv("LUXDB_SESSION_MAINTENANCE_INTERVAL", "30"))
+        self._maintenance_task: Optional[asyncio.Task] = None
 
     async def initialize(self):
         """Inicjalizuje system autoryzacji"""
@@ -44,19 +51,12 @@ class AuthenticationManager:
         return True
 
     def hash_password(self, password: str) -> str:
-        """Hashuje hasło z solą"""
-        salt = secrets.token_hex(32)
-        password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return f"{salt}:{password_hash.hex()}"
+        """Hashuje hasło z solą (synchronicznie - w handlerach async używaj password_hasher)"""
+        return hash_password_sync(password)
 
     def verify_password(self, password: str, password_hash: str) -> bool:
-        """Weryfikuje hasło"""
-        try:
-            salt, hash_part = password_hash.split(':')
-            password_check = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-            return password_check.hex() == hash_part
-        except:
-            return False
+        """Weryfikuje hasło (synchronicznie - w handlerach async używaj password_hasher)"""
+        return verify_password_sync(password, password_hash)
 
     async def create_user(self, username: str, password: str, role: str = "user", permissions: List[str] = None) -> Dict[str, Any]:
         """Tworzy nowego użytkownika"""
@@ -65,7 +65,7 @@ class AuthenticationManager:
 
         user_data = {
             "username": username,
-            "password_hash": self.hash_password(password),
+            "password_hash": await password_hasher.hash_password(password),
             "role": role,
             "permissions": permissions or ["basic_access"],
             "created_at": datetime.now().isoformat(),
@@ -116,12 +116,15 @@ class AuthenticationManager:
             return None
 
         user_data = self.user_credentials[username]
-        if not user_data["active"] or not self.verify_password(password, user_data["password_hash"]):
+        if not user_data["active"]:
+            return None
+        if not await password_hasher.verify_password(password, user_data["password_hash"]):
             return None
 
         # Utwórz sesję
         session_id = str(ulid.ulid())
         session_token = secrets.token_urlsafe(32)
+        expires_at = datetime.now() + timedelta(hours=24)
 
         # Utwórz Connection Being dla tej sesji
         connection_being = await self.create_connection_being(session_id, user_data["user_ulid"], fingerprint)
@@ -137,11 +140,13 @@ class AuthenticationManager:
             "permissions": user_data["permissions"],
             "created_at": datetime.now().isoformat(),
             "last_activity": datetime.now().isoformat(),
-            "expires_at": (datetime.now() + timedelta(hours=24)).isoformat(),
+            "expires_at": expires_at.isoformat(),
             "status": "active"
         }
 
         self.active_sessions[session_id] = session_data
+        self.session_tokens[session_token] = session_id
+        self.session_expiry.schedule(session_id, expires_at.timestamp())
         self.session_connections[session_id] = connection_being.ulid
 
         # Aktualizuj dane użytkownika
@@ -222,38 +227,85 @@ class AuthenticationManager:
         return connection_being
 
     async def validate_session(self, session_token: str) -> Optional[Dict[str, Any]]:
-        """Waliduje sesję użytkownika"""
-        for session_id, session_data in self.active_sessions.items():
-            if session_data.get("session_token") == session_token:
-                # Sprawdź czy nie wygasła
-                expires_at = datetime.fromisoformat(session_data["expires_at"])
-                if datetime.now() > expires_at:
-                    await self.invalidate_session(session_id)
-                    return None
+        """Waliduje sesję użytkownika (O(1) - indeks token -> session_id)"""
+        session_id = self.session_tokens.get(session_token)
+        if session_id is None:
+            return None
+
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
+            del self.session_tokens[session_token]
+            return None
+
+        # Sprawdź czy nie wygasła
+        expires_at = self.session_expiry.deadline(session_id)
+        if expires_at is None or time.time() > expires_at:
+            await self.invalidate_session(session_id)
+            return None
 
-                # Zaktualizuj ostatnią aktywność
-                session_data["last_activity"] = datetime.now().isoformat()
+        # Zaktualizuj ostatnią aktywność
+        session_data["last_activity"] = datetime.now().isoformat()
 
-                # Zaktualizuj heartbeat Connection Being
-                await self.update_connection_heartbeat(session_data["connection_ulid"])
+        # Zaktualizuj heartbeat Connection Being
+        await self.update_connection_heartbeat(session_data["connection_ulid"])
 
-                return session_data
+        return session_data
 
-        return None
+    async def cleanup_expired_sessions(self) -> int:
+        """Unieważnia sesje, których termin minął (bez skanowania wszystkich sesji)"""
+        expired = self.session_expiry.pop_due(time.time())
+        for session_id in expired:
+            await self.invalidate_session(session_id)
+        return len(expired)
 
     async def update_connection_heartbeat(self, connection_ulid: str):
-        """Aktualizuje heartbeat połączenia"""
+        """Aktualizuje heartbeat połączenia (koaleskowany w heartbeat_table, bez eventu na każdy heartbeat)"""
+        heartbeat_table.beat(connection_ulid)
+
+    async def cleanup_stale_connections(self) -> List[str]:
+        """Unieważnia sesje, których połączenie nie wysłało heartbeatu w czasie stale_after"""
+        stale = set(await heartbeat_table.prune_stale())
+        if not stale:
+            return []
+
+        stale_sessions = [
+            session_id for session_id, connection_ulid in self.session_connections.items()
+            if connection_ulid in stale
+        ]
+        for session_id in stale_sessions:
+            await self.invalidate_session(session_id)
+
+        print(f"💔 Stale connections: {len(stale)}, invalidated sessions: {len(stale_sessions)}")
+        return stale_sessions
+
+    def start_maintenance(self) -> None:
+        """Uruchamia cykliczne wykrywanie nieaktywnych połączeń i wygasłych sesji"""
+        if self._maintenance_task is not None and not self._maintenance_task.done():
+            return
         try:
-            # Utwórz event heartbeat
-            await Event.create_event(
-                "connection_heartbeat",
-                {
-                    "connection_ulid": connection_ulid,
-                    "timestamp": datetime.now().isoformat()
-                }
-            )
-        except Exception as e:
-            print(f"❌ Error updating heartbeat: {e}")
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Brak pętli - cleanup_* trzeba wywołać ręcznie
+        self._maintenance_task = loop.create_task(self._maintenance_loop())
+
+    async def stop_maintenance(self) -> None:
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            await asyncio.gather(self._maintenance_task, return_exceptions=True)
+            self._maintenance_task = None
+
+    async def _maintenance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval)
+            try:
+                await self.cleanup_stale_connections()
+                await self.cleanup_expired_sessions()
+            except Exception as e:
+                print(f"❌ Session maintenance error: {e}")
+
+    def owns_connection(self, session_data: Dict[str, Any], connection_ulid: str) -> bool:
+        """Czy połączenie należy do sesji (heartbeat można zgłaszać tylko dla własnych połączeń)"""
+        return bool(connection_ulid) and self.session_connections.get(session_data.get("session_id")) == connection_ulid
 
     async def invalidate_session(self, session_id: str):
         """Unieważnia sesję"""
@@ -275,6 +327,10 @@ class AuthenticationManager:
 
         # Usuń z aktywnych sesji
         del self.active_sessions[session_id]
+        if session_data.get("connection_ulid"):
+            heartbeat_table.forget(session_data["connection_ulid"])
+        self.session_tokens.pop(session_data.get("session_token"), None)
+        self.session_expiry.remove(session_id)
         if session_id in self.session_connections:
             del self.session_connections[session_id]
 
@@ -284,3 +284,7 @@ class CommunicationDispenser:
 
 # Inicjalizacja globalnego dispenser'a
 communication_dispenser = CommunicationDispenser()
+
+from .memory_accounting import memory_accountant
+memory_accountant.register("communication.queue", lambda: BeingCommunicationManager._communication_queue)
+memory_accountant.register("communication.active_beings", lambda: BeingCommunicationManager._active_beings)
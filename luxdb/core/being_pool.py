@@ -0,0 +1,281 @@
+"""
+Pula Being dla Soul z limitem aktywnych instancji (max_instances).
+
+Stan puli żyje w bazie (data->>'active'). Przydział to jedna transakcja:
+blokada doradcza per soul_hash (pg_advisory_xact_lock), liczniki z
+COUNT(*) FILTER i jedno zapytanie przejmujące nieaktywny Being
+(UPDATE ... FOR UPDATE SKIP LOCKED LIMIT 1 RETURNING), więc limit
+max_instances trzyma się między procesami.
+
+Nowy Being jest tworzony (factory) poza blokadą i transakcją - pod
+blokadą jest tylko ponowne sprawdzenie limitu i INSERT.
+
+Zwolniony Being jest od razu oznaczany w bazie jako nieaktywny (po
+awarii procesu nie zostaje "aktywny" na zawsze) i trafia na lokalną
+listę wolnych - przy kolejnym przydziale ten sam obiekt jest przejmowany
+w pierwszej kolejności, bez odtwarzania go z wiersza.
+"""
+
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+ACTIVE_FLAG = "COALESCE((data->>'active')::boolean, false)"
+
+COUNTS_QUERY = f"""
+    SELECT COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE {ACTIVE_FLAG}) AS active,
+           COUNT(*) FILTER (WHERE NOT {ACTIVE_FLAG}) AS inactive
+    FROM beings
+    WHERE soul_hash = $1
+"""
+
+CLAIM_QUERY = f"""
+    UPDATE beings
+    SET data = data || $2::jsonb || '{{"active": true}}'::jsonb,
+        updated_at = NOW()
+    WHERE ulid = (
+        SELECT ulid FROM beings
+        WHERE soul_hash = $1 AND NOT {ACTIVE_FLAG}
+        ORDER BY updated_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING ulid, soul_hash, data, created_at, updated_at, ttl_expires
+"""
+
+CLAIM_ULID_QUERY = f"""
+    UPDATE beings
+    SET data = data || $2::jsonb || '{{"active": true}}'::jsonb,
+        updated_at = NOW()
+    WHERE ulid = (
+        SELECT ulid FROM beings
+        WHERE ulid = $1 AND NOT {ACTIVE_FLAG}
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING ulid, soul_hash, data, created_at, updated_at, ttl_expires
+"""
+
+RELEASE_QUERY = """
+    UPDATE beings
+    SET data = jsonb_set(data, '{active}', 'false'::jsonb),
+        updated_at = NOW()
+    WHERE ulid = ANY($1::text[])
+"""
+
+
+class BeingPool:
+    """Przydział Being z puli: jedno zapytanie SQL + lokalna lista wolnych"""
+
+    def __init__(self, max_idle: int = None):
+        self.max_idle = max_idle if max_idle is not None else int(os.getenv("LUXDB_POOL_MAX_IDLE", "16"))
+        self._free: Dict[str, Deque[Any]] = {}
+        self.stats = {"local_hits": 0, "claimed": 0, "created": 0, "limit_reached": 0, "released": 0, "returned": 0}
+
+    # --- przydział ---
+
+    async def acquire(self, soul, max_instances: int, attributes: Dict[str, Any] = None,
+                      factory: Callable[[], Awaitable[Any]] = None) -> Optional[Any]:
+        """
+        Zwraca aktywny Being dla Soul albo None, gdy limit jest osiągnięty.
+
+        factory() tworzy nowy (nietrwały) Being, gdy w puli nie ma wolnego -
+        wywoływana bez trzymania połączenia, transakcji i blokady.
+        """
+        being, counts = await self._claim(soul, max_instances, attributes)
+        if being is not None or counts is None or factory is None:
+            return being
+
+        # Brak wolnych, limit nieosiągnięty - utwórz poza blokadą, wstaw pod nią
+        new_being = await factory()
+        being, counts = await self._claim(soul, max_instances, attributes, new_being=new_being)
+        if being is new_being:
+            self.stats["created"] += 1
+            print(f"🆕 Created new pooled Being: {being.ulid[:8]} ({counts['active'] + 1}/{max_instances})")
+        return being
+
+    async def _claim(self, soul, max_instances: int, attributes: Dict[str, Any] = None,
+                     new_being: Any = None):
+        """
+        Jedna transakcja pod blokadą puli: limit, przejęcie wolnego Being
+        (najpierw z lokalnej listy), a gdy podano new_being - jego INSERT.
+
+        Zwraca (being, counts); (None, None) gdy limit jest osiągnięty.
+        """
+        from .postgre_db import Postgre_db
+        from ..utils.serializer import JSONBSerializer
+
+        encoded_attributes = JSONBSerializer.serialize(attributes or {})
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", soul.soul_hash)
+                counts = await conn.fetchrow(COUNTS_QUERY, soul.soul_hash)
+                if counts["active"] >= max_instances:
+                    self.stats["limit_reached"] += 1
+                    return None, None
+
+                # Lokalna lista wolnych - ten sam obiekt, jeśli nikt go w międzyczasie nie przejął
+                while True:
+                    parked = self._pop_free(soul.soul_hash)
+                    if parked is None:
+                        break
+                    row = await conn.fetchrow(CLAIM_ULID_QUERY, parked.ulid, encoded_attributes)
+                    if row is not None:
+                        self.stats["local_hits"] += 1
+                        fresh = self._being_from_row(row, soul)
+                        parked.data = fresh.data
+                        parked.updated_at = fresh.updated_at
+                        return parked, counts
+
+                row = await conn.fetchrow(CLAIM_QUERY, soul.soul_hash, encoded_attributes)
+                if row is not None:
+                    self.stats["claimed"] += 1
+                    print(f"🔄 Reactivated pooled Being: {row['ulid'][:8]} ({counts['active'] + 1}/{max_instances})")
+                    return self._being_from_row(row, soul), counts
+
+                if new_being is None:
+                    return None, counts
+                new_being.data['active'] = True
+                new_being.data['_persistent'] = True
+                await self._insert(conn, new_being, soul)
+                return new_being, counts
+
+    async def any_active(self, soul) -> Optional[Any]:
+        """Ostatnio używany aktywny Being (gdy limit puli jest osiągnięty)"""
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(f"""
+                SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires
+                FROM beings
+                WHERE soul_hash = $1 AND {ACTIVE_FLAG}
+                ORDER BY updated_at DESC
+                LIMIT 1
+            """, soul.soul_hash)
+        return self._being_from_row(row, soul) if row is not None else None
+
+    async def _insert(self, conn, being, soul) -> None:
+        """Wstawia Being w transakcji trzymającej blokadę puli"""
+        from ..utils.serializer import JSONBSerializer
+
+        serialized_data, errors = JSONBSerializer.validate_and_serialize(being.data, soul)
+        if errors:
+            raise ValueError(f"Serialization errors: {', '.join(errors)}")
+
+        if not being.ulid:
+            import ulid
+            being.ulid = str(ulid.ulid())
+
+        row = await conn.fetchrow("""
+            INSERT INTO beings (ulid, soul_hash, data, ttl_expires)
+            VALUES ($1, $2, $3, $4)
+            RETURNING created_at, updated_at
+        """, being.ulid, being.soul_hash, JSONBSerializer.serialize(serialized_data), getattr(being, 'ttl_expires', None))
+        being.created_at = row['created_at']
+        being.updated_at = row['updated_at']
+
+        from .ttl_reaper import ttl_reaper
+        ttl_reaper.track(being.ulid, getattr(being, 'ttl_expires', None))
+
+    def _being_from_row(self, row, soul) -> Any:
+        from ..models.being import Being
+        from ..utils.serializer import JSONBSerializer
+
+        data = JSONBSerializer.deserialize(row['data']) if row['data'] else {}
+        if soul is not None:
+            data = JSONBSerializer.deserialize_being_data(data, soul)
+        return Being.from_dict({
+            'ulid': row['ulid'],
+            'soul_hash': row['soul_hash'],
+            'data': data,
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+            'ttl_expires': row['ttl_expires']
+        })
+
+    # --- zwalnianie ---
+
+    def _pop_free(self, soul_hash: str) -> Optional[Any]:
+        free = self._free.get(soul_hash)
+        return free.popleft() if free else None
+
+    async def release(self, being) -> None:
+        """Oddaje Being do puli - w bazie nieaktywny, lokalnie (do max_idle) jako gorący obiekt"""
+        self.stats["released"] += 1
+        await self._return_to_database([being])
+        free = self._free.setdefault(being.soul_hash, deque())
+        if len(free) < self.max_idle and all(b.ulid != being.ulid for b in free):
+            free.append(being)
+
+    async def drain(self, soul_hash: str = None) -> int:
+        """Czyści lokalne listy wolnych (Being są już nieaktywne w bazie)"""
+        soul_hashes = [soul_hash] if soul_hash is not None else list(self._free)
+        return sum(len(self._free.pop(key, ())) for key in soul_hashes)
+
+    async def _return_to_database(self, beings: List[Any]) -> None:
+        if not beings:
+            return
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(RELEASE_QUERY, [being.ulid for being in beings])
+        for being in beings:
+            being.data['active'] = False
+        self.stats["returned"] += len(beings)
+
+    def forget(self, ulid: str) -> None:
+        """Usuwa Being z list wolnych (np. po usunięciu z bazy)"""
+        for free in self._free.values():
+            for being in list(free):
+                if being.ulid == ulid:
+                    free.remove(being)
+
+    # --- status ---
+
+    async def status(self, soul_hash: str, include_members: bool = False) -> Dict[str, Any]:
+        """Liczniki puli z jednego zapytania agregującego (lista członków tylko na żądanie - O(n))"""
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            counts = await conn.fetchrow(COUNTS_QUERY, soul_hash)
+            rows = await conn.fetch(f"""
+                SELECT ulid, data->>'alias' AS alias, {ACTIVE_FLAG} AS active, created_at, updated_at
+                FROM beings
+                WHERE soul_hash = $1
+                ORDER BY created_at DESC
+            """, soul_hash) if include_members else []
+
+        result = {
+            'total_beings': counts['total'],
+            'active_count': counts['active'],
+            'inactive_count': counts['inactive'],
+            'idle_local': len(self._free.get(soul_hash, ()))
+        }
+        if include_members:
+            members = {True: [], False: []}
+            for row in rows:
+                members[bool(row['active'])].append({
+                    'ulid': row['ulid'],
+                    'alias': row['alias'],
+                    'created_at': row['created_at'].isoformat() if row['created_at'] else None,
+                    'updated_at': row['updated_at'].isoformat() if row['updated_at'] else None
+                })
+            result['active_beings'] = members[True]
+            result['inactive_beings'] = members[False]
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pools": len(self._free),
+            "idle_local": sum(len(free) for free in self._free.values()),
+            "max_idle": self.max_idle
+        }
+
+
+# Globalna instancja
+being_pool = BeingPool()
@@ -5,6 +5,7 @@ Manager połączeń z bazą danych PostgreSQL.
 
 import asyncpg
 from typing import Optional
+from .query_stats import instrument_pool
 
 class ConnectionManager:
     """
@@ -51,6 +52,7 @@ class ConnectionManager:
                 },
                 **self.kwargs
             )
+            self._pool = instrument_pool(self._pool)
             
     async def get_pool(self) -> asyncpg.Pool:
         """
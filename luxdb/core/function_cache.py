@@ -0,0 +1,222 @@
+"""
+Memoizacja czystych funkcji Soul.
+
+Deklaracja w genotypie:
+    "functions": {
+        "add": {"pure": true},
+        "format_report": {"cache": {"ttl": 300, "max_entries": 1000, "disk": true}}
+    }
+
+Wyniki trafiają do LRU per soul_hash (osobno dla każdej funkcji), kluczem
+jest stabilny hash argumentów. Z "disk": true wyniki są też zapisywane
+w lokalnym pliku SQLite współdzielonym przez procesy na tej maszynie
+(odczyt i zapis w wątku - asyncio.to_thread - bez blokowania pętli).
+Argument being_context nie wchodzi do klucza. Wołający dostaje kopię
+wyniku, więc jego modyfikacje nie zmieniają wpisu w cache.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 1024
+_MISSING = object()
+
+
+def resolve_cache_config(genotype: Dict[str, Any], function_name: str) -> Optional[Dict[str, Any]]:
+    """Zwraca konfigurację cache dla funkcji lub None gdy funkcja nie jest memoizowana"""
+    function_def = genotype.get("functions", {}).get(function_name, {})
+    if not isinstance(function_def, dict):
+        return None
+
+    cache = function_def.get("cache")
+    if cache is None and not function_def.get("pure", False):
+        return None
+    if cache is False:
+        return None
+
+    cache = cache if isinstance(cache, dict) else {}
+    return {
+        "ttl": cache.get("ttl"),
+        "max_entries": int(cache.get("max_entries", DEFAULT_MAX_ENTRIES)),
+        "disk": bool(cache.get("disk", False))
+    }
+
+
+def make_cache_key(function_name: str, args: tuple, kwargs: dict) -> str:
+    """Stabilny hash argumentów wywołania"""
+    payload = {
+        "function": function_name,
+        "args": list(args),
+        "kwargs": {k: v for k, v in kwargs.items() if k != "being_context"}
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=repr, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _copy(value: Any) -> Any:
+    """Głęboka kopia wyniku (obiekty niekopiowalne są zwracane bez zmian)"""
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return value
+
+
+class DiskCacheStore:
+    """Lokalny magazyn wyników w SQLite (współdzielony między procesami)"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv("LUXDB_FUNCTION_CACHE_PATH", os.path.join(".luxdb_cache", "functions.sqlite"))
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=1.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS function_cache (
+                    soul_hash TEXT NOT NULL,
+                    function_name TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (soul_hash, function_name, cache_key)
+                )
+            """)
+            self._local.conn = conn
+        return conn
+
+    def get(self, soul_hash: str, function_name: str, key: str) -> Any:
+        entry = self.get_entry(soul_hash, function_name, key)
+        return entry if entry is _MISSING else entry[0]
+
+    def get_entry(self, soul_hash: str, function_name: str, key: str) -> Any:
+        """(wartość, wygaśnięcie) albo _MISSING"""
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM function_cache WHERE soul_hash = ? AND function_name = ? AND cache_key = ?",
+                (soul_hash, function_name, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Function cache read error: {e}")
+            return _MISSING
+
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return _MISSING
+        return json.loads(row[0]), row[1]
+
+    def put(self, soul_hash: str, function_name: str, key: str, value: Any, expires_at: Optional[float]) -> None:
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            return  # Wynik nie jest serializowalny - zostaje tylko w pamięci
+
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO function_cache VALUES (?, ?, ?, ?, ?)",
+                (soul_hash, function_name, key, encoded, expires_at)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️ Function cache write error: {e}")
+
+    def clear(self, soul_hash: str = None) -> None:
+        conn = self._connection()
+        if soul_hash:
+            conn.execute("DELETE FROM function_cache WHERE soul_hash = ?", (soul_hash,))
+        else:
+            conn.execute("DELETE FROM function_cache")
+        conn.commit()
+
+
+class FunctionCache:
+    """LRU wyników czystych funkcji: soul_hash -> function_name -> klucz -> (wartość, wygaśnięcie)"""
+
+    def __init__(self, disk_store: DiskCacheStore = None):
+        self._entries: Dict[str, Dict[str, OrderedDict]] = {}
+        self._stats: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.disk_store = disk_store or DiskCacheStore()
+
+    def _function_stats(self, soul_hash: str, function_name: str) -> Dict[str, int]:
+        return self._stats.setdefault(soul_hash, {}).setdefault(
+            function_name, {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        )
+
+    async def get(self, soul_hash: str, function_name: str, key: str, config: Dict[str, Any]) -> Tuple[bool, Any]:
+        """Zwraca (trafienie, kopia wartości)"""
+        stats = self._function_stats(soul_hash, function_name)
+        entries = self._entries.get(soul_hash, {}).get(function_name)
+
+        if entries is not None and key in entries:
+            value, expires_at = entries[key]
+            if expires_at is None or expires_at >= time.time():
+                entries.move_to_end(key)
+                stats["hits"] += 1
+                return True, _copy(value)
+            del entries[key]
+
+        if config.get("disk"):
+            entry = await asyncio.to_thread(self.disk_store.get_entry, soul_hash, function_name, key)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                self._remember(soul_hash, function_name, key, value, expires_at, config)
+                stats["disk_hits"] += 1
+                return True, _copy(value)
+
+        stats["misses"] += 1
+        return False, None
+
+    async def put(self, soul_hash: str, function_name: str, key: str, value: Any, config: Dict[str, Any]) -> None:
+        ttl = config.get("ttl")
+        expires_at = time.time() + ttl if ttl else None
+        value = _copy(value)
+        self._remember(soul_hash, function_name, key, value, expires_at, config)
+        if config.get("disk"):
+            await asyncio.to_thread(self.disk_store.put, soul_hash, function_name, key, value, expires_at)
+
+    def _remember(self, soul_hash: str, function_name: str, key: str, value: Any,
+                  expires_at: Optional[float], config: Dict[str, Any]) -> None:
+        entries = self._entries.setdefault(soul_hash, {}).setdefault(function_name, OrderedDict())
+        entries[key] = (value, expires_at)
+        entries.move_to_end(key)
+
+        max_entries = config.get("max_entries", DEFAULT_MAX_ENTRIES)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+            self._function_stats(soul_hash, function_name)["evictions"] += 1
+
+    def invalidate(self, soul_hash: str, function_name: str = None) -> None:
+        """Czyści cache Soul (lub jednej funkcji)"""
+        if function_name:
+            self._entries.get(soul_hash, {}).pop(function_name, None)
+        else:
+            self._entries.pop(soul_hash, None)
+
+    def get_stats(self, soul_hash: str) -> Dict[str, Dict[str, Any]]:
+        """Statystyki trafień dla funkcji danej Soul"""
+        result = {}
+        for function_name, stats in self._stats.get(soul_hash, {}).items():
+            hits = stats["hits"] + stats["disk_hits"]
+            total = hits + stats["misses"]
+            result[function_name] = {
+                **stats,
+                "entries": len(self._entries.get(soul_hash, {}).get(function_name, ())),
+                "hit_rate": round(hits / total, 4) if total else 0.0
+            }
+        return result
+
+
+# Globalna instancja
+function_cache = FunctionCache()
@@ -0,0 +1,203 @@
+"""
+Wykonawca funkcji Soul z polityką wykonania deklarowaną w genotypie.
+
+Polityki:
+- inline  - wywołanie bezpośrednio w pętli zdarzeń (domyślne)
+- thread  - pula wątków (kod zwalniający GIL, I/O blokujące)
+- process - pula procesów (kod CPU); funkcja jest odtwarzana w workerze
+            z module_source, więc nie musi być picklowalna
+
+Funkcje async (korutyny) działają tylko inline - thread/process je odrzuca.
+Miejsce w limicie współbieżności jest zwalniane dopiero, gdy worker
+faktycznie skończy pracę (także po przekroczeniu czasu przez wywołującego).
+
+Deklaracja w genotypie:
+    "execution_policy": "inline",                 # domyślna dla całej Soul
+    "functions": {
+        "heavy": {"execution": "process", "timeout": 10}
+    }
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+POLICIES = (INLINE, THREAD, PROCESS)
+
+# Funkcje odtworzone w procesie workera: soul_hash -> {nazwa: funkcja}
+_materialized_modules: Dict[str, Dict[str, Callable]] = {}
+
+
+def _materialize(soul_hash: str, module_source: str) -> Dict[str, Callable]:
+    """Kompiluje module_source raz na proces workera"""
+    functions = _materialized_modules.get(soul_hash)
+    if functions is None:
+        module_globals: Dict[str, Any] = {}
+        exec(compile(module_source, f"<soul_{soul_hash}>", "exec"), module_globals)
+        functions = {
+            name: obj for name, obj in module_globals.items()
+            if callable(obj) and not name.startswith("_")
+        }
+        _materialized_modules[soul_hash] = functions
+    return functions
+
+
+def _call_sync(func: Callable, args: tuple, kwargs: dict) -> Any:
+    """Wywołuje funkcję synchroniczną w workerze"""
+    result = func(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        result.close()
+        raise TypeError(f"Function {getattr(func, '__name__', '?')} returned a coroutine - async functions must use inline execution")
+    return result
+
+
+def _process_entry(soul_hash: str, module_source: str, function_name: str, args: tuple, kwargs: dict) -> Any:
+    """Punkt wejścia w procesie workera"""
+    func = _materialize(soul_hash, module_source).get(function_name)
+    if func is None:
+        raise KeyError(f"Function '{function_name}' not found in module_source of soul {soul_hash}")
+    return _call_sync(func, args, kwargs)
+
+
+def resolve_policy(genotype: Dict[str, Any], function_name: str) -> Tuple[str, Optional[float]]:
+    """Zwraca (polityka, timeout) dla funkcji na podstawie genotypu"""
+    function_def = genotype.get("functions", {}).get(function_name, {})
+    if not isinstance(function_def, dict):
+        function_def = {}
+
+    policy = function_def.get("execution") or genotype.get("execution_policy") or INLINE
+    if policy not in POLICIES:
+        print(f"⚠️ Unknown execution policy '{policy}' for {function_name}, using inline")
+        policy = INLINE
+
+    timeout = function_def.get("timeout")
+    return policy, float(timeout) if timeout is not None else None
+
+
+class FunctionExecutor:
+    """Wykonuje funkcje Soul zgodnie z polityką, z limitami współbieżności i czasem"""
+
+    def __init__(self, thread_workers: int = None, process_workers: int = None,
+                 thread_concurrency: int = None, process_concurrency: int = None,
+                 default_timeouts: Dict[str, Optional[float]] = None):
+        self.thread_workers = thread_workers or int(os.getenv("LUXDB_SOUL_THREAD_WORKERS", "8"))
+        self.process_workers = process_workers or int(os.getenv("LUXDB_SOUL_PROCESS_WORKERS", str(os.cpu_count() or 2)))
+        self.limits = {
+            THREAD: thread_concurrency or self.thread_workers * 4,
+            PROCESS: process_concurrency or self.process_workers * 2
+        }
+        self.default_timeouts = default_timeouts or {INLINE: None, THREAD: 30.0, PROCESS: 60.0}
+
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats: Dict[str, Dict[str, int]] = {
+            policy: {"calls": 0, "errors": 0, "timeouts": 0, "in_flight": 0} for policy in POLICIES
+        }
+
+    def _semaphore(self, policy: str) -> asyncio.Semaphore:
+        if policy not in self._semaphores:
+            self._semaphores[policy] = asyncio.Semaphore(self.limits[policy])
+        return self._semaphores[policy]
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="luxdb-soul")
+        return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process_pool
+
+    async def run(self, func: Callable, args: tuple = (), kwargs: dict = None,
+                  policy: str = INLINE, timeout: float = None, soul_hash: str = None,
+                  module_source: str = None, function_name: str = None) -> Any:
+        """
+        Wykonuje funkcję według polityki.
+
+        Polityka process wymaga soul_hash, module_source i function_name -
+        bez nich funkcja jest wykonywana w puli wątków.
+        """
+        kwargs = kwargs or {}
+        if policy == PROCESS and not (soul_hash and module_source and function_name):
+            policy = THREAD
+        if policy != INLINE and asyncio.iscoroutinefunction(func):
+            raise TypeError(
+                f"Async function {function_name or getattr(func, '__name__', '?')} "
+                f"cannot use '{policy}' execution policy - use inline"
+            )
+        if timeout is None:
+            timeout = self.default_timeouts.get(policy)
+
+        stats = self.stats[policy]
+        stats["calls"] += 1
+        try:
+            if policy == INLINE:
+                if asyncio.iscoroutinefunction(func):
+                    return await asyncio.wait_for(func(*args, **kwargs), timeout)
+                return func(*args, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            semaphore = self._semaphore(policy)
+            await semaphore.acquire()
+            stats["in_flight"] += 1
+            try:
+                if policy == THREAD:
+                    work = self._get_thread_pool().submit(_call_sync, func, args, kwargs)
+                else:
+                    work = self._get_process_pool().submit(
+                        _process_entry, soul_hash, module_source, function_name, args, kwargs
+                    )
+            except BaseException:
+                self._release(semaphore, stats)
+                raise
+            # Zwolnienie dopiero po zakończeniu pracy workera - nie po timeoucie wywołującego
+            work.add_done_callback(
+                lambda _: self._call_threadsafe(loop, functools.partial(self._release, semaphore, stats))
+            )
+            # Timeout anuluje zadanie tylko, jeśli jeszcze czeka w kolejce puli
+            return await asyncio.wait_for(asyncio.wrap_future(work), timeout)
+
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            raise TimeoutError(f"Function {function_name or getattr(func, '__name__', '?')} exceeded {timeout}s ({policy})")
+        except Exception:
+            stats["errors"] += 1
+            raise
+
+    @staticmethod
+    def _release(semaphore: asyncio.Semaphore, stats: Dict[str, int]) -> None:
+        stats["in_flight"] -= 1
+        semaphore.release()
+
+    @staticmethod
+    def _call_threadsafe(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> None:
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            pass  # Pętla zamknięta - semafor i tak nie będzie już używany
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limits": dict(self.limits),
+            "default_timeouts": dict(self.default_timeouts),
+            "policies": {policy: dict(values) for policy, values in self.stats.items()}
+        }
+
+    def shutdown(self):
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+
+
+# Globalna instancja
+function_executor = FunctionExecutor()
@@ -0,0 +1,123 @@
+"""
+Tabela heartbeatów połączeń - connection_ulid -> last_seen w pamięci,
+okresowo zapisywana do PostgreSQL jednym zbiorczym upsertem.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class HeartbeatTable:
+    """Koaleskuje heartbeaty - do bazy trafia tylko ostatni znacznik czasu na połączenie"""
+
+    def __init__(self, flush_interval: float = None, stale_after: float = None):
+        self.flush_interval = flush_interval or float(os.getenv("LUXDB_HEARTBEAT_FLUSH_INTERVAL", "10"))
+        self.stale_after = stale_after or float(os.getenv("LUXDB_HEARTBEAT_STALE_AFTER", "60"))
+        self.last_seen: Dict[str, float] = {}
+        self._dirty: Dict[str, float] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        # Metryki
+        self.heartbeats_received = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def beat(self, connection_ulid: str, timestamp: float = None) -> None:
+        """Rejestruje heartbeat połączenia (tylko w pamięci)"""
+        timestamp = timestamp or time.time()
+        self.last_seen[connection_ulid] = timestamp
+        self._dirty[connection_ulid] = timestamp
+        self.heartbeats_received += 1
+        self._ensure_flush_task()
+
+    def forget(self, connection_ulid: str) -> None:
+        """Usuwa połączenie z tabeli (np. po wylogowaniu)"""
+        self.last_seen.pop(connection_ulid, None)
+        self._dirty.pop(connection_ulid, None)
+
+    def is_stale(self, connection_ulid: str, now: float = None) -> bool:
+        last_seen = self.last_seen.get(connection_ulid)
+        if last_seen is None:
+            return True
+        return (now or time.time()) - last_seen > self.stale_after
+
+    def get_stale_connections(self, now: float = None) -> List[str]:
+        """Połączenia bez heartbeatu dłużej niż stale_after"""
+        cutoff = (now or time.time()) - self.stale_after
+        return [ulid for ulid, last_seen in self.last_seen.items() if last_seen < cutoff]
+
+    def _ensure_flush_task(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+            except RuntimeError:
+                pass  # Brak pętli - flush() trzeba wywołać ręcznie
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if not self.last_seen and not self._dirty:
+                return
+
+    async def flush(self) -> int:
+        """Zapisuje zmienione heartbeaty jednym upsertem"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return 0
+
+            batch, self._dirty = self._dirty, {}
+            ulids = list(batch.keys())
+            seen_at = [datetime.fromtimestamp(ts) for ts in batch.values()]
+
+            try:
+                from .postgre_db import Postgre_db
+                pool = await Postgre_db.get_db_pool()
+                async with pool.acquire() as conn:
+                    await conn.execute("""
+                        INSERT INTO connection_heartbeats (connection_ulid, last_seen)
+                        SELECT * FROM unnest($1::varchar[], $2::timestamp[])
+                        ON CONFLICT (connection_ulid) DO UPDATE
+                        SET last_seen = GREATEST(connection_heartbeats.last_seen, EXCLUDED.last_seen)
+                    """, ulids, seen_at)
+            except Exception as e:
+                # Przywróć niezapisane wpisy (nowsze heartbeaty mają pierwszeństwo)
+                for ulid, ts in batch.items():
+                    if ts >= self._dirty.get(ulid, 0):
+                        self._dirty[ulid] = ts
+                self.flush_errors += 1
+                print(f"❌ Błąd zapisu heartbeatów: {e}")
+                return 0
+
+            self.rows_written += len(ulids)
+            self.flushes += 1
+            return len(ulids)
+
+    async def prune_stale(self) -> List[str]:
+        """Usuwa z pamięci nieaktywne połączenia i zwraca ich listę"""
+        stale = self.get_stale_connections()
+        for ulid in stale:
+            self.forget(ulid)
+        return stale
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "tracked_connections": len(self.last_seen),
+            "pending_writes": len(self._dirty),
+            "heartbeats_received": self.heartbeats_received,
+            "rows_written": self.rows_written,
+            "writes_avoided": self.heartbeats_received - self.rows_written - len(self._dirty),
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "flush_interval": self.flush_interval,
+            "stale_after": self.stale_after
+        }
+
+
+# Globalna instancja
+heartbeat_table = HeartbeatTable()
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from luxdb.models.soul import Soul
 from luxdb.models.being import Being
+from .master_directory import master_directory
+from .alias_registry import MAPPING_COLUMNS, alias_registry
 
 class IntelligentKernel:
     """
@@ -22,8 +24,8 @@ class IntelligentKernel:
 
     def __init__(self):
         self.kernel_being: Optional[Being] = None
-        self.alias_mappings: Dict[str, str] = {}  # alias -> soul_hash
-        self.alias_history: Dict[str, List[Dict]] = {}
+        self.alias_registry = alias_registry  # tabele alias_registry / alias_history
+        self.alias_mappings: Dict[str, Dict[str, Any]] = alias_registry.mappings  # alias -> mapowanie (cache)
         self.managed_beings: List[Dict] = []
 
         # Registry aktywnych instancji
@@ -31,6 +33,7 @@ class IntelligentKernel:
         self.soul_cache: Dict[str, 'Soul'] = {}      # soul_hash -> Soul instance
         self.session_beings: Dict[str, List[str]] = {}  # session_id -> [being_ulids]
         self.fingerprint_mappings: Dict[str, str] = {}  # fingerprint -> lux_being_ulid
+        self.master_directory = master_directory  # soul_hash -> Master Being (ciepłe instancje)
 
         self.active = False
 
@@ -76,8 +79,6 @@ class IntelligentKernel:
                 "description": "Główny inteligentny byt systemu z funkcjami registry"
             },
             "attributes": {
-                "alias_mappings": {"py_type": "dict", "default": {}},
-                "alias_history": {"py_type": "dict", "default": {}},
                 "managed_beings": {"py_type": "list", "default": []},
                 "registry_stats": {"py_type": "dict", "default": {}}
             },
@@ -101,17 +102,14 @@ def execute(request=None, being_context=None, **kwargs):
 
     action = request.get('action') if isinstance(request, dict) else str(request)
 
-    if action == 'register_alias':
-        return register_alias_mapping(
-            request.get('alias'), 
-            request.get('soul_hash'), 
-            being_context
-        )
-    elif action == 'get_current_hash':
-        return get_current_hash_for_alias(
-            request.get('alias'), 
-            being_context
-        )
+    if action in ('register_alias', 'get_current_hash'):
+        # Aliasy są w tabelach alias_registry / alias_history - obsługuje je IntelligentKernel
+        return {
+            "delegated_to": "kernel_method",
+            "method": "register_alias_mapping" if action == 'register_alias' else "get_current_hash_for_alias",
+            "alias": request.get('alias'),
+            "soul_hash": request.get('soul_hash')
+        }
     elif action == 'create_being_by_alias':
         return create_being_by_alias(
             request.get('alias'),
@@ -124,58 +122,6 @@ def execute(request=None, being_context=None, **kwargs):
     else:
         return {"status": "processed", "action": action, "kernel_active": True}
 
-def register_alias_mapping(alias, soul_hash, being_context):
-    """Rejestruje mapowanie alias -> soul_hash"""
-    if not being_context.get('data'):
-        being_context['data'] = {}
-
-    if 'alias_mappings' not in being_context['data']:
-        being_context['data']['alias_mappings'] = {}
-
-    if 'alias_history' not in being_context['data']:
-        being_context['data']['alias_history'] = {}
-
-    old_hash = being_context['data']['alias_mappings'].get(alias)
-    being_context['data']['alias_mappings'][alias] = soul_hash
-
-    # Historia zmian
-    if alias not in being_context['data']['alias_history']:
-        being_context['data']['alias_history'][alias] = []
-
-    being_context['data']['alias_history'][alias].append({
-        "soul_hash": soul_hash,
-        "updated_at": "2025-01-30T00:00:00",
-        "previous_hash": old_hash
-    })
-
-    return {
-        "success": True,
-        "alias": alias,
-        "soul_hash": soul_hash,
-        "previous_hash": old_hash,
-        "is_update": old_hash is not None
-    }
-
-def get_current_hash_for_alias(alias, being_context):
-    """Pobiera aktualny hash dla aliasu"""
-    alias_mappings = being_context.get('data', {}).get('alias_mappings', {})
-    soul_hash = alias_mappings.get(alias)
-
-    if soul_hash:
-        return {
-            "success": True,
-            "alias": alias,
-            "soul_hash": soul_hash,
-            "found": True
-        }
-    else:
-        return {
-            "success": False,
-            "alias": alias,
-            "found": False,
-            "error": f"No soul hash found for alias '{alias}'"
-        }
-
 def create_being_by_alias(soul_alias, attributes=None, persistent=True, being_context=None):
     """Kernel tworzy Being na podstawie aliasu Soul"""
     print(f"🧠 Kernel creating being from soul alias: {soul_alias}")
@@ -210,8 +156,14 @@ def cleanup_expired_beings(being_context):
             return
 
         data = self.kernel_being.data
-        self.alias_mappings = data.get('alias_mappings', {})
-        self.alias_history = data.get('alias_history', {})
+
+        # Aliasy żyją w tabelach alias_registry / alias_history (stare dane z Being są tam migrowane)
+        try:
+            await self.alias_registry.load()
+        except Exception as e:
+            print(f"⚠️ Alias registry load failed: {e}")
+        self.alias_mappings = self.alias_registry.mappings
+
         self.managed_beings = data.get('managed_beings', [])
         self.auto_update_configs = data.get('auto_update_configs', {})
         self.fingerprint_mappings = data.get('fingerprint_mappings', {})
@@ -228,8 +180,10 @@ def cleanup_expired_beings(being_context):
         if not self.kernel_being:
             return
 
-        self.kernel_being.data['alias_mappings'] = self.alias_mappings
-        self.kernel_being.data['alias_history'] = self.alias_history
+        # Aliasy i ich historia są w tabelach alias_registry / alias_history
+        if self.alias_registry.loaded:
+            self.kernel_being.data.pop('alias_mappings', None)
+            self.kernel_being.data.pop('alias_history', None)
         self.kernel_being.data['managed_beings'] = self.managed_beings
         self.kernel_being.data['auto_update_configs'] = getattr(self, 'auto_update_configs', {})
         self.kernel_being.data['fingerprint_mappings'] = self.fingerprint_mappings
@@ -250,17 +204,22 @@ def cleanup_expired_beings(being_context):
 
         await self.kernel_being.save()
 
+    def _invalidate_replaced_mapping(self, old_mapping: Any, soul_hash: str, being_ulid: str = None):
+        """Unieważnia katalog Master Being gdy alias wskazuje na inną Soul lub inny Being"""
+        if isinstance(old_mapping, dict) and old_mapping.get("type") == "master":
+            old_hash = old_mapping.get("soul_hash")
+            if old_hash and old_hash != soul_hash:
+                self.master_directory.invalidate(old_hash)
+
+        current = self.master_directory.get(soul_hash)
+        if current is not None and getattr(current, "ulid", None) != being_ulid:
+            self.master_directory.invalidate(soul_hash)
+
     async def register_soul_template(self, alias: str, soul_hash: str) -> Dict[str, Any]:
         """Rejestruje Template Soul - używaną tylko do tworzenia Being"""
         old_hash = self.alias_mappings.get(alias)
-        self.alias_mappings[alias] = {
-            "soul_hash": soul_hash,
-            "type": "template",
-            "for_creation_only": True,
-            "registered_at": datetime.now().isoformat()
-        }
-
-        await self._save_registry_data()
+        self._invalidate_replaced_mapping(old_hash, soul_hash)
+        await self.alias_registry.set(alias, soul_hash, "template", metadata={"for_creation_only": True})
 
         print(f"📝 Registered template soul: {alias} → {soul_hash[:8]}...")
         return {
@@ -273,15 +232,8 @@ def cleanup_expired_beings(being_context):
     async def register_master_soul(self, alias: str, soul_hash: str, being_ulid: str) -> Dict[str, Any]:
         """Rejestruje Master Soul z konkretną instancją Being"""
         old_hash = self.alias_mappings.get(alias)
-        self.alias_mappings[alias] = {
-            "soul_hash": soul_hash,
-            "being_ulid": being_ulid,
-            "type": "master",
-            "has_instance": True,
-            "registered_at": datetime.now().isoformat()
-        }
-
-        await self._save_registry_data()
+        self._invalidate_replaced_mapping(old_hash, soul_hash, being_ulid)
+        await self.alias_registry.set(alias, soul_hash, "master", being_ulid, metadata={"has_instance": True})
 
         print(f"👑 Registered master soul: {alias} → {soul_hash[:8]}... (Being: {being_ulid[:8]}...)")
         return {
@@ -374,15 +326,41 @@ def cleanup_expired_beings(being_context):
         else:
             return result
 
+    async def register_alias_mapping(self, alias: str, soul_hash: str, auto_update: bool = False) -> Dict[str, Any]:
+        """Przepina alias na soul_hash (zachowuje typ i Being mastera)"""
+        current = await self.alias_registry.get(alias) or {}
+        alias_type = current.get("type", "template")
+        being_ulid = current.get("being_ulid")
+        self._invalidate_replaced_mapping(current, soul_hash, being_ulid)
+
+        metadata = {k: v for k, v in current.items() if k not in MAPPING_COLUMNS}
+        metadata["auto_update"] = auto_update
+        mapping = await self.alias_registry.set(alias, soul_hash, alias_type, being_ulid, metadata=metadata)
+
+        return {
+            "success": True,
+            "alias": alias,
+            "old_hash": current.get("soul_hash"),
+            "soul_hash": soul_hash,
+            "type": alias_type,
+            "version": mapping["version"]
+        }
+
+    async def get_alias_history(self, alias: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Historia zmian aliasu z tabeli alias_history"""
+        return await self.alias_registry.history(alias, limit)
+
     async def get_current_hash_for_alias(self, alias: str) -> Dict[str, Any]:
-        """Pobiera aktualny hash dla aliasu"""
-        soul_hash = self.alias_mappings.get(alias)
+        """Pobiera aktualny hash dla aliasu (cache w pamięci, potem odczyt po kluczu)"""
+        mapping = await self.alias_registry.get(alias)
 
-        if soul_hash:
+        if mapping:
             return {
                 "success": True,
                 "alias": alias,
-                "soul_hash": soul_hash,
+                "soul_hash": mapping["soul_hash"],
+                "type": mapping.get("type"),
+                "version": mapping.get("version"),
                 "found": True
             }
         else:
@@ -640,24 +618,26 @@ def cleanup_expired_beings(being_context):
             }
 
     async def _find_or_create_master_soul_being(self, soul_hash: str):
-        """Znajduje lub tworzy Master Soul Being dla danego soul_hash"""
-        try:
-            # Sprawdź registry
-            for alias, mapping in self.alias_mappings.items():
-                if (isinstance(mapping, dict) and 
-                    mapping.get("soul_hash") == soul_hash and 
-                    mapping.get("type") == "master"):
-
-                    being_ulid = mapping.get("being_ulid")
-                    if being_ulid in self.active_beings:
-                        return self.active_beings[being_ulid]
+        """Znajduje lub tworzy Master Soul Being dla danego soul_hash (przez katalog Master Being)"""
+        return await self.master_directory.get_or_load(
+            soul_hash, lambda: self._load_master_soul_being(soul_hash)
+        )
 
-                    # Załaduj z bazy
-                    from ..models.being import Being
-                    master_being = await Being._get_by_ulid_internal(being_ulid)
-                    if master_being:
-                        await self.register_active_being(master_being)
-                        return master_being
+    async def _load_master_soul_being(self, soul_hash: str):
+        """Ładuje z bazy lub tworzy Master Soul Being - wywoływane tylko przy braku w katalogu"""
+        try:
+            # Sprawdź registry (indeks soul_hash -> aliasy)
+            for alias in self.alias_registry.aliases_for_soul(soul_hash, "master"):
+                being_ulid = self.alias_mappings[alias].get("being_ulid")
+                if being_ulid in self.active_beings:
+                    return self.active_beings[being_ulid]
+
+                # Załaduj z bazy
+                from ..models.being import Being
+                master_being = await Being._get_by_ulid_internal(being_ulid)
+                if master_being:
+                    await self.register_active_being(master_being)
+                    return master_being
 
             # Jeśli nie znaleziono, spróbuj utworzyć nowego mastera
             from ..repository.soul_repository import SoulRepository
@@ -730,9 +710,11 @@ def cleanup_expired_beings(being_context):
             being = self.active_beings.pop(ulid, None)
             if being:
                 removed_count += 1
+                self.master_directory.invalidate_being(ulid)
                 print(f"⏰ Removed expired being: {being.alias} ({ulid[:8]}...)")
 
-        await self._save_registry_data()
+        if removed_count:
+            await self._save_registry_data()
 
         return {
             "cleanup_completed": True,
@@ -749,8 +731,14 @@ def cleanup_expired_beings(being_context):
             "aliases_count": len(self.alias_mappings),
             "managed_beings_count": len(self.managed_beings),
             "registry_mappings": self.alias_mappings,
+            "master_directory": self.master_directory.get_stats(),
             "last_update": datetime.now().isoformat()
         }
 
 # Globalna instancja
-intelligent_kernel = IntelligentKernel()
\ No newline at end of file
+intelligent_kernel = IntelligentKernel()
+
+from .memory_accounting import memory_accountant
+memory_accountant.register("intelligent_kernel.active_beings", lambda: intelligent_kernel.active_beings)
+memory_accountant.register("intelligent_kernel.soul_cache", lambda: intelligent_kernel.soul_cache)
+memory_accountant.register("intelligent_kernel.session_beings", lambda: intelligent_kernel.session_beings)
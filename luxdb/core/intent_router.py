@@ -0,0 +1,242 @@
+"""
+Router intencji -> funkcja Soul z indeksem budowanym raz na Soul.
+
+Dokument funkcji to jej nazwa (rozbita na słowa), docstring oraz opis
+z genotypu ("functions": {"name": {"description": ...}}). Dokumenty są
+wektoryzowane TF-IDF (scikit-learn z extras "ai", a bez niego prosta
+implementacja o tej samej normalizacji), a routing to jeden iloczyn
+skalarny macierzy rzadkiej z wektorem intencji.
+
+Przed TF-IDF działa ścieżka dokładna: trie po słowach nazw funkcji
+("calculate total", "run calculate_total" -> calculate_total).
+Tylko dopasowanie dokładne wybiera funkcję do wykonania - wyniki TF-IDF
+(bez słów nieistotnych, powyżej min_score) są jedynie podpowiedziami.
+Routery są cache'owane po soul_hash.
+"""
+
+import math
+import os
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+except ImportError:  # extras "ai" nie są zainstalowane
+    TfidfVectorizer = None
+
+# Słowa poprzedzające nazwę funkcji w intencji ("execute add", "run report")
+COMMAND_WORDS = {"execute", "run", "call", "invoke"}
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+DEFAULT_MIN_SCORE = float(os.getenv("LUXDB_INTENT_MIN_SCORE", "0.3"))
+
+# Słowa nieistotne - nie mogą same dopasować intencji do funkcji
+STOP_WORDS = frozenset("""
+    a an the of to in on at by for from with and or not no is are was were be been
+    it its this that these those what which who whom how when where why do does did
+    i me my we our you your he she they them their please can could would should will
+    all any some just about into than then there here as if so
+""".split()) | COMMAND_WORDS
+
+
+def tokenize(text: str) -> List[str]:
+    """Dzieli tekst na słowa (także snake_case i camelCase)"""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", str(text or ""))
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def content_tokens(text: str) -> List[str]:
+    """Słowa tekstu bez słów nieistotnych - wejście TF-IDF"""
+    return [token for token in tokenize(text) if token not in STOP_WORDS]
+
+
+def build_function_documents(function_names: Iterable[str], genotype: Dict[str, Any] = None,
+                             functions: Dict[str, Callable] = None) -> Dict[str, str]:
+    """Składa dokument tekstowy dla każdej funkcji"""
+    definitions = (genotype or {}).get("functions", {})
+    documents = {}
+    for name in function_names:
+        parts = [" ".join(tokenize(name))] * 2  # nazwa waży więcej niż opis
+        func = (functions or {}).get(name)
+        if func is not None and getattr(func, "__doc__", None):
+            parts.append(func.__doc__)
+        definition = definitions.get(name) if isinstance(definitions, dict) else None
+        if isinstance(definition, dict):
+            parts.extend(str(definition.get(key, "")) for key in ("description", "summary", "intent"))
+            parts.extend(str(tag) for tag in definition.get("keywords", []) or [])
+        documents[name] = " ".join(part for part in parts if part)
+    return documents
+
+
+class _TokenTrie:
+    """Trie po słowach nazw funkcji - dokładne dopasowanie bez TF-IDF"""
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {}
+
+    def insert(self, tokens: List[str], value: str) -> None:
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(None, value)
+
+    def lookup(self, tokens: List[str]) -> Optional[str]:
+        node = self.root
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                return None
+        return node.get(None)
+
+
+class _SparseTfidf:
+    """Minimalny TF-IDF (smooth idf, sublinear=False, norma L2) gdy brak scikit-learn"""
+
+    def __init__(self, documents: List[str]):
+        tokenized = [content_tokens(doc) for doc in documents]
+        document_frequency = Counter(token for tokens in tokenized for token in set(tokens))
+        n = len(documents)
+        self.idf = {token: math.log((1 + n) / (1 + df)) + 1 for token, df in document_frequency.items()}
+
+        # Indeks odwrócony: token -> [(indeks dokumentu, waga)]
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        for index, tokens in enumerate(tokenized):
+            for token, weight in self._vector(tokens).items():
+                self.postings.setdefault(token, []).append((index, weight))
+
+    def _vector(self, tokens: List[str]) -> Dict[str, float]:
+        counts = Counter(token for token in tokens if token in self.idf)
+        vector = {token: count * self.idf[token] for token, count in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {token: value / norm for token, value in vector.items()} if norm else {}
+
+    def scores(self, text: str, size: int) -> List[float]:
+        result = [0.0] * size
+        for token, weight in self._vector(content_tokens(text)).items():
+            for index, doc_weight in self.postings.get(token, ()):
+                result[index] += weight * doc_weight
+        return result
+
+
+class IntentRouter:
+    """Indeks funkcji jednej Soul"""
+
+    def __init__(self, documents: Dict[str, str], min_score: float = DEFAULT_MIN_SCORE):
+        self.function_names = list(documents.keys())
+        self.min_score = min_score
+
+        self.trie = _TokenTrie()
+        for name in self.function_names:
+            self.trie.insert([name.lower()], name)
+            self.trie.insert(tokenize(name), name)
+
+        self._matrix = None
+        self._vectorizer = None
+        self._fallback: Optional[_SparseTfidf] = None
+        if self.function_names:
+            corpus = [documents[name] for name in self.function_names]
+            if TfidfVectorizer is not None:
+                self._vectorizer = TfidfVectorizer(tokenizer=content_tokens, lowercase=False, token_pattern=None)
+                self._matrix = self._vectorizer.fit_transform(corpus)
+            else:
+                self._fallback = _SparseTfidf(corpus)
+
+    def exact_match(self, intent: str) -> Optional[str]:
+        """Nazwa funkcji, gdy intencja to dokładnie nazwa (opcjonalnie po 'run'/'execute')"""
+        text = str(intent or "").strip()
+        match = self.trie.lookup([text.lower()]) or self.trie.lookup(tokenize(text))
+        if match:
+            return match
+
+        words = text.split()
+        for i, word in enumerate(words[:-1]):
+            if word.lower() in COMMAND_WORDS:
+                rest = words[i + 1:]
+                match = self.trie.lookup([rest[0].lower()]) or self.trie.lookup(tokenize(" ".join(rest)))
+                if match:
+                    return match
+        return None
+
+    def scores(self, intent: str) -> List[float]:
+        if not self.function_names:
+            return []
+        if self._vectorizer is not None:
+            query = self._vectorizer.transform([str(intent)])
+            return (self._matrix @ query.T).toarray().ravel().tolist()
+        return self._fallback.scores(str(intent), len(self.function_names))
+
+    def rank(self, intent: str, limit: int = 5, candidates: Iterable[str] = None) -> List[Tuple[str, float]]:
+        """Funkcje uporządkowane wg podobieństwa do intencji"""
+        allowed = set(candidates) if candidates is not None else None
+        ranked = [
+            (name, score) for name, score in zip(self.function_names, self.scores(intent))
+            if score > 0 and (allowed is None or name in allowed)
+        ]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+    def route(self, intent: str, candidates: Iterable[str] = None) -> Optional[Tuple[str, float]]:
+        """
+        Funkcja do wykonania: (funkcja, 1.0) tylko przy dokładnym dopasowaniu nazwy,
+        inaczej None - podobne funkcje zwraca suggest()
+        """
+        candidates = list(candidates) if candidates is not None else None
+        exact = self.exact_match(intent)
+        if exact and (candidates is None or exact in candidates):
+            return exact, 1.0
+        return None
+
+    def suggest(self, intent: str, limit: int = 3, candidates: Iterable[str] = None) -> List[Tuple[str, float]]:
+        """Podobne funkcje (TF-IDF >= min_score) - do podpowiedzi, nie do wykonania"""
+        return [
+            (name, score) for name, score in self.rank(intent, limit=limit, candidates=candidates)
+            if score >= self.min_score
+        ]
+
+
+class IntentRouterCache:
+    """Routery po soul_hash (LRU)"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or int(os.getenv("LUXDB_INTENT_ROUTER_CACHE", "256"))
+        self._routers: "OrderedDict[str, IntentRouter]" = OrderedDict()
+        self.builds = 0
+
+    def get(self, soul_hash: str) -> Optional[IntentRouter]:
+        router = self._routers.get(soul_hash)
+        if router is not None:
+            self._routers.move_to_end(soul_hash)
+        return router
+
+    def build(self, soul_hash: str, documents: Dict[str, str]) -> IntentRouter:
+        router = IntentRouter(documents)
+        self._routers[soul_hash] = router
+        self._routers.move_to_end(soul_hash)
+        while len(self._routers) > self.max_entries:
+            self._routers.popitem(last=False)
+        self.builds += 1
+        return router
+
+    def for_soul(self, soul) -> IntentRouter:
+        """Router dla Soul - budowany przy pierwszym użyciu lub po zmianie zestawu funkcji"""
+        router = self.get(soul.soul_hash)
+        function_names = list(soul._function_registry.keys())
+        if router is None or router.function_names != function_names:
+            documents = build_function_documents(function_names, soul.genotype, soul._function_registry)
+            router = self.build(soul.soul_hash, documents)
+        return router
+
+    def invalidate(self, soul_hash: str) -> None:
+        self._routers.pop(soul_hash, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "routers": len(self._routers),
+            "max_entries": self.max_entries,
+            "builds": self.builds,
+            "backend": "sklearn" if TfidfVectorizer is not None else "builtin"
+        }
+
+
+# Globalna instancja
+intent_routers = IntentRouterCache()
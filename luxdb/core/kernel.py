@@ -624,3 +624,8 @@ def execute(request=None, being_context=None, **kwargs):
 
 # Globalna instancja
 unified_kernel = UnifiedKernel()
+
+from .memory_accounting import memory_accountant
+memory_accountant.register("unified_kernel.active_tasks", lambda: unified_kernel.active_tasks)
+memory_accountant.register("unified_kernel.active_beings", lambda: unified_kernel.active_beings)
+memory_accountant.register("unified_kernel.alias_history", lambda: unified_kernel.alias_history)
@@ -0,0 +1,328 @@
+"""
+Brama LLM - wspólna ścieżka dla wszystkich zapytań do modeli językowych.
+
+- cache odpowiedzi adresowany treścią (hash model + messages + parametry),
+  z TTL, w pamięci (LRU) i na dysku (SQLite w wątku, jak cache funkcji Soul)
+- łączenie identycznych zapytań w locie - N równoczesnych wywołań
+  z tym samym promptem to jedno zapytanie do dostawcy
+- globalny limit współbieżności i limit zapytań na sekundę
+- wymienne backendy: "openai" oraz lokalny "fake" do testów i benchmarków
+  (tylko jawnie: LUXDB_LLM_BACKEND=fake albo backend="fake")
+- odpowiedzi bez treści (wywołania narzędzi) nie są cache'owane
+
+Użycie:
+    from luxdb.core.llm_gateway import llm_gateway
+    response = await llm_gateway.chat([{"role": "user", "content": "..."}], model="gpt-4")
+    print(response.content, response.cached)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .function_cache import _MISSING, DiskCacheStore
+
+
+@dataclass
+class LLMResponse:
+    """Odpowiedź modelu zwracana przez bramę"""
+    content: str
+    model: str
+    usage: Dict[str, Any] = field(default_factory=dict)
+    cached: bool = False
+    coalesced: bool = False
+    latency_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "content": self.content,
+            "model": self.model,
+            "usage": self.usage,
+            "cached": self.cached,
+            "coalesced": self.coalesced,
+            "latency_ms": round(self.latency_ms, 2)
+        }
+
+
+class LLMBackend:
+    """Interfejs backendu: complete(model, messages, params) -> {"content", "usage"}"""
+
+    name = "base"
+
+    async def complete(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """Backend OpenAI - używa podanego klienta albo tworzy AsyncOpenAI z OPENAI_API_KEY"""
+
+    name = "openai"
+
+    def __init__(self, client: Any = None, api_key: str = None):
+        self.client = client
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+
+    def _get_client(self):
+        if self.client is None:
+            import openai
+            if hasattr(openai, "AsyncOpenAI"):
+                self.client = openai.AsyncOpenAI(api_key=self.api_key)
+        return self.client
+
+    async def complete(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        client = self._get_client()
+        if client is not None:
+            response = await client.chat.completions.create(model=model, messages=messages, **params)
+        else:
+            # Starsze SDK (openai<1.0)
+            import openai
+            openai.api_key = self.api_key
+            response = await openai.ChatCompletion.acreate(model=model, messages=messages, **params)
+
+        usage = getattr(response, "usage", None)
+        if usage is not None and hasattr(usage, "model_dump"):
+            usage = usage.model_dump()
+        return {"content": response.choices[0].message.content, "usage": dict(usage or {})}
+
+
+class FakeBackend(LLMBackend):
+    """Lokalny backend bez sieci - deterministyczne odpowiedzi ze stałym opóźnieniem"""
+
+    name = "fake"
+
+    def __init__(self, latency: float = None, responder: Callable[[str, List[Dict[str, Any]]], str] = None):
+        self.latency = latency if latency is not None else float(os.getenv("LUXDB_LLM_FAKE_LATENCY", "0.05"))
+        self.responder = responder
+        self.calls = 0
+
+    async def complete(self, model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.responder is not None:
+            content = self.responder(model, messages)
+        else:
+            last = str(messages[-1].get("content", "")) if messages else ""
+            digest = hashlib.sha256(last.encode()).hexdigest()[:12]
+            content = f"[fake:{model}:{digest}] {last[:80]}"
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+        return {
+            "content": content,
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content.split())}
+        }
+
+
+class RateLimiter:
+    """Token bucket - rate zapytań na sekundę (0 = bez limitu)"""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+
+
+def make_request_key(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    """Klucz cache - hash treści zapytania"""
+    payload = {"model": model, "messages": messages, "params": params}
+    encoded = json.dumps(payload, sort_keys=True, default=repr, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class LLMGateway:
+    """Cache, łączenie zapytań w locie i limity przed backendami LLM"""
+
+    def __init__(self, default_backend: str = None, max_concurrency: int = None, rate_per_second: float = None,
+                 default_ttl: float = None, max_entries: int = None, disk_cache: bool = None,
+                 disk_store: DiskCacheStore = None):
+        self.default_backend = default_backend or os.getenv("LUXDB_LLM_BACKEND", "openai")
+        self.max_concurrency = max_concurrency or int(os.getenv("LUXDB_LLM_CONCURRENCY", "8"))
+        self.rate_per_second = rate_per_second if rate_per_second is not None else float(os.getenv("LUXDB_LLM_RATE_PER_SEC", "0"))
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("LUXDB_LLM_CACHE_TTL", "3600"))
+        self.max_entries = max_entries or int(os.getenv("LUXDB_LLM_CACHE_ENTRIES", "2048"))
+        self.disk_cache = disk_cache if disk_cache is not None else os.getenv("LUXDB_LLM_DISK_CACHE", "1") == "1"
+        self._disk_store = disk_store
+
+        self.backends: Dict[str, LLMBackend] = {"openai": OpenAIBackend(), "fake": FakeBackend()}
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter: Optional[RateLimiter] = None
+
+        self.stats = {
+            "requests": 0, "memory_hits": 0, "disk_hits": 0, "coalesced": 0,
+            "backend_calls": 0, "errors": 0, "backend_time_ms": 0.0
+        }
+
+    @property
+    def disk_store(self) -> DiskCacheStore:
+        if self._disk_store is None:
+            self._disk_store = DiskCacheStore(
+                os.getenv("LUXDB_LLM_CACHE_PATH", os.path.join(".luxdb_cache", "llm.sqlite"))
+            )
+        return self._disk_store
+
+    def register_backend(self, name: str, backend: LLMBackend) -> None:
+        self.backends[name] = backend
+
+    def _resolve_backend(self, backend: Union[str, LLMBackend, None]) -> LLMBackend:
+        if isinstance(backend, LLMBackend):
+            return backend
+        name = backend or self.default_backend
+        if name not in self.backends:
+            raise ValueError(f"Unknown LLM backend: {name}")
+        return self.backends[name]
+
+    async def _cache_get(self, key: str, model: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or expires_at >= time.time():
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value
+            del self._entries[key]
+
+        if self.disk_cache:
+            entry = await asyncio.to_thread(self.disk_store.get_entry, "llm", model, key)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                self._remember(key, value, expires_at)  # zachowuje wygaśnięcie z dysku
+                self.stats["disk_hits"] += 1
+                return value
+        return _MISSING
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: Optional[float]) -> None:
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _cache_put(self, key: str, model: str, value: Dict[str, Any], ttl: Optional[float]) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        self._remember(key, value, expires_at)
+        if self.disk_cache:
+            await asyncio.to_thread(self.disk_store.put, "llm", model, key, value, expires_at)
+
+    async def _call_backend(self, backend: LLMBackend, model: str, messages: List[Dict[str, Any]],
+                            params: Dict[str, Any]) -> Dict[str, Any]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter(self.rate_per_second)
+
+        async with self._semaphore:
+            await self._rate_limiter.acquire()
+            started = time.perf_counter()
+            self.stats["backend_calls"] += 1
+            try:
+                return await backend.complete(model, messages, params)
+            finally:
+                self.stats["backend_time_ms"] += (time.perf_counter() - started) * 1000
+
+    async def chat(self, messages: List[Dict[str, Any]], model: str = "gpt-4",
+                   backend: Union[str, LLMBackend, None] = None, use_cache: bool = True,
+                   ttl: float = None, **params) -> LLMResponse:
+        """
+        Wysyła zapytanie czatowe przez bramę.
+
+        Parametry z wartością None są pomijane (np. tools=None).
+        use_cache=False wyłącza cache, ale nie łączenie zapytań w locie.
+        """
+        started = time.perf_counter()
+        params = {k: v for k, v in params.items() if v is not None}
+        backend_impl = self._resolve_backend(backend)
+        key = make_request_key(f"{backend_impl.name}:{model}", messages, params)
+        ttl = self.default_ttl if ttl is None else ttl
+        self.stats["requests"] += 1
+
+        def build(result: Dict[str, Any], cached: bool = False, coalesced: bool = False) -> LLMResponse:
+            return LLMResponse(
+                content=result.get("content"),
+                model=model,
+                usage=result.get("usage", {}),
+                cached=cached,
+                coalesced=coalesced,
+                latency_ms=(time.perf_counter() - started) * 1000
+            )
+
+        if use_cache:
+            cached = await self._cache_get(key, model)
+            if cached is not _MISSING:
+                return build(cached, cached=True)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return build(await asyncio.shield(inflight), coalesced=True)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._call_backend(backend_impl, model, messages, params)
+            if use_cache and result.get("content") is not None:
+                await self._cache_put(key, model, result, ttl)
+            future.set_result(result)
+            return build(result)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            future.exception()  # oznacz jako odebrany, gdy nikt nie czekał
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def complete_text(self, prompt: str, model: str = "gpt-4", system: str = None, **kwargs) -> str:
+        """Skrót: pojedynczy prompt -> treść odpowiedzi"""
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return (await self.chat(messages, model=model, **kwargs)).content
+
+    def clear_cache(self, disk: bool = False) -> None:
+        self._entries.clear()
+        if disk and self.disk_cache:
+            self.disk_store.clear("llm")
+
+    def get_stats(self) -> Dict[str, Any]:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "backend_time_ms": round(self.stats["backend_time_ms"], 2),
+            "hit_rate": round(hits / self.stats["requests"], 4) if self.stats["requests"] else 0.0,
+            "cache_entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "default_backend": self.default_backend,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": self.rate_per_second,
+            "rate_limit_wait_s": round(self._rate_limiter.waited_seconds, 3) if self._rate_limiter else 0.0
+        }
+
+
+# Globalna instancja
+llm_gateway = LLMGateway()
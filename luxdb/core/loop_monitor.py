@@ -0,0 +1,219 @@
+"""
+Monitor opóźnień pętli zdarzeń i wykrywacz blokujących wywołań.
+
+Sonda (zadanie w pętli) śpi `interval` sekund i mierzy, o ile później
+się obudziła - to opóźnienie (lag) pętli. Próbki trafiają do okna,
+z którego liczone są percentyle.
+
+Watchdog to osobny wątek: gdy sonda nie odezwała się dłużej niż
+`interval + threshold`, pobiera ramkę wątku pętli (sys._current_frames())
+i zapisuje jej stos - to kod, który trzyma pętlę (synchroniczne funkcje
+Soul, PBKDF2, subprocess.run, open()/json.dump...). Stosy z jednego
+epizodu są zliczane, a po przebudzeniu sonda zapisuje zdarzenie z
+najczęstszym stosem i zmierzonym czasem blokady.
+"""
+
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Ramki z tych modułów nie wskazują winowajcy blokady
+_SKIPPED_MODULES = ("asyncio", "selectors", "threading", "concurrent")
+
+Stack = Tuple[str, ...]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _format_stack(frame, limit: int) -> Stack:
+    """Stos od najbardziej zewnętrznej do najbardziej wewnętrznej ramki (`limit` najgłębszych)"""
+    return tuple(
+        f"{summary.filename}:{summary.lineno} in {summary.name}"
+        for summary in traceback.extract_stack(frame, limit=limit)
+    )
+
+
+def _culprit(stack: Stack) -> str:
+    """Najgłębsza ramka spoza asyncio/selectors"""
+    for line in reversed(stack):
+        path = line.split(":", 1)[0].replace("\\", "/")
+        if not any(f"/{module}/" in path or path.endswith(f"/{module}.py") for module in _SKIPPED_MODULES):
+            return line
+    return stack[-1] if stack else "unknown"
+
+
+class LoopMonitor:
+    """Mierzy lag pętli zdarzeń i próbkuje stosy kodu, który ją blokuje"""
+
+    def __init__(self, interval: float = None, threshold: float = None,
+                 window: int = None, max_events: int = None, stack_limit: int = 30):
+        self.interval = interval or float(os.getenv("LUXDB_LOOP_MONITOR_INTERVAL", "0.1"))
+        self.threshold = threshold or float(os.getenv("LUXDB_LOOP_BLOCK_THRESHOLD", "0.1"))
+        self.stack_limit = stack_limit
+
+        self.samples: Deque[float] = deque(maxlen=window or int(os.getenv("LUXDB_LOOP_MONITOR_WINDOW", "1000")))
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events or int(os.getenv("LUXDB_LOOP_MONITOR_EVENTS", "50")))
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._pending: Optional[Dict[str, Any]] = None
+
+        self.stats = {"blocks": 0, "blocked_ms": 0.0, "max_lag_ms": 0.0, "stack_samples": 0}
+
+    # --- cykl życia ---
+
+    def start(self) -> bool:
+        """Uruchamia sondę i watchdog w bieżącej pętli (idempotentne)"""
+        if self._task is not None and not self._task.done():
+            return True
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False  # Brak pętli - start() trzeba wywołać z korutyny
+
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = self._loop.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="luxdb-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        return True
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # --- sonda (wątek pętli) ---
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._heartbeat = time.monotonic()
+
+            self.samples.append(lag)
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag * 1000)
+            with self._lock:
+                pending, self._pending = self._pending, None
+            if lag >= self.threshold:
+                self._record_block(lag, pending)
+
+    def _record_block(self, lag: float, pending: Optional[Dict[str, Any]]) -> None:
+        stacks: Counter = pending["stacks"] if pending else Counter()
+        stack, hits = stacks.most_common(1)[0] if stacks else ((), 0)
+        event = {
+            "detected_at": pending["detected_at"] if pending else datetime.now().isoformat(),
+            "duration_ms": round(lag * 1000, 1),
+            "task": pending["task"] if pending else None,
+            "culprit": _culprit(stack) if stack else None,
+            "stack": list(stack),
+            "samples": sum(stacks.values()),
+            "distinct_stacks": len(stacks),
+            "stack_share": round(hits / sum(stacks.values()), 2) if stacks else 0.0
+        }
+        self.events.append(event)
+        self.stats["blocks"] += 1
+        self.stats["blocked_ms"] += lag * 1000
+        print(f"🐢 Event loop blocked for {event['duration_ms']:.0f} ms"
+              + (f" in {event['culprit']}" if event["culprit"] else " (no stack sampled)"))
+
+    # --- watchdog (osobny wątek) ---
+
+    def _watch(self) -> None:
+        sample_every = min(self.interval, self.threshold) / 2
+        while not self._stopping.wait(sample_every):
+            if time.monotonic() - self._heartbeat < self.interval + self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            try:
+                stack = _format_stack(frame, self.stack_limit)
+            finally:
+                del frame
+
+            with self._lock:
+                if self._pending is None:
+                    self._pending = {
+                        "detected_at": datetime.now().isoformat(),
+                        "task": self._current_task_name(),
+                        "stacks": Counter()
+                    }
+                self._pending["stacks"][stack] += 1
+            self.stats["stack_samples"] += 1
+
+    def _current_task_name(self) -> Optional[str]:
+        try:
+            task = asyncio.current_task(self._loop)
+        except Exception:
+            return None
+        if task is None:
+            return None
+        coro = task.get_coro()
+        return f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+
+    # --- statystyki ---
+
+    def lag_percentiles(self) -> Dict[str, float]:
+        values = sorted(self.samples)
+        return {
+            "p50_ms": round(_percentile(values, 50) * 1000, 2),
+            "p90_ms": round(_percentile(values, 90) * 1000, 2),
+            "p99_ms": round(_percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+            "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0
+        }
+
+    def recent_blocks(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Ostatnie blokady (najnowsze najpierw) z pełnymi stosami"""
+        return list(self.events)[-limit:][::-1]
+
+    def get_stats(self, blocks: int = 3) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": len(self.samples),
+            "lag": self.lag_percentiles(),
+            "blocks": self.stats["blocks"],
+            "blocked_ms": round(self.stats["blocked_ms"], 1),
+            "max_lag_ms": round(self.stats["max_lag_ms"], 1),
+            "stack_samples": self.stats["stack_samples"],
+            "recent_blocks": [
+                {key: event[key] for key in ("detected_at", "duration_ms", "task", "culprit")}
+                for event in self.recent_blocks(blocks)
+            ]
+        }
+
+
+# Globalna instancja
+loop_monitor = LoopMonitor()
@@ -5,6 +5,8 @@ Główna klasa LuxDB do zarządzania połączeniem i inicjalizacji systemu.
 import asyncio
 from typing import Optional, Dict, Any, List
 from .connection import ConnectionManager
+from .query_stats import query_stats
+from .ttl_reaper import ttl_reaper
 from ..models.soul import Soul
 from ..models.being import Being
 # Relationships moved to legacy system
@@ -89,6 +91,9 @@ class LuxDB:
         await self._setup_core_tables()
         self._initialized = True
 
+        # Reaper TTL usuwa wygasłe byty w tle
+        ttl_reaper.start()
+
     async def close(self) -> None:
         """
         Zamyka wszystkie połączenia z bazą danych.
@@ -173,6 +178,20 @@ class LuxDB:
                 ON relationships (source_ulid, target_ulid, relation_type);
             """)
 
+            # Kolumny zgodne ze schematem Postgre_db (zapisy zbiorcze repozytoriów)
+            await conn.execute("""
+                ALTER TABLE souls ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+                ALTER TABLE beings ADD COLUMN IF NOT EXISTS data JSONB DEFAULT '{}';
+            """)
+
+            # Kolumny wygasania z indeksami częściowymi (reaper TTL, czyszczenie relacji)
+            await conn.execute("""
+                ALTER TABLE beings ADD COLUMN IF NOT EXISTS ttl_expires TIMESTAMP;
+                CREATE INDEX IF NOT EXISTS idx_beings_ttl_expires ON beings (ttl_expires) WHERE ttl_expires IS NOT NULL;
+                ALTER TABLE relationships ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
+                CREATE INDEX IF NOT EXISTS idx_relationships_expires_at ON relationships (expires_at) WHERE expires_at IS NOT NULL;
+            """)
+
     async def health_check(self) -> Dict[str, Any]:
         """
         Sprawdza stan połączenia z bazą danych.
@@ -204,7 +223,9 @@ class LuxDB:
                     "beings_count": beings_count,
                     "relationships_count": relationships_count,
                     "pool_size": self.pool.get_size() if hasattr(self.pool, 'get_size') else "unknown",
-                    "initialized": self._initialized
+                    "initialized": self._initialized,
+                    "query_stats": query_stats.summary(),
+                    "ttl_reaper": ttl_reaper.get_stats()
                 }
         except Exception as e:
             return {
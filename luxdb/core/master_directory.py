@@ -0,0 +1,115 @@
+"""
+Katalog Master Being: soul_hash -> żywa instancja Being.
+
+Wpisy są ładowane leniwie - równoczesne żądania dla tego samego
+soul_hash czekają na jedno ładowanie (single-flight). Katalog jest
+ograniczony (LRU) i unieważniany przy ewolucji lub zmianie Soul.
+Trzymane Being mają załadowaną Soul i skompilowane handlery, więc
+gorące wywołania nie dotykają bazy.
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class MasterBeingDirectory:
+    """LRU soul_hash -> Master Being z ładowaniem single-flight"""
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or int(os.getenv("LUXDB_MASTER_DIRECTORY_SIZE", "256"))
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Generacja wpisu - ładowanie rozpoczęte przed unieważnieniem nie trafia do katalogu
+        self._generations: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, soul_hash: str) -> Optional[Any]:
+        being = self._entries.get(soul_hash)
+        if being is not None:
+            self._entries.move_to_end(soul_hash)
+        return being
+
+    def put(self, soul_hash: str, being: Any) -> None:
+        self._entries[soul_hash] = being
+        self._entries.move_to_end(soul_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get_or_load(self, soul_hash: str, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """Zwraca Master Being z katalogu albo ładuje go raz przez loader"""
+        being = self.get(soul_hash)
+        if being is not None:
+            self.stats["hits"] += 1
+            return being
+
+        inflight = self._inflight.get(soul_hash)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self.stats["misses"] += 1
+        generation = self._generations.get(soul_hash, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[soul_hash] = future
+        try:
+            being = await loader()
+            if being is not None:
+                await self._warm(being)
+                if self._generations.get(soul_hash, 0) == generation:
+                    self.put(soul_hash, being)
+            future.set_result(being)
+            return being
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(soul_hash, None)
+
+    async def _warm(self, being: Any) -> None:
+        """Ładuje Soul i handlery Being, żeby zostały w pamięci razem z nim"""
+        get_soul = getattr(being, "get_soul", None)
+        if get_soul is not None:
+            try:
+                await get_soul()
+            except Exception as e:
+                print(f"⚠️ Could not warm master being {getattr(being, 'ulid', '?')}: {e}")
+
+    def invalidate(self, soul_hash: str) -> bool:
+        """Usuwa wpis dla soul_hash (np. po ewolucji Soul)"""
+        self._generations[soul_hash] = self._generations.get(soul_hash, 0) + 1
+        removed = self._entries.pop(soul_hash, None) is not None
+        if removed:
+            self.stats["invalidations"] += 1
+        return removed
+
+    def invalidate_being(self, being_ulid: str) -> int:
+        """Usuwa wpisy wskazujące na dany Being"""
+        soul_hashes = [h for h, being in self._entries.items() if getattr(being, "ulid", None) == being_ulid]
+        for soul_hash in soul_hashes:
+            self.invalidate(soul_hash)
+        return len(soul_hashes)
+
+    def clear(self) -> None:
+        for soul_hash in list(self._entries):
+            self.invalidate(soul_hash)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "loading": len(self._inflight),
+            "hit_rate": round((self.stats["hits"] + self.stats["coalesced"]) / lookups, 4) if lookups else 0.0
+        }
+
+
+# Globalna instancja
+master_directory = MasterBeingDirectory()
@@ -0,0 +1,218 @@
+"""
+Rozliczanie pamięci per podsystem.
+
+Podsystemy rejestrują swoje kontenery (rejestry, cache, kolejki) pod
+nazwą - jako funkcję zwracającą kontener, więc rejestracja nie trzyma
+referencji do starych obiektów, a podmieniony słownik jest widoczny
+od razu. Pomiar to liczba wpisów oraz przybliżony głęboki rozmiar z
+approximate_size (ograniczone próbkowanie: pierwsze `sample_items`
+elementów kolekcji, głębokość `max_depth`), więc koszt nie rośnie
+z rozmiarem rejestru.
+
+Zrzuty są robione na żądanie albo cyklicznie; różnica względem
+poprzedniego zrzutu pokazuje, który kontener rośnie. Wyniki są
+dostępne jako gauge (format Prometheus) i przez `luxdb client memory`.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from .session_store import approximate_size
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """RSS procesu (Linux: /proc/self/statm) i szczytowe RSS"""
+    rss = peak = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        pass
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+
+class TrackedContainer:
+    """Zarejestrowany kontener: źródło, podsystem i opcjonalny licznik wpisów"""
+
+    def __init__(self, name: str, source: Callable[[], Any], subsystem: str,
+                 count: Callable[[Any], int] = None):
+        self.name = name
+        self.source = source
+        self.subsystem = subsystem
+        self.count = count
+
+    def measure(self, sample_items: int, max_depth: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        container = self.source()
+        if container is None:
+            return {"name": self.name, "subsystem": self.subsystem, "entries": 0, "approx_bytes": 0}
+
+        for attempt in range(3):
+            try:
+                entries = self.count(container) if self.count else len(container)
+                size = approximate_size(container, max_items=sample_items, max_depth=max_depth)
+                break
+            except RuntimeError:
+                # Kontener zmienił rozmiar w trakcie iteracji - ponów
+                if attempt == 2:
+                    raise
+        return {
+            "name": self.name,
+            "subsystem": self.subsystem,
+            "entries": entries,
+            "approx_bytes": size,
+            "measure_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+
+class MemoryAccountant:
+    """Rejestr kontenerów podsystemów i ich zrzuty pamięci"""
+
+    def __init__(self, sample_items: int = None, max_depth: int = None, interval: float = None):
+        self.sample_items = sample_items or int(os.getenv("LUXDB_MEMORY_SAMPLE_ITEMS", "64"))
+        self.max_depth = max_depth or int(os.getenv("LUXDB_MEMORY_MAX_DEPTH", "4"))
+        self.interval = interval or float(os.getenv("LUXDB_MEMORY_SNAPSHOT_INTERVAL", "300"))
+
+        self.containers: Dict[str, TrackedContainer] = {}
+        self.latest: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"snapshots": 0, "errors": 0}
+
+    # --- rejestracja ---
+
+    def register(self, name: str, source: Any, subsystem: str = None,
+                 count: Callable[[Any], int] = None) -> None:
+        """
+        Rejestruje kontener pod nazwą.
+
+        source to funkcja zwracająca kontener (zalecane) albo sam kontener.
+        count - własny licznik wpisów (domyślnie len()).
+        """
+        getter = source if callable(source) else (lambda: source)
+        self.containers[name] = TrackedContainer(name, getter, subsystem or name.split(".", 1)[0], count)
+
+    def unregister(self, name: str) -> None:
+        self.containers.pop(name, None)
+
+    # --- pomiary ---
+
+    def measure(self, name: str) -> Dict[str, Any]:
+        return self.containers[name].measure(self.sample_items, self.max_depth)
+
+    def snapshot(self, names: List[str] = None) -> Dict[str, Any]:
+        """Mierzy kontenery (wszystkie albo wskazane) i porównuje z poprzednim zrzutem"""
+        started = time.perf_counter()
+        previous = {entry["name"]: entry for entry in (self.latest or {}).get("containers", [])}
+        containers, errors = [], {}
+
+        for name in names or list(self.containers):
+            try:
+                entry = self.measure(name)
+            except Exception as e:
+                self.stats["errors"] += 1
+                errors[name] = str(e)
+                continue
+            before = previous.get(name)
+            if before is not None:
+                entry["delta_entries"] = entry["entries"] - before["entries"]
+                entry["delta_bytes"] = entry["approx_bytes"] - before["approx_bytes"]
+            containers.append(entry)
+
+        containers.sort(key=lambda entry: entry["approx_bytes"], reverse=True)
+        subsystems: Dict[str, Dict[str, int]] = {}
+        for entry in containers:
+            totals = subsystems.setdefault(entry["subsystem"], {"entries": 0, "approx_bytes": 0})
+            totals["entries"] += entry["entries"]
+            totals["approx_bytes"] += entry["approx_bytes"]
+
+        snapshot = {
+            "taken_at": datetime.now().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            "process": process_memory(),
+            "tracked_bytes": sum(entry["approx_bytes"] for entry in containers),
+            "subsystems": subsystems,
+            "containers": containers,
+            "errors": errors,
+            "sampling": {"sample_items": self.sample_items, "max_depth": self.max_depth}
+        }
+        if names is None:
+            self.latest = snapshot
+        self.stats["snapshots"] += 1
+        return snapshot
+
+    # --- cykliczne zrzuty ---
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Brak pętli - snapshot() trzeba wywołać ręcznie
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.snapshot()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Memory snapshot error: {e}")
+            await asyncio.sleep(self.interval)
+
+    # --- eksport ---
+
+    def gauges(self) -> List[Dict[str, Any]]:
+        """Gauge z ostatniego zrzutu: {name, labels, value}"""
+        snapshot = self.latest or self.snapshot()
+        gauges = []
+        for entry in snapshot["containers"]:
+            labels = {"container": entry["name"], "subsystem": entry["subsystem"]}
+            gauges.append({"name": "luxdb_memory_entries", "labels": labels, "value": entry["entries"]})
+            gauges.append({"name": "luxdb_memory_approx_bytes", "labels": labels, "value": entry["approx_bytes"]})
+        for key, value in snapshot["process"].items():
+            if value is not None:
+                gauges.append({"name": f"luxdb_process_{key}", "labels": {}, "value": value})
+        return gauges
+
+    def to_prometheus(self) -> str:
+        """Gauge w formacie tekstowym Prometheus"""
+        lines, declared = [], set()
+        # Próbki jednej metryki muszą być obok siebie (sortowanie stabilne)
+        for gauge in sorted(self.gauges(), key=lambda gauge: gauge["name"]):
+            if gauge["name"] not in declared:
+                declared.add(gauge["name"])
+                lines.append(f"# TYPE {gauge['name']} gauge")
+            labels = ",".join(f'{key}="{value}"' for key, value in gauge["labels"].items())
+            lines.append(f"{gauge['name']}{{{labels}}} {gauge['value']}" if labels else f"{gauge['name']} {gauge['value']}")
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "containers": len(self.containers),
+            "last_snapshot": self.latest["taken_at"] if self.latest else None,
+            "tracked_bytes": self.latest["tracked_bytes"] if self.latest else None,
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval
+        }
+
+
+# Globalna instancja
+memory_accountant = MemoryAccountant()
@@ -33,6 +33,8 @@ class Postgre_db:
                 },
                 command_timeout=30
             )
+            from luxdb.core.query_stats import instrument_pool
+            db_pool = instrument_pool(db_pool)
             await Postgre_db.setup_tables()
             print("✅ Pula połączeń do bazy PostgreSQL zainicjalizowana")
         return db_pool
@@ -109,6 +111,18 @@ class Postgre_db:
                     CREATE INDEX IF NOT EXISTS idx_beings_updated_at ON beings (updated_at);
                 """)
 
+                # TTL bytów w osobnej kolumnie - indeks częściowy dla reapera
+                await conn.execute("""
+                    ALTER TABLE beings ADD COLUMN IF NOT EXISTS ttl_expires TIMESTAMP;
+                    CREATE INDEX IF NOT EXISTS idx_beings_ttl_expires ON beings (ttl_expires) WHERE ttl_expires IS NOT NULL;
+                """)
+
+                # Wolne Being w puli (BeingPool) - przejęcie najstarszego bez skanu soul_hash
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_beings_pool_free ON beings (soul_hash, updated_at)
+                    WHERE NOT COALESCE((data->>'active')::boolean, false);
+                """)
+
                 # Tabela relations - NOWA STRUKTURA Z JSONB
                 await conn.execute("""
                     CREATE TABLE IF NOT EXISTS relations (
@@ -275,6 +289,66 @@ class Postgre_db:
                     CREATE INDEX IF NOT EXISTS idx_tasks_retry ON tasks (retry_count, max_retries);
                 """);
 
+                # Tabela session_spill - zrzuty bezczynnych sesji
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS session_spill (
+                        session_id VARCHAR(255) PRIMARY KEY,
+                        kind VARCHAR(50) NOT NULL DEFAULT 'session_data',
+                        snapshot JSONB NOT NULL,
+                        spilled_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_session_spill_spilled_at ON session_spill (spilled_at);
+                """)
+
+                # Tabela connection_heartbeats - ostatni heartbeat połączenia (zbiorczy upsert)
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS connection_heartbeats (
+                        connection_ulid VARCHAR(255) PRIMARY KEY,
+                        last_seen TIMESTAMP NOT NULL
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_connection_heartbeats_last_seen ON connection_heartbeats (last_seen);
+                """)
+
+                # Wygasanie relacji - indeks częściowy dla usuwania partiami
+                await conn.execute("""
+                    ALTER TABLE relationships ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
+                    CREATE INDEX IF NOT EXISTS idx_relationships_expires_at ON relationships (expires_at) WHERE expires_at IS NOT NULL;
+                """)
+
+                # Tabela alias_registry - aktualne mapowania alias -> soul_hash (IntelligentKernel)
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS alias_registry (
+                        alias VARCHAR(255) PRIMARY KEY,
+                        soul_hash VARCHAR(255) NOT NULL,
+                        alias_type VARCHAR(50) NOT NULL DEFAULT 'template',
+                        being_ulid VARCHAR(255),
+                        metadata JSONB NOT NULL DEFAULT '{}',
+                        version INTEGER NOT NULL DEFAULT 1,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_alias_registry_soul_hash ON alias_registry (soul_hash);
+                """)
+
+                # Tabela alias_history - historia zmian aliasów (tylko dopisywanie)
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS alias_history (
+                        id BIGSERIAL PRIMARY KEY,
+                        alias VARCHAR(255) NOT NULL,
+                        old_soul_hash VARCHAR(255),
+                        new_soul_hash VARCHAR(255) NOT NULL,
+                        alias_type VARCHAR(50),
+                        version INTEGER NOT NULL,
+                        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_alias_history_alias ON alias_history (alias, changed_at);
+                """)
+
                 print("✅ Tabele PostgreSQL utworzone w podejściu JSONB")
         except Exception as e:
             print(f"❌ Błąd tworzenia tabel PostgreSQL: {e}")
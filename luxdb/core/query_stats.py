@@ -0,0 +1,267 @@
+"""
+Statystyki zapytań SQL i log wolnych zapytań dla warstwy PostgreSQL.
+
+Pule zwracane przez Postgre_db.get_db_pool() i ConnectionManager.get_pool()
+są owijane przez instrument_pool(), dzięki czemu każde wywołanie
+execute/fetch/fetchrow/fetchval/executemany trafia do query_stats.
+"""
+
+import os
+import re
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Ramki z tych modułów pomijamy szukając miejsca wywołania zapytania
+_SKIPPED_MODULES = (__name__, "asyncpg", "contextlib", "asyncio")
+
+
+def normalize_sql(sql: str) -> str:
+    """Normalizuje tekst SQL - literały i parametry zastępuje '?'"""
+    normalized = _STRING_LITERAL.sub("?", sql)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass
+class QueryStat:
+    """Zagregowane statystyki jednego znormalizowanego zapytania"""
+    query: str
+    calls: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    slow_calls: int = 0
+    last_call_site: Optional[str] = None
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "query": self.query,
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.mean_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "slow_calls": self.slow_calls,
+            "last_call_site": self.last_call_site
+        }
+
+
+@dataclass
+class QueryStatsCollector:
+    """Kolektor statystyk zapytań z progiem wolnych zapytań"""
+    slow_query_threshold_ms: float = field(
+        default_factory=lambda: float(os.getenv("LUXDB_SLOW_QUERY_MS", "200"))
+    )
+    max_statements: int = 1000
+    enabled: bool = True
+    stats: Dict[str, QueryStat] = field(default_factory=dict)
+    slow_queries: deque = field(default_factory=lambda: deque(maxlen=100))
+    started_at: float = field(default_factory=time.time)
+
+    def record(self, sql: str, duration_ms: float, rows: int = 0, error: bool = False) -> None:
+        """Rejestruje pojedyncze wykonanie zapytania"""
+        if not self.enabled:
+            return
+
+        query = normalize_sql(sql)
+        stat = self.stats.get(query)
+        if stat is None:
+            if len(self.stats) >= self.max_statements:
+                query = "<other>"
+                stat = self.stats.setdefault(query, QueryStat(query=query))
+            else:
+                stat = self.stats[query] = QueryStat(query=query)
+
+        stat.calls += 1
+        stat.total_ms += duration_ms
+        stat.rows += rows
+        if duration_ms > stat.max_ms:
+            stat.max_ms = duration_ms
+        if error:
+            stat.errors += 1
+
+        if duration_ms >= self.slow_query_threshold_ms:
+            call_site = _find_call_site()
+            stat.slow_calls += 1
+            stat.last_call_site = call_site
+            self.slow_queries.append({
+                "query": query,
+                "duration_ms": round(duration_ms, 3),
+                "rows": rows,
+                "call_site": call_site,
+                "timestamp": time.time()
+            })
+            print(f"🐢 Wolne zapytanie ({duration_ms:.1f} ms) z {call_site}: {query[:200]}")
+
+    def get_stats(self, limit: int = 20, order_by: str = "total_ms") -> Dict[str, Any]:
+        """Zwraca najcięższe zapytania posortowane po wybranej metryce"""
+        if order_by not in ("total_ms", "mean_ms", "max_ms", "calls", "rows"):
+            order_by = "total_ms"
+
+        ordered = sorted(self.stats.values(), key=lambda s: getattr(s, order_by), reverse=True)
+        total_ms = sum(s.total_ms for s in self.stats.values())
+        return {
+            "enabled": self.enabled,
+            "slow_query_threshold_ms": self.slow_query_threshold_ms,
+            "since": self.started_at,
+            "statements": len(self.stats),
+            "total_calls": sum(s.calls for s in self.stats.values()),
+            "total_ms": round(total_ms, 3),
+            "queries": [s.to_dict() for s in ordered[:limit]],
+            "slow_queries": list(self.slow_queries)[-limit:]
+        }
+
+    def summary(self, limit: int = 5) -> Dict[str, Any]:
+        """Skrócona wersja statystyk do health_check"""
+        stats = self.get_stats(limit=limit)
+        stats.pop("slow_queries", None)
+        return stats
+
+    def reset(self) -> None:
+        """Czyści zebrane statystyki"""
+        self.stats.clear()
+        self.slow_queries.clear()
+        self.started_at = time.time()
+
+
+def _find_call_site() -> str:
+    """Znajduje pierwszą ramkę spoza warstwy bazy danych"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_SKIPPED_MODULES):
+            return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _rows_from_status(status: Any) -> int:
+    """Wyciąga liczbę wierszy ze statusu komendy (np. 'INSERT 0 5')"""
+    if isinstance(status, str):
+        tail = status.rsplit(" ", 1)[-1]
+        if tail.isdigit():
+            return int(tail)
+    return 0
+
+
+class InstrumentedConnection:
+    """Proxy połączenia asyncpg mierzące czas zapytań"""
+
+    def __init__(self, connection, collector: QueryStatsCollector):
+        self._connection = connection
+        self._collector = collector
+
+    async def _timed(self, method: str, query: str, args, kwargs, count_rows):
+        start = time.perf_counter()
+        try:
+            result = await getattr(self._connection, method)(query, *args, **kwargs)
+        except Exception:
+            self._collector.record(query, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        self._collector.record(query, (time.perf_counter() - start) * 1000, count_rows(result))
+        return result
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._timed("execute", query, args, kwargs, _rows_from_status)
+
+    async def executemany(self, command: str, args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = await self._connection.executemany(command, args, **kwargs)
+        except Exception:
+            self._collector.record(command, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        rows = len(args) if hasattr(args, "__len__") else 0
+        self._collector.record(command, (time.perf_counter() - start) * 1000, rows)
+        return result
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._timed("fetch", query, args, kwargs, len)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._timed("fetchrow", query, args, kwargs, lambda r: 0 if r is None else 1)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._timed("fetchval", query, args, kwargs, lambda r: 0 if r is None else 1)
+
+    @property
+    def raw_connection(self):
+        """Oryginalne połączenie asyncpg"""
+        return self._connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class _InstrumentedAcquireContext:
+    """Odpowiednik PoolAcquireContext zwracający InstrumentedConnection"""
+
+    def __init__(self, acquire_context, collector: QueryStatsCollector):
+        self._acquire_context = acquire_context
+        self._collector = collector
+
+    async def __aenter__(self) -> InstrumentedConnection:
+        connection = await self._acquire_context.__aenter__()
+        return InstrumentedConnection(connection, self._collector)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return await self._acquire_context.__aexit__(exc_type, exc_val, exc_tb)
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def _acquire(self) -> InstrumentedConnection:
+        connection = await self._acquire_context
+        return InstrumentedConnection(connection, self._collector)
+
+
+class InstrumentedPool:
+    """Proxy puli asyncpg wydające instrumentowane połączenia"""
+
+    def __init__(self, pool, collector: QueryStatsCollector):
+        self._pool = pool
+        self._collector = collector
+
+    def acquire(self, *args, **kwargs) -> _InstrumentedAcquireContext:
+        return _InstrumentedAcquireContext(self._pool.acquire(*args, **kwargs), self._collector)
+
+    async def release(self, connection, *args, **kwargs):
+        if isinstance(connection, InstrumentedConnection):
+            connection = connection.raw_connection
+        return await self._pool.release(connection, *args, **kwargs)
+
+    @property
+    def raw_pool(self):
+        """Oryginalna pula asyncpg"""
+        return self._pool
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+
+def instrument_pool(pool, collector: Optional[QueryStatsCollector] = None):
+    """Owija pulę asyncpg w InstrumentedPool (idempotentnie)"""
+    if pool is None or isinstance(pool, InstrumentedPool):
+        return pool
+    return InstrumentedPool(pool, collector or query_stats)
+
+
+# Globalna instancja
+query_stats = QueryStatsCollector()
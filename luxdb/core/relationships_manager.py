@@ -191,28 +191,41 @@ class RelationshipsManager:
             }
 
     @staticmethod
-    async def cleanup_expired_relationships() -> Dict[str, Any]:
+    async def cleanup_expired_relationships(batch_size: int = 1000, batch_pause: float = 0.05) -> Dict[str, Any]:
         """
-        Usuwa wygasłe relacje
+        Usuwa wygasłe relacje partiami (krótkie transakcje po indeksie expires_at)
         """
+        deleted_count = 0
         try:
             pool = await Postgre_db.get_db_pool()
-            async with pool.acquire() as conn:
-                query = """
-                    DELETE FROM relationships 
-                    WHERE expires_at IS NOT NULL AND expires_at <= NOW()
-                    RETURNING COUNT(*)
-                """
-                
-                result = await conn.fetchval(query)
-                
-                return {
-                    "success": True,
-                    "deleted_count": result
-                }
+            while True:
+                async with pool.acquire() as conn:
+                    query = """
+                        DELETE FROM relationships
+                        WHERE id IN (
+                            SELECT id FROM relationships
+                            WHERE expires_at IS NOT NULL AND expires_at <= NOW()
+                            ORDER BY expires_at
+                            LIMIT $1
+                            FOR UPDATE SKIP LOCKED
+                        )
+                    """
+                    result = await conn.execute(query, batch_size)
+
+                deleted = int(result.split()[-1]) if result else 0
+                deleted_count += deleted
+                if deleted < batch_size:
+                    break
+                await asyncio.sleep(batch_pause)
+
+            return {
+                "success": True,
+                "deleted_count": deleted_count
+            }
                 
         except Exception as e:
             return {
                 "success": False,
+                "deleted_count": deleted_count,
                 "error": f"Failed to cleanup relationships: {e}"
             }
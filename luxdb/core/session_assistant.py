@@ -5,6 +5,7 @@ Session-Based Lux Assistant - Kontekstowy asystent dla użytkowników
 
 import asyncio
 import json
+import time
 from typing import Dict, Any, List, Optional, Set
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
@@ -13,6 +14,7 @@ import ulid
 from ..models.being import Being
 from ..models.soul import Soul
 from ..ai_lux_assistant import LuxAssistant
+from .session_store import BoundedCache, ExpiryIndex, SessionLimits, SessionSpillStore, approximate_size
 
 @dataclass
 class SessionContext:
@@ -26,6 +28,11 @@ class SessionContext:
     user_actions: List[Dict[str, Any]] = field(default_factory=list)
     conversation_context: Dict[str, Any] = field(default_factory=dict)
     project_tags: Set[str] = field(default_factory=set)
+    max_user_actions: int = 200
+    
+    def expires_at(self) -> float:
+        """Znacznik czasu wygaśnięcia sesji"""
+        return (self.last_activity + timedelta(minutes=self.ttl_minutes)).timestamp()
     
     def is_expired(self) -> bool:
         """Sprawdza czy sesja wygasła"""
@@ -35,13 +42,32 @@ class SessionContext:
     def refresh_activity(self):
         """Odświeża czas ostatniej aktywności"""
         self.last_activity = datetime.now()
+    
+    def add_user_action(self, action: Dict[str, Any]):
+        """Dodaje akcję zachowując tylko ostatnie max_user_actions wpisów"""
+        self.user_actions.append(action)
+        overflow = len(self.user_actions) - self.max_user_actions
+        if overflow > 0:
+            del self.user_actions[:overflow]
+    
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Zrzut kontekstu do zapisania w session_spill"""
+        return {
+            "session_id": self.session_id,
+            "user_fingerprint": self.user_fingerprint,
+            "user_ulid": self.user_ulid,
+            "created_at": self.created_at.isoformat(),
+            "user_actions": self.user_actions,
+            "conversation_context": self.conversation_context,
+            "project_tags": list(self.project_tags)
+        }
 
 class SessionAssistant:
     """
     Instancja asystenta przypisana do konkretnej sesji użytkownika
     """
     
-    def __init__(self, session_context: SessionContext, openai_api_key: str = None):
+    def __init__(self, session_context: SessionContext, openai_api_key: str = None, cache_entries: int = 500):
         self.session = session_context
         self.lux_core = LuxAssistant(openai_api_key or "demo-key")
         self.is_active = True
@@ -49,7 +75,7 @@ class SessionAssistant:
         
         # Session-specific isolation
         self.session_registry = {}  # Własny registry dla sesji
-        self.session_beings = {}    # Cache swoich beings
+        self.session_beings = BoundedCache(cache_entries)  # Cache swoich beings
         self.data_lock = False      # Simple lock mechanism
         
     async def initialize(self):
@@ -143,7 +169,7 @@ class SessionAssistant:
             "content": message_content[:100] + "..." if len(message_content) > 100 else message_content
         }
         
-        self.session.user_actions.append(action_context)
+        self.session.add_user_action(action_context)
         
         # Przetwórz przez Lux z kontekstem sesji
         enhanced_prompt = f"""
@@ -244,30 +270,59 @@ class SessionAssistant:
         if hasattr(self, 'assistant_being'):
             await self.assistant_being.save()
     
+    def memory_usage(self) -> int:
+        """Przybliżony rozmiar danych sesji w bajtach"""
+        return (approximate_size(self.session.user_actions) +
+                approximate_size(self.session.conversation_context) +
+                approximate_size(self.session_registry) +
+                approximate_size(self.session_beings))
+    
     
 
 class SessionManager:
     """Manager wszystkich sesji asystentów"""
     
-    def __init__(self):
+    def __init__(self, limits: SessionLimits = None):
         self.active_sessions: Dict[str, SessionAssistant] = {}
+        self.expiry_index = ExpiryIndex()
+        self.limits = limits or SessionLimits()
         self.cleanup_task = None
+        self._index_changed = asyncio.Event()
     
     async def create_session(self, user_fingerprint: str, user_ulid: str = None, ttl_minutes: int = 30) -> SessionAssistant:
-        """Tworzy nową sesję asystenta"""
-        session_id = str(ulid.ulid())
-        
-        context = SessionContext(
-            session_id=session_id,
-            user_fingerprint=user_fingerprint,
-            user_ulid=user_ulid,
-            ttl_minutes=ttl_minutes
-        )
-        
-        assistant = SessionAssistant(context)
+        """Tworzy nową sesję asystenta (lub odtwarza zrzuconą dla tego fingerprintu)"""
+        snapshot = None
+        if self.limits.spill_to_db:
+            snapshot = await SessionSpillStore.restore(f"assistant:{user_fingerprint}", "session_assistant")
+        
+        if snapshot:
+            context = SessionContext(
+                session_id=snapshot["session_id"],
+                user_fingerprint=user_fingerprint,
+                user_ulid=user_ulid or snapshot.get("user_ulid"),
+                created_at=datetime.fromisoformat(snapshot["created_at"]),
+                ttl_minutes=ttl_minutes,
+                user_actions=snapshot.get("user_actions", []),
+                conversation_context=snapshot.get("conversation_context", {}),
+                project_tags=set(snapshot.get("project_tags", []))
+            )
+            print(f"♻️ Rehydrated session {context.session_id} for user {user_fingerprint}")
+        else:
+            context = SessionContext(
+                session_id=str(ulid.ulid()),
+                user_fingerprint=user_fingerprint,
+                user_ulid=user_ulid,
+                ttl_minutes=ttl_minutes
+            )
+        session_id = context.session_id
+        
+        assistant = SessionAssistant(context, cache_entries=self.limits.cache_entries)
         await assistant.initialize()
         
         self.active_sessions[session_id] = assistant
+        self.expiry_index.schedule(session_id, context.expires_at())
+        self._index_changed.set()
+        await self._enforce_session_limit()
         
         # Uruchom cleanup task jeśli nie działa
         if not self.cleanup_task:
@@ -280,26 +335,81 @@ class SessionManager:
         """Pobiera sesję asystenta"""
         return self.active_sessions.get(session_id)
     
+    async def _remove_session(self, session_id: str):
+        """Usuwa sesję - kontekst żywej (niewygasłej) sesji jest zrzucany do bazy"""
+        assistant = self.active_sessions.pop(session_id, None)
+        self.expiry_index.remove(session_id)
+        if assistant is None:
+            return
+        # Wygasła sesja nie jest odtwarzana - nie zrzucaj jej
+        if self.limits.spill_to_db and not assistant.session.is_expired():
+            context = assistant.session
+            await SessionSpillStore.spill(
+                f"assistant:{context.user_fingerprint}", "session_assistant", context.to_snapshot()
+            )
+    
+    async def _enforce_session_limit(self):
+        """Usuwa sesje najbliższe wygaśnięcia powyżej limits.max_sessions"""
+        while len(self.active_sessions) > self.limits.max_sessions:
+            session_id = self.expiry_index.pop_oldest()
+            if session_id is None:
+                break
+            assistant = self.active_sessions.get(session_id)
+            if assistant:
+                await assistant.switch_to_offline_mode()
+            await self._remove_session(session_id)
+            print(f"🗑️ Evicted session {session_id} (limit {self.limits.max_sessions})")
+    
+    async def expire_due_sessions(self) -> int:
+        """Usuwa sesje, których termin w indeksie minął"""
+        removed = 0
+        for session_id in self.expiry_index.pop_due(time.time()):
+            assistant = self.active_sessions.get(session_id)
+            if assistant is None:
+                continue
+            
+            if await assistant.check_expiry():
+                await self._remove_session(session_id)
+                removed += 1
+                print(f"🗑️ Removed expired session {session_id}")
+            else:
+                # Aktywność została odświeżona - przesuń termin
+                self.expiry_index.schedule(session_id, assistant.session.expires_at())
+        return removed
+    
     async def cleanup_expired_sessions(self):
-        """Czyści wygasłe sesje"""
+        """Czyści wygasłe sesje - budzi się przy najbliższym terminie wygaśnięcia"""
         while True:
             try:
-                expired_sessions = []
-                
-                for session_id, assistant in self.active_sessions.items():
-                    if await assistant.check_expiry():
-                        expired_sessions.append(session_id)
+                await self.expire_due_sessions()
                 
-                # Usuń wygasłe sesje
-                for session_id in expired_sessions:
-                    del self.active_sessions[session_id]
-                    print(f"🗑️ Removed expired session {session_id}")
+                next_deadline = self.expiry_index.next_deadline()
+                timeout = 60 if next_deadline is None else min(60, max(0.1, next_deadline - time.time()))
                 
-                await asyncio.sleep(60)  # Sprawdzaj co minutę
+                self._index_changed.clear()
+                try:
+                    await asyncio.wait_for(self._index_changed.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
                 
             except Exception as e:
                 print(f"❌ Cleanup error: {e}")
                 await asyncio.sleep(60)
+    
+    def get_memory_report(self, sample_size: int = 100) -> Dict[str, Any]:
+        """Przybliżone zużycie pamięci przez sesje (próbkowane)"""
+        session_ids = list(self.active_sessions.keys())
+        sampled = session_ids[:sample_size]
+        per_session = {session_id: self.active_sessions[session_id].memory_usage() for session_id in sampled}
+        sampled_total = sum(per_session.values())
+        
+        return {
+            "active_sessions": len(session_ids),
+            "sampled_sessions": len(sampled),
+            "estimated_total_bytes": sampled_total * len(session_ids) // len(sampled) if sampled else 0,
+            "largest_sessions": sorted(per_session.items(), key=lambda item: item[1], reverse=True)[:10],
+            "next_expiry": self.expiry_index.next_deadline()
+        }
 
 # Globalna instancja
 session_manager = SessionManager()
@@ -3,14 +3,22 @@ Session Data Manager - Three-Table Architecture
 Templates -> Instances -> Relations
 
 Simplified session management without complex typing.
+Caches and conversation history are bounded, sessions are indexed by
+last activity so cleanup never scans the whole registry.
 """
 
 import asyncio
 import json
+import time
+from collections import deque
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import ulid as _ulid
 
+from .session_store import (
+    BoundedCache, ExpiryIndex, SessionLimits, SessionSpillStore, approximate_size
+)
+
 class SessionDataManager:
     """
     Simple session data manager for three-table architecture:
@@ -19,16 +27,21 @@ class SessionDataManager:
     - Relations (connections between instances with observer context)
     """
 
-    def __init__(self, session_id: str):
+    def __init__(self, session_id: str = None, limits: SessionLimits = None):
         self.session_id = session_id or str(_ulid.ulid())
-        self.templates = {}  # Template cache
-        self.instances = {}  # Instance cache
-        self.relations = {}  # Relations cache
+        self.limits = limits or SessionLimits()
+        self.templates = BoundedCache(self.limits.cache_entries)  # Template cache
+        self.instances = BoundedCache(self.limits.cache_entries)  # Instance cache
+        self.relations = BoundedCache(self.limits.cache_entries)  # Relations cache
         self.user_context = {}
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=self.limits.history_length)
         self.created_at = datetime.now()
         self.last_activity = datetime.now()
 
+    def touch(self):
+        """Mark session as active"""
+        self.last_activity = datetime.now()
+
     async def store_template(self, template_id: str, template_data: Dict[str, Any]):
         """Store template in session cache"""
         self.templates[template_id] = {
@@ -37,7 +50,7 @@ class SessionDataManager:
             "created_at": datetime.now().isoformat(),
             "type": "template"
         }
-        self.last_activity = datetime.now()
+        self.touch()
 
     async def store_instance(self, instance_id: str, template_id: str, instance_data: Dict[str, Any]):
         """Store instance linked to template"""
@@ -48,9 +61,9 @@ class SessionDataManager:
             "created_at": datetime.now().isoformat(),
             "type": "instance"
         }
-        self.last_activity = datetime.now()
+        self.touch()
 
-    async def store_relation(self, relation_id: str, source_id: str, target_id: str, 
+    async def store_relation(self, relation_id: str, source_id: str, target_id: str,
                            observer_context: Dict[str, Any], relation_data: Dict[str, Any]):
         """Store relation with observer context"""
         self.relations[relation_id] = {
@@ -62,7 +75,7 @@ class SessionDataManager:
             "created_at": datetime.now().isoformat(),
             "type": "relation"
         }
-        self.last_activity = datetime.now()
+        self.touch()
 
     async def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
         """Get template by ID"""
@@ -78,7 +91,7 @@ class SessionDataManager:
 
     async def get_instances_by_template(self, template_id: str) -> List[Dict[str, Any]]:
         """Get all instances created from a template"""
-        return [instance for instance in self.instances.values() 
+        return [instance for instance in self.instances.values()
                 if instance.get("template_id") == template_id]
 
     async def get_relations_for_instance(self, instance_id: str) -> List[Dict[str, Any]]:
@@ -89,23 +102,40 @@ class SessionDataManager:
     async def update_user_context(self, key: str, value: Any):
         """Update user context"""
         self.user_context[key] = value
-        self.last_activity = datetime.now()
+        self.touch()
 
     async def add_conversation_entry(self, message: str, response: str, metadata: Dict[str, Any] = None):
-        """Add conversation entry"""
-        entry = {
+        """Add conversation entry (ring buffer of limits.history_length entries)"""
+        self.conversation_history.append({
             "timestamp": datetime.now().isoformat(),
             "message": message,
             "response": response,
             "metadata": metadata or {}
-        }
-        self.conversation_history.append(entry)
+        })
+        self.touch()
 
-        # Keep last 100 entries
-        if len(self.conversation_history) > 100:
-            self.conversation_history = self.conversation_history[-100:]
+    async def build_conversation_context(self, message: str) -> Dict[str, Any]:
+        """Build conversation context for this session"""
+        return {
+            "session_id": self.session_id,
+            "message": message,
+            "user_context": self.user_context,
+            "conversation_history": list(self.conversation_history),
+            "timestamp": datetime.now().isoformat(),
+            "system_status": "active"
+        }
 
-        self.last_activity = datetime.now()
+    def memory_usage(self) -> Dict[str, int]:
+        """Approximate memory held by this session, in bytes"""
+        usage = {
+            "templates": approximate_size(self.templates),
+            "instances": approximate_size(self.instances),
+            "relations": approximate_size(self.relations),
+            "user_context": approximate_size(self.user_context),
+            "conversation_history": approximate_size(self.conversation_history)
+        }
+        usage["total"] = sum(usage.values())
+        return usage
 
     def get_session_stats(self) -> Dict[str, Any]:
         """Get session statistics"""
@@ -117,13 +147,47 @@ class SessionDataManager:
             "instances_count": len(self.instances),
             "relations_count": len(self.relations),
             "conversation_entries": len(self.conversation_history),
-            "context_keys": len(self.user_context)
+            "context_keys": len(self.user_context),
+            "cache_evictions": self.templates.evictions + self.instances.evictions + self.relations.evictions
         }
 
+    def to_snapshot(self) -> Dict[str, Any]:
+        """Serializable snapshot used when spilling the session to Postgres"""
+        return {
+            "session_id": self.session_id,
+            "templates": list(self.templates.items()),
+            "instances": list(self.instances.items()),
+            "relations": list(self.relations.items()),
+            "user_context": self.user_context,
+            "conversation_history": list(self.conversation_history),
+            "created_at": self.created_at.isoformat(),
+            "last_activity": self.last_activity.isoformat()
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any], limits: SessionLimits = None) -> 'SessionDataManager':
+        """Rehydrate session from a spilled snapshot"""
+        manager = cls(snapshot["session_id"], limits)
+        for key, value in snapshot.get("templates", []):
+            manager.templates[key] = value
+        for key, value in snapshot.get("instances", []):
+            manager.instances[key] = value
+        for key, value in snapshot.get("relations", []):
+            manager.relations[key] = value
+        manager.user_context = snapshot.get("user_context", {})
+        manager.conversation_history.extend(snapshot.get("conversation_history", []))
+        manager.created_at = datetime.fromisoformat(snapshot["created_at"])
+        manager.touch()
+        return manager
+
 class GlobalSessionRegistry:
     """
     Global registry for all active sessions.
     Simplified for three-table architecture.
+
+    Sessions are kept in a min-heap keyed by last activity. Cleanup only
+    pops sessions older than the cutoff; a popped session whose activity
+    was refreshed in the meantime is simply re-indexed.
     """
 
     _instance = None
@@ -132,9 +196,21 @@ class GlobalSessionRegistry:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance.active_sessions = {}
+            cls._instance.activity_index = ExpiryIndex()
+            cls._instance.limits = SessionLimits()
+            cls._instance.spilled_count = 0
+            cls._instance.evicted_count = 0
             cls._instance.initialized = False
+            cls._instance.cleanup_task = None
         return cls._instance
 
+    def configure(self, **limits):
+        """Override session limits (max_sessions, history_length, cache_entries, spill_to_db, spill_after_seconds, cleanup_interval)"""
+        for key, value in limits.items():
+            if not hasattr(self.limits, key):
+                raise ValueError(f"Unknown session limit: {key}")
+            setattr(self.limits, key, value)
+
     async def initialize(self):
         """Initialize session registry"""
         if self.initialized:
@@ -144,18 +220,63 @@ class GlobalSessionRegistry:
         self.initialized = True
         print(f"✅ Session registry ready")
 
+    def _index(self, session_manager: SessionDataManager):
+        self.activity_index.schedule(session_manager.session_id, session_manager.last_activity.timestamp())
+
     async def get_or_create_session_manager(self, session_id: str = None) -> SessionDataManager:
-        """Get or create session manager"""
+        """Get or create session manager (rehydrates spilled sessions)"""
         if session_id is None:
             session_id = str(_ulid.ulid())
-            
-        if session_id not in self.active_sessions:
-            print(f"🆕 Creating new session: {session_id}")
-            self.active_sessions[session_id] = SessionDataManager(session_id)
-        else:
-            self.active_sessions[session_id].last_activity = datetime.now()
 
-        return self.active_sessions[session_id]
+        session_manager = self.active_sessions.get(session_id)
+        if session_manager is not None:
+            session_manager.touch()
+        else:
+            snapshot = None
+            if self.limits.spill_to_db:
+                snapshot = await SessionSpillStore.restore(session_id, "session_data")
+
+            if snapshot:
+                print(f"♻️ Rehydrating spilled session: {session_id}")
+                session_manager = SessionDataManager.from_snapshot(snapshot, self.limits)
+            else:
+                print(f"🆕 Creating new session: {session_id}")
+                session_manager = SessionDataManager(session_id, self.limits)
+
+            self.active_sessions[session_id] = session_manager
+            await self._enforce_session_limit()
+
+        self._index(session_manager)
+        self._start_cleanup()
+        return session_manager
+
+    def _start_cleanup(self):
+        """Start the periodic spill/cleanup loop (once, when an event loop is running)"""
+        if self.cleanup_task is not None and not self.cleanup_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self.cleanup_task = loop.create_task(self._cleanup_loop())
+
+    async def stop_cleanup(self):
+        if self.cleanup_task is not None:
+            self.cleanup_task.cancel()
+            await asyncio.gather(self.cleanup_task, return_exceptions=True)
+            self.cleanup_task = None
+
+    async def _cleanup_loop(self):
+        """Spill idle sessions and drop old ones every limits.cleanup_interval seconds"""
+        while True:
+            await asyncio.sleep(self.limits.cleanup_interval)
+            try:
+                await self.spill_idle_sessions()
+                await self.cleanup_old_sessions()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Session cleanup error: {e}")
 
     async def get_session_manager(self, session_id: str = None) -> SessionDataManager:
         """Alias for get_or_create_session_manager for backward compatibility"""
@@ -167,10 +288,44 @@ class GlobalSessionRegistry:
 
     async def cleanup_session(self, session_id: str):
         """Cleanup session and associated data"""
+        self.activity_index.remove(session_id)
         if session_id in self.active_sessions:
             print(f"🗑️ Cleaning up session: {session_id}")
             del self.active_sessions[session_id]
 
+    async def _evict(self, session_id: str, spill: bool) -> None:
+        session_manager = self.active_sessions.pop(session_id, None)
+        self.activity_index.remove(session_id)
+        if session_manager is None:
+            return
+        if spill and await SessionSpillStore.spill(session_id, "session_data", session_manager.to_snapshot()):
+            self.spilled_count += 1
+        else:
+            self.evicted_count += 1
+
+    async def _enforce_session_limit(self):
+        """Evict least recently active sessions above limits.max_sessions"""
+        while len(self.active_sessions) > self.limits.max_sessions:
+            session_id = self.activity_index.pop_oldest()
+            if session_id is None:
+                break
+            await self._evict(session_id, spill=self.limits.spill_to_db)
+
+    async def _pop_inactive_since(self, cutoff: float) -> List[str]:
+        """Pop sessions whose last activity is older than cutoff"""
+        inactive = []
+        for session_id in self.activity_index.pop_due(cutoff):
+            session_manager = self.active_sessions.get(session_id)
+            if session_manager is None:
+                continue
+            last_activity = session_manager.last_activity.timestamp()
+            if last_activity > cutoff:
+                # Activity refreshed without going through the registry
+                self.activity_index.schedule(session_id, last_activity)
+            else:
+                inactive.append(session_id)
+        return inactive
+
     async def build_conversation_context(self, session_id: str, message: str) -> Dict[str, Any]:
         """Build conversation context for AI processing"""
         session_manager = self.active_sessions.get(session_id)
@@ -191,65 +346,75 @@ class GlobalSessionRegistry:
             "session_id": session_id,
             "message": message,
             "user_context": session_manager.user_context,
-            "conversation_history": session_manager.conversation_history,
+            "conversation_history": list(session_manager.conversation_history),
             "session_stats": stats,
             "timestamp": datetime.now().isoformat(),
             "system_status": "active",
             "architecture": "three_table"
         }
 
+    async def spill_idle_sessions(self, idle_seconds: int = None) -> int:
+        """Move sessions idle longer than idle_seconds to Postgres"""
+        if not self.limits.spill_to_db:
+            return 0
+
+        idle_seconds = idle_seconds or self.limits.spill_after_seconds
+        idle = await self._pop_inactive_since(time.time() - idle_seconds)
+        for session_id in idle:
+            await self._evict(session_id, spill=True)
+
+        if idle:
+            print(f"💾 Spilled {len(idle)} idle sessions")
+        return len(idle)
+
     async def cleanup_old_sessions(self, max_age_hours: int = 24):
         """Clean up old inactive sessions"""
-        cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
-        sessions_to_remove = []
-
-        for session_id, session_manager in self.active_sessions.items():
-            if session_manager.last_activity.timestamp() < cutoff_time:
-                sessions_to_remove.append(session_id)
+        max_age_seconds = max_age_hours * 3600
+        sessions_to_remove = await self._pop_inactive_since(time.time() - max_age_seconds)
 
         for session_id in sessions_to_remove:
             await self.cleanup_session(session_id)
 
+        if self.limits.spill_to_db:
+            await SessionSpillStore.purge_older_than(max_age_seconds)
+
         if sessions_to_remove:
             print(f"🧹 Cleaned up {len(sessions_to_remove)} old sessions")
 
         return len(sessions_to_remove)
 
-# Add missing method to SessionDataManager
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-
-# Global session registry
-global_session_registry = {}
-
-class SessionDataManager:
-    """Extended with missing methods for compatibility"""
-    
-    def __init__(self, session_id: str):
-        self.session_id = session_id
-        self.templates = {}
-        self.instances = {}
-        self.relations = {}
-        self.user_context = {}
-        self.conversation_history = []
-        self.created_at = datetime.now()
-        self.last_activity = datetime.now()
+    def get_memory_report(self, sample_size: int = 100) -> Dict[str, Any]:
+        """Per-session memory accounting (approximate, sampled for large registries)"""
+        session_ids = list(self.active_sessions.keys())
+        sampled = session_ids[:sample_size]
+        per_session = {
+            session_id: self.active_sessions[session_id].memory_usage()["total"]
+            for session_id in sampled
+        }
+        sampled_total = sum(per_session.values())
+        estimated_total = sampled_total * len(session_ids) // len(sampled) if sampled else 0
 
-    async def build_conversation_context(self, message: str) -> Dict[str, Any]:
-        """Build conversation context for this session"""
         return {
-            "session_id": self.session_id,
-            "message": message,
-            "user_context": self.user_context,
-            "conversation_history": self.conversation_history,
-            "timestamp": datetime.now().isoformat(),
-            "system_status": "active"
+            "active_sessions": len(session_ids),
+            "indexed_sessions": len(self.activity_index),
+            "sampled_sessions": len(sampled),
+            "estimated_total_bytes": estimated_total,
+            "largest_sessions": sorted(per_session.items(), key=lambda item: item[1], reverse=True)[:10],
+            "spilled_sessions": self.spilled_count,
+            "evicted_sessions": self.evicted_count,
+            "limits": self.limits.__dict__.copy()
         }
 
-    # ... rest of methods remain unchanged
-
 # SessionManager alias for backward compatibility
 SessionManager = SessionDataManager
 
 # Global instance for backward compatibility
-global_session_registry = GlobalSessionRegistry()
\ No newline at end of file
+global_session_registry = GlobalSessionRegistry()
+
+from .memory_accounting import memory_accountant
+memory_accountant.register("sessions.active", lambda: global_session_registry.active_sessions)
+memory_accountant.register(
+    "sessions.histories",
+    lambda: [session.conversation_history for session in global_session_registry.active_sessions.values()],
+    count=lambda histories: sum(len(history) for history in histories)
+)
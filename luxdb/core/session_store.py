@@ -0,0 +1,230 @@
+"""
+Struktury pomocnicze dla rejestrów sesji.
+
+- ExpiryIndex: kopiec minimalny terminów wygaśnięcia (leniwe usuwanie)
+- BoundedCache: słownik LRU z limitem wpisów
+- approximate_size: przybliżony głęboki rozmiar obiektu z ograniczonym próbkowaniem
+- SessionSpillStore: zrzut bezczynnych sesji do PostgreSQL
+"""
+
+import heapq
+import itertools
+import json
+import os
+import sys
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class SessionLimits:
+    """Limity pamięci rejestrów sesji"""
+    max_sessions: int = int(os.getenv("LUXDB_MAX_SESSIONS", "50000"))
+    history_length: int = int(os.getenv("LUXDB_SESSION_HISTORY", "100"))
+    cache_entries: int = int(os.getenv("LUXDB_SESSION_CACHE_ENTRIES", "500"))
+    spill_to_db: bool = os.getenv("LUXDB_SESSION_SPILL", "0") == "1"
+    spill_after_seconds: int = int(os.getenv("LUXDB_SESSION_SPILL_AFTER", "900"))
+    cleanup_interval: int = int(os.getenv("LUXDB_SESSION_CLEANUP_INTERVAL", "60"))
+
+
+class ExpiryIndex:
+    """
+    Kopiec minimalny (termin, klucz). Nieaktualne wpisy są pomijane
+    przy zdejmowaniu, więc przesunięcie terminu to O(log n) bez skanowania.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._deadlines: Dict[Hashable, float] = {}
+        self._counter = itertools.count()
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Ustawia (lub przesuwa) termin dla klucza"""
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        # Zapobiega rozrostowi kopca przy częstych przesunięciach terminów
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._compact()
+
+    def remove(self, key: Hashable) -> None:
+        """Usuwa klucz z indeksu (wpis w kopcu zostanie pominięty)"""
+        self._deadlines.pop(key, None)
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        return self._deadlines.get(key)
+
+    def next_deadline(self) -> Optional[float]:
+        """Najbliższy aktualny termin lub None"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> List[Hashable]:
+        """Zdejmuje klucze z terminem <= now"""
+        due = []
+        while self._heap and (limit is None or len(due) < limit):
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due.append(key)
+        return due
+
+    def pop_oldest(self) -> Optional[Hashable]:
+        """Zdejmuje klucz z najwcześniejszym terminem"""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        _, _, key = heapq.heappop(self._heap)
+        del self._deadlines[key]
+        return key
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap:
+            deadline, _, key = heap[0]
+            if self._deadlines.get(key) == deadline:
+                return
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        self._heap = [(d, next(self._counter), k) for k, d in self._deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+
+class BoundedCache(OrderedDict):
+    """Słownik LRU - po przekroczeniu max_entries usuwa najdawniej używane wpisy"""
+
+    def __init__(self, max_entries: int = 500, *args, **kwargs):
+        self.max_entries = max_entries
+        self.evictions = 0
+        super().__init__(*args, **kwargs)
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_entries:
+            self.popitem(last=False)
+            self.evictions += 1
+
+
+def approximate_size(obj: Any, max_items: int = 64, max_depth: int = 6) -> int:
+    """
+    Przybliżony głęboki rozmiar obiektu w bajtach.
+    Dla dużych kolekcji mierzy pierwsze max_items elementów i ekstrapoluje.
+    """
+    seen = set()
+
+    def _size(o: Any, depth: int) -> int:
+        if id(o) in seen:
+            return 0
+        seen.add(id(o))
+        size = sys.getsizeof(o, 0)
+        if depth >= max_depth:
+            return size
+
+        if isinstance(o, dict):
+            items = o.items()
+            count = len(o)
+            sampled = itertools.islice(items, max_items)
+            part = sum(_size(k, depth + 1) + _size(v, depth + 1) for k, v in sampled)
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            count = len(o)
+            part = sum(_size(i, depth + 1) for i in itertools.islice(o, max_items))
+        elif hasattr(o, "__dict__") and not isinstance(o, type):
+            return size + _size(vars(o), depth + 1)
+        else:
+            return size
+
+        sampled_count = min(count, max_items)
+        if sampled_count and count > sampled_count:
+            part = part * count // sampled_count
+        return size + part
+
+    return _size(obj, 0)
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, deque)):
+        return list(value)
+    return str(value)
+
+
+class SessionSpillStore:
+    """Przechowuje zrzuty bezczynnych sesji w tabeli session_spill"""
+
+    @staticmethod
+    async def spill(session_id: str, kind: str, snapshot: Dict[str, Any]) -> bool:
+        """Zapisuje zrzut sesji (nadpisuje poprzedni)"""
+        from .postgre_db import Postgre_db
+
+        try:
+            pool = await Postgre_db.get_db_pool()
+            async with pool.acquire() as conn:
+                await conn.execute("""
+                    INSERT INTO session_spill (session_id, kind, snapshot, spilled_at)
+                    VALUES ($1, $2, $3, CURRENT_TIMESTAMP)
+                    ON CONFLICT (session_id) DO UPDATE
+                    SET kind = EXCLUDED.kind, snapshot = EXCLUDED.snapshot, spilled_at = EXCLUDED.spilled_at
+                """, session_id, kind, json.dumps(snapshot, default=_json_default))
+            return True
+        except Exception as e:
+            print(f"❌ Błąd zrzutu sesji {session_id}: {e}")
+            return False
+
+    @staticmethod
+    async def restore(session_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Pobiera i usuwa zrzut sesji"""
+        from .postgre_db import Postgre_db
+
+        try:
+            pool = await Postgre_db.get_db_pool()
+            async with pool.acquire() as conn:
+                snapshot = await conn.fetchval("""
+                    DELETE FROM session_spill
+                    WHERE session_id = $1 AND kind = $2
+                    RETURNING snapshot
+                """, session_id, kind)
+            if snapshot is None:
+                return None
+            return json.loads(snapshot) if isinstance(snapshot, str) else snapshot
+        except Exception as e:
+            print(f"❌ Błąd odtwarzania sesji {session_id}: {e}")
+            return None
+
+    @staticmethod
+    async def purge_older_than(max_age_seconds: int) -> int:
+        """Usuwa zrzuty starsze niż max_age_seconds"""
+        from .postgre_db import Postgre_db
+
+        try:
+            pool = await Postgre_db.get_db_pool()
+            async with pool.acquire() as conn:
+                status = await conn.execute("""
+                    DELETE FROM session_spill
+                    WHERE spilled_at < CURRENT_TIMESTAMP - make_interval(secs => $1)
+                """, float(max_age_seconds))
+            return int(status.split()[-1]) if status else 0
+        except Exception as e:
+            print(f"❌ Błąd czyszczenia zrzutów sesji: {e}")
+            return 0
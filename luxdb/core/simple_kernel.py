@@ -490,4 +490,7 @@ def execute(request=None, being_context=None, **kwargs):
             return None
 
 # Globalna instancja
-simple_kernel = SimpleKernel()
\ No newline at end of file
+simple_kernel = SimpleKernel()
+
+from .memory_accounting import memory_accountant
+memory_accountant.register("simple_kernel.active_tasks", lambda: simple_kernel.active_tasks)
@@ -0,0 +1,193 @@
+"""
+Zmaterializowane tabele podsumowań dla dashboardów.
+
+Agregaty liczone z beings (liczby Being per Soul, aktywne/nieaktywne,
+TTL, histogram `_function_stats`) są trzymane w widokach
+zmaterializowanych i odświeżane cyklicznie (REFRESH ... CONCURRENTLY -
+odczyty nie są blokowane). Odczyt dashboardu to wtedy skan kilku
+wierszy zamiast agregacji całej tabeli.
+
+LUXDB_SUMMARY_REFRESH_INTERVAL > 0 włącza cykliczne odświeżanie
+(domyślnie wyłączone). Niezależnie od niego odczyt odświeża widoki,
+gdy ostatnie odświeżenie w tym procesie jest starsze niż
+LUXDB_SUMMARY_MAX_STALENESS sekund - dane nigdy nie są zamrożone
+(`refreshed_at` w każdym wierszu).
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from .being_pool import ACTIVE_FLAG
+
+SUMMARY_VIEWS = {
+    "beings_summary": {
+        "query": f"""
+            SELECT soul_hash,
+                   COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE {ACTIVE_FLAG}) AS active,
+                   COUNT(*) FILTER (WHERE NOT {ACTIVE_FLAG}) AS inactive,
+                   COUNT(*) FILTER (WHERE ttl_expires IS NOT NULL) AS with_ttl,
+                   MIN(created_at) AS first_created,
+                   MAX(updated_at) AS last_updated,
+                   NOW() AS refreshed_at
+            FROM beings
+            GROUP BY soul_hash
+        """,
+        "key": "soul_hash"
+    },
+    "beings_function_summary": {
+        "query": """
+            SELECT beings.soul_hash,
+                   stats.key AS function_name,
+                   COUNT(*) AS beings,
+                   SUM(COALESCE((stats.value->>'total_calls')::bigint, 0)) AS total_calls,
+                   SUM(COALESCE((stats.value->>'successful_calls')::bigint, 0)) AS successful_calls,
+                   MAX(stats.value->>'last_called') AS last_called,
+                   NOW() AS refreshed_at
+            FROM beings,
+                 jsonb_each(CASE WHEN jsonb_typeof(beings.data->'_function_stats') = 'object'
+                                 THEN beings.data->'_function_stats' ELSE '{}'::jsonb END) AS stats
+            WHERE beings.data ? '_function_stats'
+            GROUP BY beings.soul_hash, stats.key
+        """,
+        "key": "soul_hash, function_name"
+    },
+}
+
+
+class SummaryTables:
+    """Tworzy i cyklicznie odświeża widoki zmaterializowane podsumowań beings"""
+
+    def __init__(self, interval: float = None, max_staleness: float = None):
+        self.interval = interval if interval is not None else float(os.getenv("LUXDB_SUMMARY_REFRESH_INTERVAL", "0"))
+        self.max_staleness = max_staleness if max_staleness is not None else float(os.getenv("LUXDB_SUMMARY_MAX_STALENESS", "60"))
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+        self._refreshed_at: Optional[float] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self.stats = {"refreshes": 0, "errors": 0, "last_refresh_ms": None, "refreshes_on_read": 0}
+
+    async def ensure(self) -> None:
+        """Tworzy widoki (z indeksem unikalnym wymaganym przez REFRESH CONCURRENTLY)"""
+        if self._ready:
+            return
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            for name, view in SUMMARY_VIEWS.items():
+                await conn.execute(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {view['query']}")
+                await conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{name}_key ON {name} ({view['key']})")
+        self._ready = True
+
+    async def refresh(self) -> None:
+        from .postgre_db import Postgre_db
+
+        await self.ensure()
+        started = time.perf_counter()
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            for name in SUMMARY_VIEWS:
+                await conn.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}")
+        self._refreshed_at = time.monotonic()
+        self.stats["refreshes"] += 1
+        self.stats["last_refresh_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    def _is_stale(self) -> bool:
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.max_staleness
+
+    async def _ensure_fresh(self) -> None:
+        """Odświeża widoki przed odczytem, gdy są starsze niż max_staleness (jedno odświeżenie naraz)"""
+        if not self._is_stale():
+            return
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            if self._is_stale():
+                await self.refresh()
+                self.stats["refreshes_on_read"] += 1
+
+    # --- odczyt ---
+
+    async def _fetch(self, sql: str, *args) -> List[Dict[str, Any]]:
+        from .postgre_db import Postgre_db
+
+        await self._ensure_fresh()
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(sql, *args)
+        return [dict(row) for row in rows]
+
+    async def souls(self, soul_hash: str = None) -> List[Dict[str, Any]]:
+        """Liczniki Being per Soul (total / active / inactive / with_ttl)"""
+        return await self._fetch("""
+            SELECT * FROM beings_summary
+            WHERE $1::text IS NULL OR soul_hash = $1
+            ORDER BY total DESC
+        """, soul_hash)
+
+    async def functions(self, soul_hash: str = None) -> List[Dict[str, Any]]:
+        """Histogram wywołań funkcji (`_function_stats`) per Soul"""
+        return await self._fetch("""
+            SELECT * FROM beings_function_summary
+            WHERE $1::text IS NULL OR soul_hash = $1
+            ORDER BY total_calls DESC
+        """, soul_hash)
+
+    async def totals(self) -> Dict[str, Any]:
+        rows = await self._fetch("""
+            SELECT COALESCE(SUM(total), 0) AS beings_total,
+                   COALESCE(SUM(active), 0) AS beings_active,
+                   COUNT(*) AS souls_with_beings,
+                   MIN(refreshed_at) AS refreshed_at
+            FROM beings_summary
+        """)
+        return rows[0]
+
+    # --- cykliczne odświeżanie ---
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self) -> None:
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Brak pętli - refresh() trzeba wywołać ręcznie
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Summary tables refresh error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "interval": self.interval,
+            "max_staleness": self.max_staleness,
+            "stale": self._is_stale(),
+            "running": self._task is not None and not self._task.done()
+        }
+
+
+# Globalna instancja
+summary_tables = SummaryTables()
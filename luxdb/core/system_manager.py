@@ -18,6 +18,9 @@ import ulid
 from .simple_kernel import simple_kernel
 from .intelligent_kernel import intelligent_kernel
 from .session_data_manager import global_session_registry
+from .loop_monitor import loop_monitor
+from .memory_accounting import memory_accountant
+from .summary_tables import summary_tables
 from .being_ownership_manager import BeingOwnershipManager
 from ..models.soul import Soul
 from ..models.being import Being
@@ -63,7 +66,12 @@ class SystemManager:
         if load_genotypes:
             await self._load_genotypes()
             
-        # 4. System ready
+        # 4. Event loop lag / blocking call monitoring, memory snapshots
+        loop_monitor.start()
+        memory_accountant.start()
+        summary_tables.start()
+            
+        # 5. System ready
         self.active = True
         self.system_stats["started_at"] = datetime.now().isoformat()
         
@@ -206,17 +214,27 @@ class SystemManager:
         """
         Complete system status
         """
-        souls = await Soul.get_all()
-        beings = await Being.get_all()
+        from .postgre_db import Postgre_db
+        from ..repository.being_aggregates import Count
+
+        # Liczniki z zapytań agregujących zamiast ładowania wszystkich Soul/Being
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            souls_total = await conn.fetchval("SELECT COUNT(*) FROM souls")
+        beings = await Being.query().aggregate(total=Count(), active=Count(filter={"active": True}))
         
         return {
             "system_active": self.active,
             "kernel_type": self.kernel_type,
             "kernel_ulid": self.kernel_instance.ulid if self.kernel_instance else None,
-            "souls_total": len(souls),
-            "beings_total": len(beings),
+            "souls_total": souls_total,
+            "beings_total": beings["total"],
+            "beings_active": beings["active"],
             "active_sessions": len(self.active_sessions),
             "stats": self.system_stats,
+            "event_loop": loop_monitor.get_stats(),
+            "memory": memory_accountant.get_stats(),
+            "summary_tables": summary_tables.get_stats(),
             "timestamp": datetime.now().isoformat()
         }
 
@@ -0,0 +1,230 @@
+"""
+Reaper TTL - usuwa wygasłe byty z PostgreSQL.
+
+Terminy (beings.ttl_expires) trzyma kopiec minimalny, więc reaper
+śpi dokładnie do najbliższego terminu (a nowy, wcześniejszy termin go
+budzi). Usuwanie idzie partiami po indeksie idx_beings_ttl_expires
+z FOR UPDATE SKIP LOCKED - każda partia to krótka transakcja.
+Co sweep_interval sekund reaper sprawdza też bazę, żeby złapać byty
+zapisane przez inne procesy.
+
+Usunięte ULID-y są publikowane słuchaczom (cache repozytorium,
+aktywne byty kernela, katalog Master Being).
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+
+from .session_store import ExpiryIndex
+
+EvictionListener = Callable[[List[str]], None]
+
+
+def _to_timestamp(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class TTLReaper:
+    """Usuwa wygasłe byty partiami i powiadamia cache o eksmisjach"""
+
+    def __init__(self, batch_size: int = None, batch_pause: float = None, sweep_interval: float = None):
+        self.batch_size = batch_size or int(os.getenv("LUXDB_TTL_BATCH_SIZE", "500"))
+        self.batch_pause = batch_pause if batch_pause is not None else float(os.getenv("LUXDB_TTL_BATCH_PAUSE", "0.05"))
+        self.sweep_interval = sweep_interval or float(os.getenv("LUXDB_TTL_SWEEP_INTERVAL", "60"))
+
+        self.expiry_index = ExpiryIndex()
+        self.listeners: List[EvictionListener] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._defaults_installed = False
+
+        self.stats = {"reaped": 0, "batches": 0, "runs": 0, "errors": 0, "events_published": 0}
+
+    # --- terminy ---
+
+    def track(self, ulid: str, ttl_expires) -> None:
+        """Rejestruje (lub usuwa) termin wygaśnięcia bytu"""
+        deadline = _to_timestamp(ttl_expires)
+        if deadline is None:
+            self.expiry_index.remove(ulid)
+            return
+
+        previous_next = self.expiry_index.next_deadline()
+        self.expiry_index.schedule(ulid, deadline)
+        self._ensure_running()
+        if self._wakeup is not None and (previous_next is None or deadline < previous_next):
+            self._wakeup.set()
+
+    def untrack(self, ulid: str) -> None:
+        self.expiry_index.remove(ulid)
+
+    # --- zdarzenia ---
+
+    def subscribe(self, listener: EvictionListener) -> None:
+        """Dodaje słuchacza wywoływanego z listą usuniętych ULID-ów"""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def _install_default_listeners(self) -> None:
+        if self._defaults_installed:
+            return
+        self._defaults_installed = True
+
+        def evict_repository_cache(ulids: List[str]) -> None:
+            from ..repository.soul_repository import BeingRepository
+            for ulid in ulids:
+                BeingRepository._being_registry.pop(ulid, None)
+
+        def evict_master_directory(ulids: List[str]) -> None:
+            from .master_directory import master_directory
+            for ulid in ulids:
+                master_directory.invalidate_being(ulid)
+
+        def evict_kernel_beings(ulids: List[str]) -> None:
+            from .intelligent_kernel import intelligent_kernel
+            for ulid in ulids:
+                intelligent_kernel.active_beings.pop(ulid, None)
+
+        for listener in (evict_repository_cache, evict_master_directory, evict_kernel_beings):
+            self.subscribe(listener)
+
+    def _publish(self, ulids: List[str]) -> None:
+        if not ulids:
+            return
+        for listener in self.listeners:
+            try:
+                listener(ulids)
+            except Exception as e:
+                print(f"⚠️ TTL eviction listener {getattr(listener, '__name__', listener)} failed: {e}")
+        self.stats["events_published"] += len(ulids)
+
+    # --- usuwanie ---
+
+    async def reap_due(self) -> int:
+        """Usuwa wszystkie wygasłe byty partiami; zwraca liczbę usuniętych"""
+        from .postgre_db import Postgre_db
+
+        self.stats["runs"] += 1
+        now = datetime.now()
+        due_in_memory: Set[str] = set(self.expiry_index.pop_due(now.timestamp()))
+        deleted_total = 0
+
+        pool = await Postgre_db.get_db_pool()
+        while True:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    DELETE FROM beings
+                    WHERE ulid IN (
+                        SELECT ulid FROM beings
+                        WHERE ttl_expires IS NOT NULL AND ttl_expires <= $1
+                        ORDER BY ttl_expires
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING ulid
+                """, now, self.batch_size)
+
+            ulids = [row["ulid"] for row in rows]
+            due_in_memory.difference_update(ulids)
+            for ulid in ulids:
+                self.expiry_index.remove(ulid)
+            self._publish(ulids)
+
+            deleted_total += len(ulids)
+            self.stats["batches"] += 1
+            if len(ulids) < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)  # oddaj miejsce innym transakcjom
+
+        # Byty tylko w pamięci (lub usunięte już przez inny proces)
+        self._publish(list(due_in_memory))
+
+        self.stats["reaped"] += deleted_total
+        if deleted_total:
+            print(f"⏰ TTL reaper removed {deleted_total} expired beings")
+        return deleted_total
+
+    async def _load_upcoming(self) -> None:
+        """Wczytuje najbliższe terminy z bazy do kopca"""
+        from .postgre_db import Postgre_db
+
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT ulid, ttl_expires FROM beings
+                WHERE ttl_expires IS NOT NULL
+                ORDER BY ttl_expires
+                LIMIT $1
+            """, self.batch_size)
+        for row in rows:
+            self.expiry_index.schedule(row["ulid"], row["ttl_expires"].timestamp())
+
+    # --- pętla ---
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # Brak pętli - reap_due() trzeba wywołać ręcznie
+            self._install_default_listeners()
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    def start(self) -> None:
+        self._ensure_running()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        next_sweep = 0.0
+        while True:
+            try:
+                now = time.time()
+                if now >= next_sweep:
+                    await self._load_upcoming()
+                    next_sweep = now + self.sweep_interval
+
+                deadline = self.expiry_index.next_deadline()
+                if deadline is not None and deadline <= now:
+                    await self.reap_due()
+                    continue
+
+                wake_at = min(deadline, next_sweep) if deadline is not None else next_sweep
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(0.0, wake_at - time.time()))
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ TTL reaper error: {e}")
+                await asyncio.sleep(min(self.sweep_interval, 30))
+
+    def get_stats(self) -> Dict[str, object]:
+        next_deadline = self.expiry_index.next_deadline()
+        return {
+            **self.stats,
+            "tracked": len(self.expiry_index),
+            "next_expiry": datetime.fromtimestamp(next_deadline).isoformat() if next_deadline else None,
+            "running": self._task is not None and not self._task.done(),
+            "batch_size": self.batch_size
+        }
+
+
+# Globalna instancja
+ttl_reaper = TTLReaper()
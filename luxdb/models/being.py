@@ -36,6 +36,7 @@ class Being:
     data: Dict[str, Any] = field(default_factory=dict)
     access_zone: str = "public_zone"  # Domyślnie publiczne
     ttl_expires: Optional[datetime] = None
+    _ttl_cleared: bool = field(default=False, init=False, repr=False)  # clear_ttl() do zapisu
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -162,6 +163,22 @@ class Being:
         beings = result.get('beings', []) if result.get('success') else []
         return [being for being in beings if being is not None]
 
+    @classmethod
+    def query(cls, soul=None) -> 'BeingQuery':
+        """
+        Zapytanie o Being po wartościach atrybutów, wykonywane w SQL.
+
+        Being.query(soul).where(level__gt=5, tags__contains="fire").order_by("-created_at").limit(50)
+
+        Args:
+            soul: Soul (typy porównań z py_type atrybutów), soul_hash albo None (wszystkie Being)
+
+        Returns:
+            BeingQuery - iterowany przez `async for`, albo .all() / .first() / .count()
+        """
+        from ..repository.being_query import BeingQuery
+        return BeingQuery(soul, being_class=cls)
+
     @classmethod
     async def get_or_create(cls, soul_or_hash=None, attributes: Dict[str, Any] = None,
                            unique_by: str = "soul_hash", soul: 'Soul' = None, soul_hash: str = None,
@@ -206,27 +223,18 @@ class Being:
 
         # POOLING LOGIC - ograniczona liczba aktywnych instancji
         if max_instances is not None:
-            beings_for_soul = await cls.get_by_soul_hash(target_soul.soul_hash)
-            active_beings = [b for b in beings_for_soul if b.data.get('active', False)]
-
-            if len(active_beings) < max_instances:
-                # Sprawdź czy są nieaktywne do reaktywacji
-                inactive_beings = [b for b in beings_for_soul if not b.data.get('active', False)]
-                if inactive_beings:
-                    # Reaktywuj nieaktywny Being
-                    existing_being = inactive_beings[0]
-                    existing_being.data['active'] = True
-                    existing_being.updated_at = datetime.now()
-
-                    if attributes:
-                        existing_being.data.update(attributes)
-
-                    await existing_being.save()
-                    print(f"🔄 Reactivated pooled Being: {existing_being.ulid[:8]} ({len(active_beings)+1}/{max_instances})")
-                    return existing_being
-            else:
-                # Limit osiągnięty, zwróć pierwszy aktywny
-                first_active = active_beings[0]
+            from ..core.being_pool import being_pool
+
+            pooled_being = await being_pool.acquire(
+                target_soul, max_instances, attributes=attributes,
+                factory=lambda: cls.create(target_soul, attributes=attributes)
+            )
+            if pooled_being is not None:
+                return pooled_being
+
+            # Limit osiągnięty, zwróć istniejący aktywny
+            first_active = await being_pool.any_active(target_soul)
+            if first_active is not None:
                 print(f"⚠️ Pool limit reached ({max_instances}), returning existing Being: {first_active.ulid[:8]}")
                 return first_active
 
@@ -249,15 +257,7 @@ class Being:
             return existing_being
 
         # Jeśli nie istnieje - utwórz nowy
-        new_being = await cls.create(target_soul, attributes=attributes)
-
-        # Ustaw active dla poolingu
-        if max_instances is not None:
-            new_being.data['active'] = True
-            await new_being.save()
-            print(f"🆕 Created new pooled Being: {new_being.ulid[:8]} (active)")
-
-        return new_being
+        return await cls.create(target_soul, attributes=attributes)
 
     @classmethod
     async def create(cls, soul_or_hash=None, attributes: Dict[str, Any] = None, force_new: bool = False, soul: 'Soul' = None, soul_hash: str = None) -> 'Being':
@@ -494,8 +494,10 @@ class Being:
                     'data': self.data
                 }
 
-            # Wykonaj handler
-            if asyncio.iscoroutinefunction(handler):
+            # Wykonaj handler zgodnie z polityką wykonania z genotypu Soul
+            if self._soul_cache is not None:
+                result = await self._soul_cache._call_function(handler_name, handler, *args, **kwargs)
+            elif asyncio.iscoroutinefunction(handler):
                 result = await handler(*args, **kwargs)
             else:
                 result = handler(*args, **kwargs)
@@ -598,21 +600,26 @@ class Being:
             Please provide a realistic result for this function call.
             """
 
-            response = await openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
+            from luxdb.core.llm_gateway import OpenAIBackend, llm_gateway
+
+            # Identyczne wywołania trafiają do cache bramy LLM
+            response = await llm_gateway.chat(
+                [
                     {"role": "system", "content": "You are a function execution assistant. Execute the requested function and provide realistic results."},
                     {"role": "user", "content": prompt}
                 ],
+                model="gpt-4",
+                backend=OpenAIBackend(client=openai_client),
                 tools=[function_schema] if function_schema else None,
-                tool_choice="auto"
+                tool_choice="auto" if function_schema else None
             )
 
             return {
                 "function_name": function_name,
                 "executed_via": "real_openai_api",
                 "arguments": {"args": args, "kwargs": kwargs},
-                "openai_response": response.choices[0].message.content,
+                "openai_response": response.content,
+                "cached": response.cached,
                 "timestamp": datetime.now().isoformat()
             }
 
@@ -767,7 +774,7 @@ class Being:
                     )
 
                 # Prosta logika wyboru - można rozbudować o AI/ML
-                selected_function = self._select_best_function_for_data(data, available_functions)
+                selected_function = self._select_best_function_for_data(data, available_functions, soul)
                 print(f"🧠 Master {self.alias} intelligently selected function: {selected_function}")
 
                 result = await self.execute_soul_function(selected_function, data=data, **kwargs)
@@ -784,15 +791,25 @@ class Being:
                 error_code="INTELLIGENT_EXECUTION_ERROR"
             )
 
-    def _select_best_function_for_data(self, data: Dict[str, Any], available_functions: List[str]) -> str:
+    def _select_best_function_for_data(self, data: Dict[str, Any], available_functions: List[str],
+                                       soul: 'Soul' = None) -> str:
         """
         Inteligentne wybieranie najlepszej funkcji dla danych.
-        Można rozbudować o zaawansowaną logikę AI/ML.
+        Klucz lub tekstowa wartość danych będąca nazwą funkcji wybiera ją
+        (dokładne dopasowanie w routerze intencji Soul).
         """
         if not available_functions:
             return "execute"  # fallback
 
-        # Prosta logika - można zastąpić zaawansowanym AI
+        if data and soul is not None:
+            # Tylko dokładne dopasowanie nazwy funkcji (klucz lub tekstowa wartość danych)
+            router = soul.get_intent_router()
+            for key, value in data.items():
+                for text in (key, value):
+                    match = router.route(text, candidates=available_functions) if isinstance(text, str) else None
+                    if match:
+                        return match[0]
+
         if data:
             # Jeśli są dane, preferuj funkcje które prawdopodobnie je przetwarzają
             processing_functions = [f for f in available_functions if any(
@@ -858,38 +875,20 @@ class Being:
         else:
             return save_result
 
+    async def release_to_pool(self) -> None:
+        """Oddaje Being do puli (lokalna lista wolnych, nadmiar wraca do bazy jako nieaktywny)"""
+        from ..core.being_pool import being_pool
+        await being_pool.release(self)
+
     @classmethod
     async def get_pool_status(cls, soul_hash: str) -> Dict[str, Any]:
         """Zwraca status puli dla danego Soul"""
-        beings_for_soul = await cls.get_by_soul_hash(soul_hash)
-
-        active_beings = [b for b in beings_for_soul if b.data.get('active', False)]
-        inactive_beings = [b for b in beings_for_soul if not b.data.get('active', False)]
+        from ..core.being_pool import being_pool
 
         return {
             'success': True,
             'soul_hash': soul_hash,
-            'total_beings': len(beings_for_soul),
-            'active_count': len(active_beings),
-            'inactive_count': len(inactive_beings),
-            'active_beings': [
-                {
-                    'ulid': b.ulid,
-                    'alias': b.alias,
-                    'created_at': b.created_at.isoformat() if b.created_at else None,
-                    'updated_at': b.updated_at.isoformat() if b.updated_at else None
-                }
-                for b in active_beings
-            ],
-            'inactive_beings': [
-                {
-                    'ulid': b.ulid,
-                    'alias': b.alias,
-                    'created_at': b.created_at.isoformat() if b.created_at else None,
-                    'updated_at': b.updated_at.isoformat() if b.updated_at else None
-                }
-                for b in inactive_beings
-            ]
+            **(await being_pool.status(soul_hash))
         }
 
     async def save(self) -> Dict[str, Any]:
@@ -955,10 +954,13 @@ class Being:
 
     def get_function_mastery_info(self) -> Dict[str, Any]:
         """Zwraca informacje o masterowaniu funkcji przez tego Being"""
+        from ..core.function_cache import function_cache
+
         dynamic_functions = self.data.get('_dynamic_functions', {})
 
         return {
             'is_function_master': self.is_function_master(),
+            'cache_stats': function_cache.get_stats(self.soul_hash) if self.soul_hash else {},
             'managed_functions': self.data.get('_managed_functions', []),
             'function_count': len(self.data.get('_managed_functions', [])),
             'intelligent_executions': self.data.get('_intelligent_executions', 0),
@@ -1452,6 +1454,10 @@ class Being:
             self.data['_evolution_timestamp'] = datetime.now().isoformat()
             await self.save()
 
+            # Master Being starej Soul mógł zostać zmieniony - odśwież katalog kernela
+            from luxdb.core.master_directory import master_directory
+            master_directory.invalidate(current_soul.soul_hash)
+
             return GeneticResponseFormat.success_response(
                 data={
                     "evolution_successful": True,
@@ -1482,6 +1488,12 @@ class Being:
             self.ttl_expires = datetime.now() + timedelta(hours=hours)
         self.updated_at = datetime.now()
 
+    def clear_ttl(self):
+        """Usuwa TTL bytu - przy zapisie ttl_expires w bazie zostanie wyczyszczone"""
+        self.ttl_expires = None
+        self._ttl_cleared = True
+        self.updated_at = datetime.now()
+
     @classmethod
     async def get_by_ulid(cls, ulid_value: str) -> Optional['Being']:
         """
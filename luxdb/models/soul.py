@@ -6,7 +6,7 @@
 
 import ulid as _ulid
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, Callable, ClassVar
 import hashlib
 import json
 import asyncio
@@ -30,7 +30,7 @@ class Soul:
     """
     
     # Rejestr globalny instancji Soul - zawsze aktualny
-    _registry: Dict[str, Dict[str, Any]] = field(default_factory=dict, init=False)
+    _registry: ClassVar[Dict[str, Dict[str, Any]]] = {}
     
     # Podstawowe pola Soul
     soul_hash: str = None
@@ -365,7 +365,8 @@ class Soul:
         """Liczba instancji"""
         return len(self.instances)
 
-    async def execute(self, intent, ulid: str = None, context: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def execute(self, intent, ulid: str = None, context: Dict[str, Any] = None,
+                      persist: bool = True) -> Dict[str, Any]:
         """
         Uniwersalne wykonanie - główna funkcja komunikacji z Soul.
         
@@ -376,6 +377,7 @@ class Soul:
             intent: Intencja/prompt/dane - może być string, dict, lub cokolwiek
             ulid: ULID instancji (opcjonalny)
             context: Dodatkowy kontekst
+            persist: Czy od razu zapisać statystyki instancji (False przy zapisie zbiorczym)
             
         Returns:
             Wynik wykonania przez Soul
@@ -406,11 +408,8 @@ class Soul:
             if "execute" in self._function_registry:
                 main_func = self._function_registry["execute"]
                 
-                # Wykonaj główną funkcję execute
-                if asyncio.iscoroutinefunction(main_func):
-                    result = await main_func(intent, execution_context)
-                else:
-                    result = main_func(intent, execution_context)
+                # Wykonaj główną funkcję execute (zgodnie z polityką wykonania)
+                result = await self._call_function("execute", main_func, intent, execution_context)
                 
             else:
                 # Fallback - prosta analiza intencji jeśli brak głównej funkcji execute
@@ -422,7 +421,8 @@ class Soul:
                 instance_context["data"]["last_execution"] = datetime.now().isoformat()
                 instance_context["data"]["last_intent"] = str(intent)[:100]  # Pierwsze 100 znaków intencji
                 instance_context["updated_at"] = datetime.now().isoformat()
-                await self._persist_instance_to_database(instance_context)
+                if persist:
+                    await self._persist_instance_to_database(instance_context)
             
             return GeneticResponseFormat.success_response(
                 data={
@@ -443,45 +443,38 @@ class Soul:
 
     async def _fallback_intent_analysis(self, intent, execution_context: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Prosta analiza intencji gdy Soul nie ma głównej funkcji execute.
+        Analiza intencji gdy Soul nie ma głównej funkcji execute.
         
-        Soul może być rozbudowany z czasem o zaawansowaną analizę intencji,
-        embeddingi, i inteligentne mapowanie na funkcje.
+        Wykonywana jest tylko funkcja dopasowana dokładnie po nazwie
+        ("add", "run add"); podobne funkcje z indeksu TF-IDF (nazwy,
+        docstringi, opisy z genotypu) trafiają do closest_functions.
         """
-        intent_str = str(intent).lower() if intent else ""
-        
-        # Prosta analiza słów kluczowych
-        if any(keyword in intent_str for keyword in ["execute", "run", "call"]):
-            # Próba wyciągnięcia nazwy funkcji z intencji
-            words = intent_str.split()
-            for i, word in enumerate(words):
-                if word in ["execute", "run", "call"] and i + 1 < len(words):
-                    potential_function = words[i + 1]
-                    if potential_function in self._function_registry:
-                        return await self._execute_internal_function(potential_function, execution_context)
-        
-        # Sprawdź czy intencja bezpośrednio odpowiada nazwie funkcji
-        if intent_str in self._function_registry:
-            return await self._execute_internal_function(intent_str, execution_context)
+        router = self.get_intent_router()
+        match = router.route(str(intent)) if intent else None
+        if match:
+            return await self._execute_internal_function(match[0], execution_context)
         
         # Zwróć informacje o dostępnych funkcjach
         return {
             "intent_not_recognized": True,
             "received_intent": intent,
             "available_functions": list(self._function_registry.keys()),
+            "closest_functions": [name for name, _ in router.suggest(str(intent or ""))],
             "suggestion": "Try 'execute function_name' or use one of available function names directly"
         }
 
+    def get_intent_router(self):
+        """Router intencji tej Soul (cache po soul_hash)"""
+        from luxdb.core.intent_router import intent_routers
+        return intent_routers.for_soul(self)
+
     async def _execute_internal_function(self, function_name: str, execution_context: Dict[str, Any]) -> Dict[str, Any]:
         """Wykonuje konkretną funkcję Soul z pełnym kontekstem"""
         try:
             func = self._function_registry[function_name]
             
             # Wykonaj funkcję
-            if asyncio.iscoroutinefunction(func):
-                result = await func(execution_context)
-            else:
-                result = func(execution_context)
+            result = await self._call_function(function_name, func, execution_context)
             
             return {
                 "function_executed": function_name,
@@ -496,19 +489,139 @@ class Soul:
                 "success": False
             }
 
-    async def execute_on_all_instances(self, intent, context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Wykonuje intencję na wszystkich instancjach"""
+    async def _call_function(self, function_name: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Wywołuje funkcję Soul zgodnie z polityką wykonania z genotypu (inline/thread/process).
+        Funkcje oznaczone jako "pure" lub z sekcją "cache" są memoizowane.
+        """
+        from luxdb.core.function_executor import function_executor, resolve_policy
+        from luxdb.core.function_cache import function_cache, make_cache_key, resolve_cache_config
+        
+        # Konfiguracja cache funkcji faktycznie obsługiwanej (execute może dispatchować dalej)
+        cached_name = self._dispatched_function(function_name, kwargs)
+        cache_config = resolve_cache_config(self.genotype, cached_name)
+        if cache_config:
+            cache_key = make_cache_key(cached_name, args, kwargs)
+            hit, value = await function_cache.get(self.soul_hash, cached_name, cache_key, cache_config)
+            if hit:
+                return value
+        
+        policy, timeout = resolve_policy(self.genotype, function_name)
+        result = await function_executor.run(
+            func, args, kwargs,
+            policy=policy,
+            timeout=timeout,
+            soul_hash=self.soul_hash,
+            module_source=self.genotype.get("module_source"),
+            function_name=function_name
+        )
+        
+        if cache_config:
+            await function_cache.put(self.soul_hash, cached_name, cache_key, result, cache_config)
+        return result
+
+    @staticmethod
+    def _dispatched_function(function_name: str, kwargs: Dict[str, Any]) -> str:
+        """Nazwa funkcji obsługującej wywołanie - execute z request={"action": ...} (module_source) dispatchuje do akcji"""
+        request = kwargs.get("request")
+        if function_name == "execute" and isinstance(request, dict) and request.get("action"):
+            return request["action"]
+        return function_name
+
+    async def execute_function(self, function_name: str, *args, **kwargs) -> Dict[str, Any]:
+        """Wykonuje nazwaną funkcję Soul z podanymi argumentami"""
+        from luxdb.utils.serializer import GeneticResponseFormat
+        
+        func = self._function_registry.get(function_name)
+        if not func:
+            return GeneticResponseFormat.error_response(
+                error=f"Function '{function_name}' not found",
+                error_code="FUNCTION_NOT_FOUND"
+            )
+        
+        try:
+            result = await self._call_function(function_name, func, *args, **kwargs)
+            return GeneticResponseFormat.success_response(
+                data={
+                    "function_name": function_name,
+                    "result": result,
+                    "executed_at": datetime.now().isoformat()
+                }
+            )
+        except Exception as e:
+            return GeneticResponseFormat.error_response(
+                error=f"Function execution failed: {str(e)}",
+                error_code="FUNCTION_EXECUTION_ERROR"
+            )
+
+    async def stream_on_all_instances(self, intent, context: Dict[str, Any] = None,
+                                      concurrency: int = 16, timeout: float = None):
+        """
+        Wykonuje intencję na wszystkich instancjach równolegle i zwraca
+        wyniki w miarę ich pojawiania się jako (ulid, wynik).
+        
+        Args:
+            intent: Intencja do wykonania
+            context: Dodatkowy kontekst
+            concurrency: Maksymalna liczba równoczesnych wykonań
+            timeout: Limit czasu na jedną instancję (sekundy)
+        """
+        ulids = list(self.instances.keys())
+        pending = iter(ulids)
+        queue: asyncio.Queue = asyncio.Queue()
+        executed = []
+        
+        async def worker():
+            for ulid in pending:
+                try:
+                    result = await asyncio.wait_for(self.execute(intent, ulid, context, persist=False), timeout)
+                    executed.append(ulid)
+                except asyncio.TimeoutError:
+                    result = {
+                        "success": False,
+                        "error": f"Execution timed out after {timeout}s",
+                        "error_code": "INSTANCE_TIMEOUT"
+                    }
+                except Exception as e:
+                    result = {
+                        "success": False,
+                        "error": str(e),
+                        "error_code": "INTENT_EXECUTION_ERROR"
+                    }
+                # Każda instancja musi trafić do kolejki - konsument czeka na len(ulids) wyników
+                queue.put_nowait((ulid, result))
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(ulids))))]
+        try:
+            for _ in range(len(ulids)):
+                yield await queue.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Jeden zbiorczy zapis statystyk zamiast zapisu po każdej instancji
+            await self._persist_instances_to_database(
+                [self.instances[ulid] for ulid in executed if ulid in self.instances]
+            )
+
+    async def execute_on_all_instances(self, intent, context: Dict[str, Any] = None,
+                                       concurrency: int = 1, timeout: float = None) -> Dict[str, Any]:
+        """
+        Wykonuje intencję na wszystkich instancjach.
+        
+        concurrency=1 zachowuje wykonanie sekwencyjne; większa wartość
+        włącza tryb równoległy (patrz stream_on_all_instances).
+        """
         from luxdb.utils.serializer import GeneticResponseFormat
         
         results = {}
         errors = {}
         
-        for ulid in self.instances.keys():
-            try:
-                result = await self.execute(intent, ulid, context)
+        async for ulid, result in self.stream_on_all_instances(intent, context, concurrency, timeout):
+            if result.get("success"):
                 results[ulid] = result
-            except Exception as e:
-                errors[ulid] = str(e)
+            else:
+                errors[ulid] = result.get("error")
         
         return GeneticResponseFormat.success_response(
             data={
@@ -568,6 +681,10 @@ class Soul:
         elif "functions" in self.genotype:
             await self._load_functions_from_definitions()
 
+        # Indeks routingu intencji budowany raz przy ładowaniu Soul
+        if self._function_registry:
+            self.get_intent_router()
+
     async def _load_functions_from_module_source(self):
         """Ładuje funkcje z module_source"""
         try:
@@ -636,6 +753,12 @@ class Soul:
         # Na razie tylko log
         print(f"💾 Persisting instance {instance_data['ulid'][:8]} to database")
 
+    async def _persist_instances_to_database(self, instances: List[Dict[str, Any]]):
+        """Zapisuje wiele instancji jednym wywołaniem"""
+        # Placeholder - implementacja z repository
+        if instances:
+            print(f"💾 Persisting {len(instances)} instances of soul {self.soul_hash[:8]} to database")
+
     async def _delete_instance_from_database(self, ulid: str):
         """Usuwa instancję z bazy danych"""
         # Placeholder - implementacja z repository
@@ -706,3 +829,7 @@ class Soul:
     def __json__(self):
         """Protokół dla JSON serializacji"""
         return self.to_dict()
+
+
+from luxdb.core.memory_accounting import memory_accountant
+memory_accountant.register("models.soul_registry", lambda: Soul._registry, count=lambda registry: sum(len(instances) for instances in registry.values()))
@@ -0,0 +1,124 @@
+"""
+Agregaty dla BeingQuery.aggregate() - tłumaczone na funkcje agregujące SQL.
+
+    from luxdb.repository.being_aggregates import Count, Avg, Percentile
+
+    await Being.query(soul).aggregate(
+        beings=Count(), active=Count(filter={"active": True}),
+        avg_level=Avg("level"), p95_level=Percentile("level", 0.95)
+    )
+
+Pola atrybutów są rzutowane wg `py_type` z genotypu Soul (sum/avg/percentile
+domyślnie jako liczby), zagnieżdżone przez `__` jak w where().
+"""
+
+from typing import Any, Dict, List, Optional
+
+from luxdb.core.postgre_db import Postgre_db
+
+
+class Aggregate:
+    """Agregat po polu (kolumnie albo atrybucie z data), opcjonalnie z filtrem jak w where()"""
+
+    function: str = None
+    numeric: bool = False
+
+    def __init__(self, field: str = None, distinct: bool = False, filter: Dict[str, Any] = None):
+        self.field = field
+        self.distinct = distinct
+        self.filter = filter or {}
+
+    def _filtered(self, sql: str, query, params: list) -> str:
+        """Dokleja FILTER (WHERE ...) - np. podział aktywne/nieaktywne w jednym zapytaniu"""
+        if not self.filter:
+            return sql
+        conditions = [
+            query._predicate(path, lookup, value, params)
+            for path, lookup, value in query._clone().where(**self.filter)._filters[len(query._filters):]
+        ]
+        return f"{sql} FILTER (WHERE {' AND '.join(conditions)})"
+
+    def expression(self, query, params: list) -> str:
+        path = self.field.split("__")
+        query._check_attribute(path)
+        py_type = query._py_type(path) or ("float" if self.numeric else None)
+        expression, _ = query._typed_expression(path, params, py_type)
+        return expression
+
+    def sql(self, query, params: list) -> str:
+        distinct = "DISTINCT " if self.distinct else ""
+        return self._filtered(f"{self.function}({distinct}{self.expression(query, params)})", query, params)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.field!r})"
+
+
+class Count(Aggregate):
+    """COUNT(*) albo liczba Being, w których pole ma wartość"""
+
+    function = "COUNT"
+
+    def sql(self, query, params: list) -> str:
+        if self.field is None:
+            return self._filtered("COUNT(*)", query, params)
+        return super().sql(query, params)
+
+
+class Sum(Aggregate):
+    function = "SUM"
+    numeric = True
+
+
+class Avg(Aggregate):
+    function = "AVG"
+    numeric = True
+
+
+class Min(Aggregate):
+    function = "MIN"
+
+
+class Max(Aggregate):
+    function = "MAX"
+
+
+class Percentile(Aggregate):
+    """Percentyl ciągły (percentile_cont), fraction w zakresie 0..1"""
+
+    numeric = True
+
+    def __init__(self, field: str, fraction: float = 0.5, filter: Dict[str, Any] = None):
+        super().__init__(field, filter=filter)
+        if not 0 <= fraction <= 1:
+            raise ValueError("Percentile fraction must be between 0 and 1")
+        self.fraction = float(fraction)
+
+    def sql(self, query, params: list) -> str:
+        params.append(self.fraction)
+        fraction = f"${len(params)}::float8"
+        sql = f"percentile_cont({fraction}) WITHIN GROUP (ORDER BY {self.expression(query, params)})"
+        return self._filtered(sql, query, params)
+
+
+FUNCTION_USAGE_QUERY = """
+    SELECT stats.key AS function_name,
+           COUNT(*) AS beings,
+           SUM(COALESCE((stats.value->>'total_calls')::bigint, 0)) AS total_calls,
+           SUM(COALESCE((stats.value->>'successful_calls')::bigint, 0)) AS successful_calls,
+           MAX(stats.value->>'last_called') AS last_called
+    FROM beings,
+         jsonb_each(CASE WHEN jsonb_typeof(beings.data->'_function_stats') = 'object'
+                         THEN beings.data->'_function_stats' ELSE '{}'::jsonb END) AS stats
+    WHERE ($1::text IS NULL OR beings.soul_hash = $1)
+      AND beings.data ? '_function_stats'
+    GROUP BY stats.key
+    ORDER BY total_calls DESC
+"""
+
+
+async def function_usage(soul_hash: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Histogram wywołań funkcji z `_function_stats` wszystkich Being (jedno zapytanie)"""
+    pool = await Postgre_db.get_db_pool()
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(FUNCTION_USAGE_QUERY, soul_hash)
+    return [dict(row) for row in rows]
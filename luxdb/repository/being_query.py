@@ -0,0 +1,375 @@
+"""
+Zapytania o Being po wartościach atrybutów - DSL kompilowany do SQL na JSONB.
+
+    Being.query(soul).where(level__gt=5, tags__contains="fire").order_by("-created_at").limit(50)
+
+Predykaty są tłumaczone tak, żeby mógł je obsłużyć indeks GIN
+`idx_beings_data` (jsonb_ops):
+
+- równość, `contains`, `in` -> zawieranie `data @> '{...}'` / jsonpath `data @? '$.a ? (@ == 1 || @ == 2)'`
+- `exists`               -> `data ? 'klucz'`
+- porównania (`gt`, `lte`, ...) i `startswith` -> wyrażenie typowane wg `py_type`
+  z genotypu Soul (`(data->>'level')::numeric > $n`), poprzedzone
+  `data ? 'klucz'`, które zawęża skan przez GIN
+
+Zagnieżdżone pola: `stats__hp__gte=10` -> data->'stats'->'hp'.
+Wyniki są strumieniowane kursorem serwera (`async for being in query`),
+więc duży wynik nie jest ładowany do pamięci naraz. Agregaty
+(`group_by(...).aggregate(...)`, patrz being_aggregates) są liczone
+w bazie jednym zapytaniem.
+"""
+
+import json
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from luxdb.core.postgre_db import Postgre_db
+from luxdb.utils.serializer import JSONBSerializer
+
+LOOKUPS = ("exact", "ne", "gt", "gte", "lt", "lte", "in", "contains", "startswith", "exists")
+COMPARISONS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# py_type atrybutu -> rzutowanie wyrażenia tekstowego w SQL
+SQL_CASTS = {
+    "int": "numeric",
+    "float": "numeric",
+    "bool": "boolean",
+    "datetime": "timestamp",
+    "str": "text",
+}
+
+# Klucze data zapisywane przez sam system (poza genotypem Soul)
+SYSTEM_ATTRIBUTES = {"active": "bool", "alias": "str", "_persistent": "bool"}
+
+# Kolumny tabeli beings dostępne w order_by/where obok atrybutów z data
+COLUMNS = ("ulid", "soul_hash", "created_at", "updated_at", "ttl_expires")
+TIMESTAMP_COLUMNS = ("created_at", "updated_at", "ttl_expires")
+
+SELECT_COLUMNS = "ulid, soul_hash, data, created_at, updated_at, ttl_expires"
+
+
+def _nest(path: List[str], value: Any) -> Dict[str, Any]:
+    """['stats', 'hp'], 5 -> {'stats': {'hp': 5}}"""
+    for key in reversed(path):
+        value = {key: value}
+    return value
+
+
+def _check_alias(name: str) -> None:
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        raise ValueError(f"Invalid result name: {name}")
+
+
+def _plain(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _jsonpath_key(path: List[str]) -> str:
+    return "$" + "".join(f".{json.dumps(key)}" for key in path)
+
+
+def _jsonpath_literal(value: Any) -> str:
+    if isinstance(value, bool) or value is None or isinstance(value, (int, float, str)):
+        return json.dumps(value)
+    raise ValueError(f"Value {value!r} cannot be used in an 'in' lookup")
+
+
+class BeingQuery:
+    """Budowniczy zapytania o Being jednej Soul (lub wszystkich, gdy soul=None)"""
+
+    def __init__(self, soul=None, being_class=None):
+        if isinstance(soul, str):
+            self.soul_hash, self.attributes = soul, {}
+        else:
+            self.soul_hash = getattr(soul, "soul_hash", None)
+            self.attributes = (getattr(soul, "genotype", None) or {}).get("attributes", {})
+        self.being_class = being_class
+        self._filters: List[Tuple[List[str], str, Any]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+        self._group: List[str] = []
+
+    # --- budowanie ---
+
+    def _clone(self) -> "BeingQuery":
+        query = BeingQuery.__new__(BeingQuery)
+        query.__dict__.update(self.__dict__)
+        query._filters = list(self._filters)
+        query._order = list(self._order)
+        query._group = list(self._group)
+        return query
+
+    def where(self, **conditions) -> "BeingQuery":
+        """Dodaje predykaty (łączone przez AND): pole[__pole...][__lookup]=wartość"""
+        query = self._clone()
+        for expression, value in conditions.items():
+            parts = expression.split("__")
+            lookup = parts.pop() if len(parts) > 1 and parts[-1] in LOOKUPS else "exact"
+            if not parts or not all(parts):
+                raise ValueError(f"Invalid filter: {expression}")
+            query._filters.append((parts, lookup, value))
+        return query
+
+    def order_by(self, *fields: str) -> "BeingQuery":
+        """Sortowanie po kolumnach lub atrybutach; '-' na początku = malejąco"""
+        query = self._clone()
+        query._order = [(field.lstrip("-"), field.startswith("-")) for field in fields]
+        return query
+
+    def group_by(self, *fields: str) -> "BeingQuery":
+        """Grupowanie agregatów po kolumnach (soul_hash, ...) lub typowanych atrybutach"""
+        query = self._clone()
+        query._group = list(fields)
+        return query
+
+    def limit(self, count: int) -> "BeingQuery":
+        query = self._clone()
+        query._limit = count
+        return query
+
+    def offset(self, count: int) -> "BeingQuery":
+        query = self._clone()
+        query._offset = count
+        return query
+
+    # --- kompilacja ---
+
+    def _py_type(self, path: List[str]) -> Optional[str]:
+        if len(path) != 1:
+            return None
+        return self.attributes.get(path[0], {}).get("py_type") or SYSTEM_ATTRIBUTES.get(path[0])
+
+    @staticmethod
+    def _value_type(value: Any) -> Optional[str]:
+        """py_type wywnioskowany z wartości - dla pól spoza genotypu (zagnieżdżonych)"""
+        if isinstance(value, bool):
+            return "bool"
+        if isinstance(value, (int, float)):
+            return "float"
+        if isinstance(value, datetime):
+            return "datetime"
+        return None
+
+    def _check_attribute(self, path: List[str]) -> None:
+        if (self.attributes and path[0] not in self.attributes and path[0] not in COLUMNS
+                and path[0] not in SYSTEM_ATTRIBUTES and not path[0].startswith("_")):
+            raise ValueError(f"Unknown attribute '{path[0]}' for soul {self.soul_hash}")
+
+    def _typed_expression(self, path: List[str], params: list, py_type: str = None) -> Tuple[str, str]:
+        """Wyrażenie typowane atrybutu i rzutowanie parametru"""
+        if len(path) == 1 and path[0] in COLUMNS:
+            return path[0], ""
+        params.append(path)
+        text = f"(data #>> ${len(params)}::text[])"
+        cast = SQL_CASTS.get(py_type or self._py_type(path) or "", None)
+        if cast is None or cast == "text":
+            return text, "::text"
+        return f"{text}::{cast}", f"::{cast}"
+
+    @staticmethod
+    def _coerce(value: Any, py_type: Optional[str]) -> Any:
+        """Wartość parametru zgodna z rzutowaniem wyrażenia"""
+        if py_type in ("int", "float"):
+            return float(value) if isinstance(value, float) else int(value)
+        if py_type == "bool":
+            return bool(value)
+        if py_type == "datetime":
+            return datetime.fromisoformat(value) if isinstance(value, str) else value
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return str(value)
+
+    def _predicate(self, path: List[str], lookup: str, value: Any, params: list) -> str:
+        self._check_attribute(path)
+        is_column = len(path) == 1 and path[0] in COLUMNS
+        py_type = self._py_type(path)
+
+        if is_column and lookup in ("exact", "ne", "in"):
+            params.append(list(value) if lookup == "in" else value)
+            operator = {"exact": "= ${}", "ne": "IS DISTINCT FROM ${}", "in": "= ANY(${})"}[lookup]
+            return f"{path[0]} {operator.format(len(params))}"
+
+        if lookup == "exact":
+            if value is None:
+                return self._predicate(path, "exists", False, params)
+            params.append(JSONBSerializer.serialize(_nest(path, value)))
+            return f"data @> ${len(params)}::jsonb"
+
+        if lookup == "ne":
+            params.append(JSONBSerializer.serialize(_nest(path, value)))
+            return f"NOT (data @> ${len(params)}::jsonb)"
+
+        if lookup == "contains":
+            # Listy i słowniki: zawieranie (GIN); tekst: podciąg
+            if py_type in (None, "list", "dict") or (py_type or "").startswith("List"):
+                if not isinstance(value, dict):
+                    value = list(value) if isinstance(value, (list, tuple, set)) else [value]
+                params.append(JSONBSerializer.serialize(_nest(path, value)))
+                return f"data @> ${len(params)}::jsonb"
+            expression, _ = self._typed_expression(path, params, "str")
+            params.append(str(value))
+            return f"strpos({expression}, ${len(params)}) > 0"
+
+        if lookup == "in":
+            values = list(value)
+            if not values:
+                return "FALSE"
+            condition = " || ".join(f"@ == {_jsonpath_literal(item)}" for item in values)
+            params.append(f"{_jsonpath_key(path)} ? ({condition})")
+            return f"data @? ${len(params)}::jsonpath"
+
+        if lookup == "exists":
+            params.append(path[0] if len(path) == 1 else path)
+            check = f"data ? ${len(params)}" if len(path) == 1 else f"(data #> ${len(params)}::text[]) IS NOT NULL"
+            return check if value else f"NOT ({check})"
+
+        guard = ""
+        if not is_column:
+            params.append(path[0])
+            guard = f"data ? ${len(params)} AND "
+
+        if lookup == "startswith":
+            expression, _ = self._typed_expression(path, params, "str")
+            params.append(str(value))
+            return f"{guard}starts_with({expression}, ${len(params)})"
+
+        py_type = py_type or self._value_type(value)
+        expression, cast = self._typed_expression(path, params, py_type)
+        if is_column:
+            params.append(self._coerce(value, "datetime") if path[0] in TIMESTAMP_COLUMNS else value)
+        else:
+            params.append(self._coerce(value, py_type))
+        return f"{guard}{expression} {COMPARISONS[lookup]} ${len(params)}{cast}"
+
+    def _order_expression(self, field: str, params: list) -> str:
+        path = field.split("__")
+        self._check_attribute(path)
+        expression, _ = self._typed_expression(path, params)
+        return expression
+
+    def _where(self, params: list) -> str:
+        conditions = []
+        if self.soul_hash:
+            params.append(self.soul_hash)
+            conditions.append(f"soul_hash = ${len(params)}")
+        conditions.extend(self._predicate(path, lookup, value, params) for path, lookup, value in self._filters)
+        return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+    def _paging(self, params: list) -> str:
+        sql = ""
+        if self._limit is not None:
+            params.append(int(self._limit))
+            sql += f" LIMIT ${len(params)}"
+        if self._offset:
+            params.append(int(self._offset))
+            sql += f" OFFSET ${len(params)}"
+        return sql
+
+    def compile(self, select: str = SELECT_COLUMNS) -> Tuple[str, list]:
+        """SQL i parametry - do podglądu (EXPLAIN) i wykonania"""
+        params: list = []
+        sql = f"SELECT {select} FROM beings" + self._where(params)
+        if self._order:
+            ordering = [
+                f"{self._order_expression(field, params)} {'DESC' if descending else 'ASC'}"
+                + (" NULLS LAST" if descending else "")
+                for field, descending in self._order
+            ]
+            if not any(field == "ulid" for field, _ in self._order):
+                ordering.append("ulid")
+            sql += " ORDER BY " + ", ".join(ordering)
+        return sql + self._paging(params), params
+
+    def compile_aggregate(self, aggregates: Dict[str, Any]) -> Tuple[str, list]:
+        """Jedno zapytanie agregujące: kolumny group_by + agregaty (grupowanie pozycyjne)"""
+        if not aggregates:
+            raise ValueError("At least one aggregate is required")
+        params: list = []
+        selected = []
+        for field in self._group:
+            _check_alias(field)
+            selected.append(f'{self._order_expression(field, params)} AS "{field}"')
+        for name, aggregate in aggregates.items():
+            _check_alias(name)
+            selected.append(f'{aggregate.sql(self, params)} AS "{name}"')
+
+        sql = f"SELECT {', '.join(selected)} FROM beings" + self._where(params)
+        if self._group:
+            sql += " GROUP BY " + ", ".join(str(position) for position in range(1, len(self._group) + 1))
+            ordering = []
+            for field, descending in self._order:
+                if field not in aggregates and field not in self._group:
+                    raise ValueError(f"Cannot order grouped results by '{field}'")
+                ordering.append(f'"{field}" {"DESC NULLS LAST" if descending else "ASC"}')
+            ordering.extend(f'"{field}"' for field in self._group if field not in dict(self._order))
+            sql += " ORDER BY " + ", ".join(ordering)
+            sql += self._paging(params)
+        return sql, params
+
+    # --- wykonanie ---
+
+    def _to_being(self, row):
+        being_class = self.being_class
+        if being_class is None:
+            from luxdb.models.being import Being as being_class
+        record = dict(row)
+        record["data"] = JSONBSerializer.deserialize(record.get("data")) or {}
+        return being_class.from_dict(record)
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        """Strumieniuje Being kursorem serwera (prefetch po 500 wierszy)"""
+        sql, params = self.compile()
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(sql, *params, prefetch=500):
+                    yield self._to_being(row)
+
+    async def all(self) -> List[Any]:
+        return [being async for being in self]
+
+    async def first(self) -> Optional[Any]:
+        async for being in self.limit(1):
+            return being
+        return None
+
+    async def count(self) -> int:
+        counted = self._clone()
+        counted._order, counted._limit, counted._offset = [], None, None
+        sql, params = counted.compile(select="COUNT(*)")
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetchval(sql, *params)
+
+    async def aggregate(self, **aggregates) -> Any:
+        """
+        Agregaty liczone w bazie jednym zapytaniem.
+
+            await Being.query(soul).aggregate(total=Count(), avg_level=Avg("level"))
+            await Being.query().group_by("soul_hash", "active").aggregate(beings=Count())
+
+        Bez group_by zwraca słownik, z group_by - listę słowników (po jednym na grupę).
+        """
+        sql, params = self.compile_aggregate(aggregates)
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(sql, *params)
+        results = [{key: _plain(value) for key, value in row.items()} for row in rows]
+        if self._group:
+            return results
+        return results[0] if results else {name: None for name in aggregates}
+
+    async def explain(self) -> List[str]:
+        """Plan zapytania - pozwala sprawdzić, czy użyto idx_beings_data"""
+        sql, params = self.compile()
+        pool = await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(f"EXPLAIN {sql}", *params)
+        return [row[0] for row in rows]
+
+    def __repr__(self) -> str:
+        sql, params = self.compile()
+        return f"<BeingQuery {sql} {params}>"
@@ -22,6 +22,15 @@ def get_being_class():
     from luxdb.models.being import Being
     return Being
 
+# Upsert TTL: brak terminu w zapisie (Being załadowany bez ttl_expires, partia
+# z API) zachowuje termin z bazy; usunięcie TTL tylko jawnie (Being.clear_ttl)
+TTL_UPSERT = "CASE WHEN {clear} THEN NULL ELSE COALESCE(EXCLUDED.ttl_expires, beings.ttl_expires) END"
+
+def _apply_stored_ttl(being, ttl_expires) -> None:
+    """Przepisuje termin zapisany w bazie na Being i kasuje flagę jawnego usunięcia TTL"""
+    being.ttl_expires = ttl_expires
+    being._ttl_cleared = False
+
 class SoulRepository:
     """Repository for Soul operations z automatycznym rejestrem"""
     
@@ -219,6 +228,73 @@ class SoulRepository:
             print(f"❌ {error_msg}")
             return {"success": False, "error": error_msg, "error_type": "database_error"}
 
+    @staticmethod
+    async def set_many(souls: List['Soul'], pool=None) -> dict:
+        """
+        Zapisuje wiele Soul jednym zapytaniem (unnest tablic).
+
+        pool - opcjonalna pula (np. przestrzeni nazw serwera), domyślnie Postgre_db.
+        """
+        # Ten sam soul_hash dwa razy w jednym INSERT ... ON CONFLICT jest błędem - wygrywa ostatni
+        unique = {soul.soul_hash: soul for soul in souls}
+        if not unique:
+            return {"success": True, "saved": 0}
+
+        try:
+            pool = pool or await Postgre_db.get_db_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    INSERT INTO souls (soul_hash, global_ulid, alias, genotype)
+                    SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::jsonb[])
+                    ON CONFLICT (soul_hash) DO UPDATE SET
+                        alias = EXCLUDED.alias,
+                        genotype = EXCLUDED.genotype,
+                        updated_at = CURRENT_TIMESTAMP
+                    RETURNING soul_hash, created_at, updated_at
+                """,
+                    list(unique),
+                    [soul.global_ulid for soul in unique.values()],
+                    [soul.alias for soul in unique.values()],
+                    [json.dumps(soul.genotype) for soul in unique.values()]
+                )
+
+            for row in rows:
+                soul = unique[row['soul_hash'].rstrip()]
+                soul.created_at = row['created_at']
+                soul.updated_at = row['updated_at']
+                SoulRepository._add_to_registry(soul.soul_hash, soul)
+
+            return {"success": True, "saved": len(rows)}
+        except Exception as e:
+            error_msg = f"Database error while saving souls: {str(e)}"
+            print(f"❌ {error_msg}")
+            return {"success": False, "error": error_msg, "error_type": "database_error"}
+
+    @staticmethod
+    async def get_many_by_hash(soul_hashes: List[str], pool=None) -> Dict[str, 'Soul']:
+        """Ładuje wiele Soul jednym zapytaniem (soul_hash -> Soul)"""
+        if not soul_hashes:
+            return {}
+
+        pool = pool or await Postgre_db.get_db_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT * FROM souls WHERE soul_hash = ANY($1::text[])", list(set(soul_hashes)))
+
+        Soul = get_soul_class()
+        souls = {}
+        for row in rows:
+            genotype = row['genotype']
+            soul = Soul(
+                genotype=json.loads(genotype) if isinstance(genotype, str) else genotype,
+                alias=row['alias'],
+                soul_hash=row['soul_hash'].rstrip(),
+                global_ulid=row['global_ulid'].rstrip()
+            )
+            soul.created_at = row['created_at']
+            soul.updated_at = row.get('updated_at')
+            souls[soul.soul_hash] = soul
+        return souls
+
 class BeingRepository:
     """Repository for Being operations z automatycznym rejestrem"""
     
@@ -278,7 +354,7 @@ class BeingRepository:
         try:
             pool = await Postgre_db.get_db_pool()
             async with pool.acquire() as conn:
-                query = "SELECT ulid, soul_hash, data, created_at, updated_at FROM beings ORDER BY created_at DESC"
+                query = "SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires FROM beings ORDER BY created_at DESC"
                 rows = await conn.fetch(query)
 
                 beings = []
@@ -325,7 +401,7 @@ class BeingRepository:
 
             async with pool.acquire() as conn:
                 query = """
-                    SELECT ulid, soul_hash, data, created_at, updated_at
+                    SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires
                     FROM beings
                     WHERE ulid = $1
                 """
@@ -356,7 +432,8 @@ class BeingRepository:
                     'soul_hash': row['soul_hash'],
                     'data': data,  # Teraz z deserializacją typów
                     'created_at': row['created_at'],
-                    'updated_at': row['updated_at']
+                    'updated_at': row['updated_at'],
+                    'ttl_expires': row['ttl_expires']
                 }
 
                 Being = get_being_class()
@@ -383,7 +460,7 @@ class BeingRepository:
 
             async with pool.acquire() as conn:
                 query = """
-                    SELECT ulid, soul_hash, data, created_at, updated_at
+                    SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires
                     FROM beings
                     WHERE soul_hash = $1
                     ORDER BY created_at DESC
@@ -414,7 +491,8 @@ class BeingRepository:
                         'soul_hash': row['soul_hash'],
                         'data': data,  # Teraz z deserializacją typów
                         'created_at': row['created_at'],
-                        'updated_at': row['updated_at']
+                        'updated_at': row['updated_at'],
+                        'ttl_expires': row['ttl_expires']
                     }
 
                     Being = get_being_class()
@@ -440,7 +518,7 @@ class BeingRepository:
 
             async with pool.acquire() as conn:
                 query = """
-                    SELECT ulid, soul_hash, data, created_at, updated_at FROM beings
+                    SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires FROM beings
                     WHERE data::jsonb->>'alias' = $1
                     ORDER BY created_at DESC
                 """
@@ -455,6 +533,7 @@ class BeingRepository:
                     being.data = row['data'] or {}
                     being.created_at = row['created_at']
                     being.updated_at = row['updated_at']
+                    being.ttl_expires = row['ttl_expires']
 
                     # Alias z danych JSONB jeśli istnieje
                     being.alias = being.data.get('alias')
@@ -480,14 +559,15 @@ class BeingRepository:
 
             async with pool.acquire() as conn:
 
-                query = """
-                    INSERT INTO beings (ulid, soul_hash, data, created_at, updated_at)
-                    VALUES ($1, $2, $3, $4, $5)
+                query = f"""
+                    INSERT INTO beings (ulid, soul_hash, data, created_at, updated_at, ttl_expires)
+                    VALUES ($1, $2, $3, $4, $5, $6)
                     ON CONFLICT (ulid) DO UPDATE SET
                         soul_hash = EXCLUDED.soul_hash,
                         data = EXCLUDED.data,
-                        updated_at = EXCLUDED.updated_at
-                    RETURNING created_at
+                        updated_at = EXCLUDED.updated_at,
+                        ttl_expires = {TTL_UPSERT.format(clear="$7::boolean")}
+                    RETURNING created_at, updated_at, ttl_expires
                 """
 
                 # Ensure ULID is generated if missing
@@ -504,19 +584,72 @@ class BeingRepository:
                     being.soul_hash,
                     serialized_data,
                     being.created_at,
-                    being.updated_at
+                    being.updated_at,
+                    getattr(being, 'ttl_expires', None),
+                    getattr(being, '_ttl_cleared', False)
                 )
 
                 if result:
                     # Baza danych automatycznie ustawia created_at i updated_at
                     being.created_at = result['created_at']
                     being.updated_at = result['updated_at']
+                    _apply_stored_ttl(being, result['ttl_expires'])
+
+                # Reaper TTL budzi się dokładnie na najbliższy termin
+                from ..core.ttl_reaper import ttl_reaper
+                ttl_reaper.track(being.ulid, getattr(being, 'ttl_expires', None))
 
                 return {"success": True}
         except Exception as e:
             print(f"❌ Error saving being: {e}")
             return {"success": False, "error": str(e)}
 
+    @staticmethod
+    async def save_many(beings: List['Being'], pool=None) -> dict:
+        """
+        Zapisuje wiele Being jednym zapytaniem (unnest tablic) w jednej transakcji.
+
+        Upsert po ulid - ponowienie tej samej partii nie tworzy duplikatów.
+        """
+        from ..utils.serializer import JSONBSerializer
+
+        unique = {being.ulid: being for being in beings}
+        if not unique:
+            return {"success": True, "saved": 0}
+
+        try:
+            pool = pool or await Postgre_db.get_db_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(f"""
+                    INSERT INTO beings (ulid, soul_hash, data, ttl_expires)
+                    SELECT * FROM unnest($1::text[], $2::text[], $3::jsonb[], $4::timestamp[])
+                    ON CONFLICT (ulid) DO UPDATE SET
+                        soul_hash = EXCLUDED.soul_hash,
+                        data = EXCLUDED.data,
+                        updated_at = CURRENT_TIMESTAMP,
+                        ttl_expires = {TTL_UPSERT.format(clear="EXCLUDED.ulid = ANY($5::text[])")}
+                    RETURNING ulid, created_at, updated_at, ttl_expires
+                """,
+                    list(unique),
+                    [being.soul_hash for being in unique.values()],
+                    [JSONBSerializer.serialize(being.data) for being in unique.values()],
+                    [getattr(being, 'ttl_expires', None) for being in unique.values()],
+                    [ulid for ulid, being in unique.items() if getattr(being, '_ttl_cleared', False)]
+                )
+
+            from ..core.ttl_reaper import ttl_reaper
+            for row in rows:
+                being = unique[row['ulid'].rstrip()]
+                being.created_at = row['created_at']
+                being.updated_at = row['updated_at']
+                _apply_stored_ttl(being, row['ttl_expires'])
+                ttl_reaper.track(being.ulid, being.ttl_expires)
+
+            return {"success": True, "saved": len(rows)}
+        except Exception as e:
+            print(f"❌ Error saving beings: {e}")
+            return {"success": False, "error": str(e)}
+
     @staticmethod
     async def count_beings() -> int:
         """Zwraca liczbę wszystkich beings w bazie danych"""
@@ -540,7 +673,7 @@ class BeingRepository:
             pool = await Postgre_db.get_db_pool()
             async with pool.acquire() as conn:
                 rows = await conn.fetch(
-                    "SELECT ulid, soul_hash, data, created_at, updated_at FROM beings ORDER BY created_at DESC LIMIT $1",
+                    "SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires FROM beings ORDER BY created_at DESC LIMIT $1",
                     limit
                 )
 
@@ -554,6 +687,7 @@ class BeingRepository:
                     )
                     being.created_at = row['created_at']
                     being.updated_at = row['updated_at']
+                    being.ttl_expires = row['ttl_expires']
                     beings.append(being)
 
                 return {
@@ -582,7 +716,7 @@ class BeingRepository:
             pool = await Postgre_db.get_db_pool()
             async with pool.acquire() as conn:
                 rows = await conn.fetch("""
-                    SELECT ulid, soul_hash, data, created_at, updated_at FROM beings
+                    SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires FROM beings
                     WHERE data::jsonb->>'alias' ILIKE $1
                     OR data::text ILIKE $1
                     ORDER BY created_at DESC
@@ -599,6 +733,7 @@ class BeingRepository:
                     )
                     being.created_at = row['created_at']
                     being.updated_at = row['updated_at']
+                    being.ttl_expires = row['ttl_expires']
                     beings.append(being)
 
                 return {
@@ -621,7 +756,7 @@ class BeingRepository:
             pool = await Postgre_db.get_db_pool()
             async with pool.acquire() as conn:
                 rows = await conn.fetch(
-                    "SELECT ulid, soul_hash, data, created_at, updated_at FROM beings WHERE soul_hash = $1 ORDER BY created_at DESC",
+                    "SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires FROM beings WHERE soul_hash = $1 ORDER BY created_at DESC",
                     soul_hash
                 )
 
@@ -646,7 +781,7 @@ class BeingRepository:
 
             async with pool.acquire() as conn:
                 query = """
-                    SELECT ulid, soul_hash, data, created_at, updated_at FROM beings
+                    SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires FROM beings
                     WHERE data::jsonb->>'alias' = $1
                     ORDER BY created_at DESC
                 """
@@ -661,6 +796,7 @@ class BeingRepository:
                     being.data = row['data'] or {}
                     being.created_at = row['created_at']
                     being.updated_at = row['updated_at']
+                    being.ttl_expires = row['ttl_expires']
 
                     # Alias z danych JSONB jeśli istnieje
                     being.alias = being.data.get('alias')
@@ -719,14 +855,15 @@ class BeingRepository:
                     # Serializuj dane przez JSONBSerializer
                     serialized_data = JSONBSerializer.serialize(being.data)
 
-                    query = """
-                        INSERT INTO beings (ulid, soul_hash, data, created_at, updated_at)
-                        VALUES ($1, $2, $3, $4, $5)
+                    query = f"""
+                        INSERT INTO beings (ulid, soul_hash, data, created_at, updated_at, ttl_expires)
+                        VALUES ($1, $2, $3, $4, $5, $6)
                         ON CONFLICT (ulid) DO UPDATE SET
                             soul_hash = EXCLUDED.soul_hash,
                             data = EXCLUDED.data,
-                            updated_at = EXCLUDED.updated_at
-                        RETURNING created_at, updated_at
+                            updated_at = EXCLUDED.updated_at,
+                            ttl_expires = {TTL_UPSERT.format(clear="$7::boolean")}
+                        RETURNING created_at, updated_at, ttl_expires
                     """
 
                     result = await conn.fetchrow(query,
@@ -734,12 +871,18 @@ class BeingRepository:
                         being.soul_hash,
                         serialized_data,
                         being.created_at,
-                        being.updated_at
+                        being.updated_at,
+                        getattr(being, 'ttl_expires', None),
+                        getattr(being, '_ttl_cleared', False)
                     )
 
                     if result:
                         being.created_at = result['created_at']
                         being.updated_at = result['updated_at']
+                        _apply_stored_ttl(being, result['ttl_expires'])
+
+                    from ..core.ttl_reaper import ttl_reaper
+                    ttl_reaper.track(being.ulid, getattr(being, 'ttl_expires', None))
 
                     return {"success": True, "being_saved": True}
 
@@ -811,4 +954,9 @@ class RelationshipRepository:
                 'error': str(e),
                 'relationships': [],
                 'count': 0
-            }
\ No newline at end of file
+            }
+
+
+from luxdb.core.memory_accounting import memory_accountant
+memory_accountant.register("repository.soul_registry", lambda: SoulRepository._soul_registry)
+memory_accountant.register("repository.being_registry", lambda: BeingRepository._being_registry)
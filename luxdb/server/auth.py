@@ -3,11 +3,13 @@
 Authentication Manager - Basic auth for LuxDB Server
 """
 
-import hashlib
 import secrets
 from typing import Dict, Optional, Any
 from datetime import datetime, timedelta
 
+from ..core.session_store import ExpiryIndex
+from ..utils.password_hasher import hash_password_sync, verify_password_sync
+
 
 class AuthManager:
     """
@@ -19,30 +21,23 @@ class AuthManager:
         self.users: Dict[str, Dict[str, Any]] = {}
         self.tokens: Dict[str, Dict[str, Any]] = {}
         self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.token_expiry = ExpiryIndex()  # token -> expires_at (timestamp)
     
     def hash_password(self, password: str) -> str:
         """Hash password with salt"""
-        salt = secrets.token_hex(32)
-        password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return f"{salt}:{password_hash.hex()}"
+        return hash_password_sync(password)
     
     def verify_password(self, password: str, password_hash: str) -> bool:
         """Verify password against hash"""
-        try:
-            salt, hash_part = password_hash.split(':')
-            password_check = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-            return password_check.hex() == hash_part
-        except:
-            return False
+        return verify_password_sync(password, password_hash)
     
-    def create_user(self, username: str, password: str, permissions: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Create new user"""
+    def _store_user(self, username: str, password_hash: str, permissions: Dict[str, Any] = None) -> Dict[str, Any]:
         if username in self.users:
             raise ValueError(f"User {username} already exists")
         
         user_data = {
             "username": username,
-            "password_hash": self.hash_password(password),
+            "password_hash": password_hash,
             "permissions": permissions or {"namespaces": ["*"]},
             "created_at": datetime.utcnow().isoformat(),
             "active": True
@@ -51,6 +46,23 @@ class AuthManager:
         self.users[username] = user_data
         return {"username": username, "created": True}
     
+    def create_user(self, username: str, password: str, permissions: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Create new user"""
+        if username in self.users:
+            raise ValueError(f"User {username} already exists")
+        return self._store_user(username, self.hash_password(password), permissions)
+    
+    def _issue_token(self, username: str) -> str:
+        token = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+        self.tokens[token] = {
+            "username": username,
+            "created_at": now,
+            "expires_at": now + timedelta(hours=24)
+        }
+        self.token_expiry.schedule(token, (now + timedelta(hours=24)).timestamp())
+        return token
+    
     def authenticate_user(self, username: str, password: str) -> Optional[str]:
         """Authenticate user and return token"""
         if username not in self.users:
@@ -60,15 +72,7 @@ class AuthManager:
         if not user["active"] or not self.verify_password(password, user["password_hash"]):
             return None
         
-        # Generate token
-        token = secrets.token_urlsafe(32)
-        self.tokens[token] = {
-            "username": username,
-            "created_at": datetime.utcnow(),
-            "expires_at": datetime.utcnow() + timedelta(hours=24)
-        }
-        
-        return token
+        return self._issue_token(username)
     
     def validate_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Validate token and return user info"""
@@ -77,12 +81,12 @@ class AuthManager:
         
         token_data = self.tokens[token]
         if datetime.utcnow() > token_data["expires_at"]:
-            del self.tokens[token]
+            self.revoke_token(token)
             return None
         
         username = token_data["username"]
         if username not in self.users:
-            del self.tokens[token]
+            self.revoke_token(token)
             return None
         
         return self.users[username]
@@ -105,20 +109,17 @@ class AuthManager:
     
     def revoke_token(self, token: str) -> bool:
         """Revoke token"""
+        self.token_expiry.remove(token)
         if token in self.tokens:
             del self.tokens[token]
             return True
         return False
     
     def cleanup_expired_tokens(self):
-        """Remove expired tokens"""
-        now = datetime.utcnow()
-        expired_tokens = [
-            token for token, data in self.tokens.items()
-            if now > data["expires_at"]
-        ]
+        """Remove expired tokens (pops due entries from the expiry index)"""
+        expired_tokens = self.token_expiry.pop_due(datetime.utcnow().timestamp())
         
         for token in expired_tokens:
-            del self.tokens[token]
+            self.tokens.pop(token, None)
         
         return len(expired_tokens)
@@ -4,10 +4,21 @@ LuxDB Client - Connects to LuxDB Server instances
 """
 
 import aiohttp
+import asyncio
 import json
+import os
+import ulid
+import uuid
 from typing import Dict, List, Optional, Any
 from ..models.soul import Soul
 from ..models.being import Being
+from .schema_exporter import (
+    ProgressCallback, STREAM_CHUNK_SIZE, read_file_chunks, read_manifest, table_filename,
+    write_manifest, write_stream_to_file
+)
+
+# Table streams can run far longer than the default 30s request timeout
+STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=300)
 
 
 class LuxDBClient:
@@ -19,11 +30,15 @@ class LuxDBClient:
         self, 
         server_url: str = "http://localhost:5000",
         namespace_id: str = "default",
-        auth_token: Optional[str] = None
+        auth_token: Optional[str] = None,
+        max_connections: int = 32,
+        keepalive_timeout: float = 60.0
     ):
         self.server_url = server_url.rstrip('/')
         self.namespace_id = namespace_id
         self.auth_token = auth_token
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
         self.session: Optional[aiohttp.ClientSession] = None
         
     async def __aenter__(self):
@@ -39,8 +54,16 @@ class LuxDBClient:
         if self.auth_token:
             headers['Authorization'] = f"Bearer {self.auth_token}"
         
+        # Keep-alive pool shared by all requests (one server, so per-host limit = total)
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300
+        )
         self.session = aiohttp.ClientSession(
             headers=headers,
+            connector=connector,
             timeout=aiohttp.ClientTimeout(total=30)
         )
     
@@ -76,6 +99,11 @@ class LuxDBClient:
     async def health_check(self) -> Dict[str, Any]:
         """Check server health"""
         return await self._request('GET', self._get_url('/health'))
+
+    async def get_memory_stats(self, refresh: bool = True) -> Dict[str, Any]:
+        """Memory accounting snapshot of the server's registered containers"""
+        params = {'refresh': 'true' if refresh else 'false'}
+        return await self._request('GET', self._get_url('/stats/memory'), params=params)
     
     # Namespace operations
     async def create_namespace(self, namespace_id: str = None, config: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -106,10 +134,19 @@ class LuxDBClient:
         data = {"genotype": genotype, "alias": alias}
         return await self._request('POST', url, json=data)
     
-    async def list_souls(self) -> List[Dict[str, Any]]:
+    async def create_souls(self, souls: List[Dict[str, Any]], chunk_size: int = 200,
+                           concurrency: int = 4, retries: int = 3) -> Dict[str, Any]:
+        """
+        Create many souls via /souls:batch.
+
+        Items are {"genotype": ..., "alias": ...}. Requests are chunked, sent
+        `concurrency` at a time and each chunk is retried on its own.
+        """
+        return await self._create_batch('/souls:batch', souls, "souls", chunk_size, concurrency, retries)
+    
+    async def list_souls(self, fields: List[str] = None, page_size: int = 500) -> List[Dict[str, Any]]:
         """List all souls in current namespace"""
-        url = self._get_namespace_url('/souls')
-        return await self._request('GET', url)
+        return [soul async for soul in self.iter_pages('/souls', fields, page_size)]
     
     # Being operations
     async def create_being(self, soul_hash: str, data: Dict[str, Any], alias: str = None) -> Dict[str, Any]:
@@ -118,10 +155,73 @@ class LuxDBClient:
         payload = {"soul_hash": soul_hash, "data": data, "alias": alias}
         return await self._request('POST', url, json=payload)
     
-    async def list_beings(self) -> List[Dict[str, Any]]:
+    async def create_beings(self, beings: List[Dict[str, Any]], chunk_size: int = 1000,
+                            concurrency: int = 4, retries: int = 3) -> Dict[str, Any]:
+        """
+        Create many beings via /beings:batch.
+
+        Items are {"soul_hash": ..., "data": {...}}. Each item gets a ULID up
+        front, so retrying a chunk whose response was lost does not create
+        duplicates.
+        """
+        items = [{**being, "ulid": being.get("ulid") or str(ulid.ulid())} for being in beings]
+        return await self._create_batch('/beings:batch', items, "beings", chunk_size, concurrency, retries)
+    
+    async def _create_batch(self, endpoint: str, items: List[Dict[str, Any]], result_key: str,
+                            chunk_size: int, concurrency: int, retries: int) -> Dict[str, Any]:
+        url = self._get_namespace_url(endpoint)
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def send(chunk: List[Dict[str, Any]]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._request_with_retry('POST', url, retries, json={"items": chunk})
+        
+        responses = await asyncio.gather(*(send(chunk) for chunk in chunks))
+        return {
+            "success": True,
+            "created": sum(response.get("created", 0) for response in responses),
+            "chunks": len(chunks),
+            result_key: [entry for response in responses for entry in response.get(result_key, [])]
+        }
+    
+    async def _request_with_retry(self, method: str, url: str, retries: int, **kwargs) -> Dict[str, Any]:
+        """Request retried with exponential backoff on connection errors, 429 and 5xx"""
+        for attempt in range(retries + 1):
+            try:
+                return await self._request(method, url, **kwargs)
+            except aiohttp.ClientResponseError as e:
+                if (e.status != 429 and e.status < 500) or attempt == retries:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(min(0.2 * 2 ** attempt, 5.0))
+    
+    async def list_beings(self, fields: List[str] = None, page_size: int = 500) -> List[Dict[str, Any]]:
         """List all beings in current namespace"""
-        url = self._get_namespace_url('/beings')
-        return await self._request('GET', url)
+        return [being async for being in self.iter_pages('/beings', fields, page_size)]
+    
+    async def list_page(self, endpoint: str, cursor: str = None, limit: int = 100,
+                        fields: List[str] = None) -> Dict[str, Any]:
+        """Fetch one page of a list endpoint ({"items", "next_cursor", ...})"""
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        if fields:
+            params["fields"] = ",".join(fields)
+        return await self._request('GET', self._get_namespace_url(endpoint), params=params)
+    
+    async def iter_pages(self, endpoint: str, fields: List[str] = None, page_size: int = 500):
+        """Iterate items of a list endpoint, following cursors"""
+        cursor = None
+        while True:
+            page = await self.list_page(endpoint, cursor, page_size, fields)
+            for item in page["items"]:
+                yield item
+            cursor = page.get("next_cursor")
+            if not cursor:
+                break
     
     # Schema operations
     async def export_schema(self) -> Dict[str, Any]:
@@ -134,17 +234,82 @@ class LuxDBClient:
         url = self._get_namespace_url('/schema/import')
         return await self._request('POST', url, json=schema_data)
     
-    async def save_schema_to_file(self, filename: str):
-        """Export schema and save to file"""
-        schema = await self.export_schema()
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(schema, f, indent=2, ensure_ascii=False)
-    
-    async def load_schema_from_file(self, filename: str) -> Dict[str, Any]:
-        """Load schema from file and import to namespace"""
-        with open(filename, 'r', encoding='utf-8') as f:
-            schema_data = json.load(f)
-        return await self.import_schema(schema_data)
+    async def save_schema_to_file(self, filename: str, format: str = "ndjson", jobs: int = 4,
+                                  progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Export schema to disk.
+
+        A *.json filename keeps the single-document export. Any other path is
+        a dump directory: every table is streamed (gzip NDJSON or binary COPY)
+        into its own file, `jobs` tables at a time, plus a manifest.json.
+        """
+        if filename.endswith('.json'):
+            schema = await self.export_schema()
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(schema, f, indent=2, ensure_ascii=False)
+            return schema
+
+        os.makedirs(filename, exist_ok=True)
+        manifest = await self._request('GET', self._get_namespace_url('/schema/manifest'))
+        manifest["export_info"]["format"] = format
+        semaphore = asyncio.Semaphore(max(1, jobs))
+
+        async def download(table: Dict[str, Any]) -> None:
+            async with semaphore:
+                table["file"] = table_filename(table["name"], format)
+                url = self._get_namespace_url(f'/schema/tables/{table["name"]}')
+                async with self.session.get(url, params={"format": format}, timeout=STREAM_TIMEOUT) as response:
+                    response.raise_for_status()
+                    table["bytes"] = await write_stream_to_file(
+                        response.content.iter_chunked(STREAM_CHUNK_SIZE),
+                        os.path.join(filename, table["file"]),
+                        lambda written, done: progress and progress(table["name"], written, done)
+                    )
+
+        if not self.session:
+            await self.connect()
+        await asyncio.gather(*(download(table) for table in manifest["tables"]))
+        write_manifest(filename, manifest)
+        return manifest
+    
+    async def load_schema_from_file(self, filename: str, jobs: int = 4,
+                                    progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Import schema from disk.
+
+        A dump directory is uploaded table by table into server-side staging
+        tables (`jobs` uploads at a time) and merged in a single commit.
+        """
+        if not os.path.isdir(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                schema_data = json.load(f)
+            return await self.import_schema(schema_data)
+
+        manifest = read_manifest(filename)
+        format = manifest["export_info"].get("format", "ndjson")
+        import_id = uuid.uuid4().hex[:16]
+        semaphore = asyncio.Semaphore(max(1, jobs))
+
+        async def upload(table: Dict[str, Any]) -> None:
+            async with semaphore:
+                url = self._get_namespace_url(f'/schema/imports/{import_id}/tables/{table["name"]}')
+                chunks = read_file_chunks(
+                    os.path.join(filename, table["file"]),
+                    lambda read, done: progress and progress(table["name"], read, done)
+                )
+                async with self.session.put(url, params={"format": format}, data=chunks, timeout=STREAM_TIMEOUT) as response:
+                    response.raise_for_status()
+
+        if not self.session:
+            await self.connect()
+        try:
+            await asyncio.gather(*(upload(table) for table in manifest["tables"]))
+            tables = [table["name"] for table in manifest["tables"]]
+            return await self._request('POST', self._get_namespace_url(f'/schema/imports/{import_id}/commit'),
+                                       json={"tables": tables}, timeout=STREAM_TIMEOUT)
+        except Exception:
+            await self._request('DELETE', self._get_namespace_url(f'/schema/imports/{import_id}'))
+            raise
     
     # Convenience methods
     async def setup_namespace(self, namespace_id: str = None) -> Dict[str, Any]:
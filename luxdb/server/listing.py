@@ -0,0 +1,148 @@
+"""
+Listing - cursor pagination, field projection and ETags for list endpoints
+
+Pages are read with keyset pagination on the primary key (no OFFSET), so
+every page costs an index range scan of `limit` rows. The ETag of a page
+is a digest of its keys and version timestamps, computed by the database
+from the key index without building the response - an unchanged page is
+answered with 304 Not Modified.
+"""
+
+import base64
+import hashlib
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # noqa: F401 - required by ORJSONResponse
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+except ImportError:
+    FastJSONResponse = JSONResponse
+
+DEFAULT_PAGE_SIZE = int(os.getenv("LUXDB_LIST_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("LUXDB_LIST_MAX_PAGE_SIZE", "1000"))
+
+# Listable tables: cursor key, column that changes on every update, projectable columns
+LIST_RESOURCES = {
+    "souls": {
+        "key": "soul_hash",
+        "version": "updated_at",
+        "columns": ["soul_hash", "global_ulid", "alias", "genotype", "created_at", "updated_at"],
+        "json_columns": {"genotype"}
+    },
+    "beings": {
+        "key": "ulid",
+        "version": "updated_at",
+        "columns": ["ulid", "soul_hash", "alias", "data", "created_at", "updated_at", "ttl_expires"],
+        "json_columns": {"data"}
+    },
+}
+
+
+def encode_cursor(key_value: str) -> str:
+    """Opaque cursor pointing after the given key"""
+    return base64.urlsafe_b64encode(json.dumps({"after": key_value}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def parse_fields(resource: str, fields: Optional[str]) -> List[str]:
+    """Requested projection (all columns when not given)"""
+    columns = LIST_RESOURCES[resource]["columns"]
+    if not fields:
+        return list(columns)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields for {resource}: {', '.join(unknown)}")
+    return requested
+
+
+def _jsonable(value: Any, is_json: bool = False) -> Any:
+    if value is None:
+        return None
+    if is_json and isinstance(value, str):
+        return json.loads(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _page_bounds(key: str, after: Optional[str]) -> Tuple[str, list]:
+    if after is None:
+        return "", []
+    return f"WHERE {key} > $2", [after]
+
+
+async def page_etag(conn, resource: str, table: str, after: Optional[str], limit: int, fields: List[str]) -> str:
+    """Weak ETag of one page - keys and versions digested in the database"""
+    spec = LIST_RESOURCES[resource]
+    key, version = spec["key"], spec["version"]
+    where, params = _page_bounds(key, after)
+    row = await conn.fetchrow(f"""
+        SELECT COUNT(*) AS row_count,
+               md5(COALESCE(string_agg({key} || ':' || COALESCE({version}::text, ''), ',' ORDER BY {key}), '')) AS digest
+        FROM (SELECT {key}, {version} FROM {table} {where} ORDER BY {key} LIMIT $1) page
+    """, limit, *params)
+    projection = hashlib.md5(",".join(fields).encode()).hexdigest()[:8]
+    return f'W/"{resource}-{row["row_count"]}-{row["digest"]}-{projection}"'
+
+
+async def fetch_page(conn, resource: str, table: str, after: Optional[str], limit: int,
+                     fields: List[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of projected rows and the cursor of the next page"""
+    spec = LIST_RESOURCES[resource]
+    key = spec["key"]
+    selected = fields if key in fields else [key] + fields
+    where, params = _page_bounds(key, after)
+    rows = await conn.fetch(f"""
+        SELECT {", ".join(selected)} FROM {table} {where} ORDER BY {key} LIMIT $1
+    """, limit + 1, *params)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [
+        {field: _jsonable(row[field], field in spec["json_columns"]) for field in fields}
+        for row in rows
+    ]
+    next_cursor = encode_cursor(rows[-1][key]) if has_more else None
+    return items, next_cursor
+
+
+async def list_page(conn, resource: str, table: str, if_none_match: Optional[str] = None,
+                    cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                    fields: Optional[str] = None) -> Response:
+    """Paginated list response with ETag / If-None-Match handling"""
+    try:
+        after = decode_cursor(cursor)
+        projection = parse_fields(resource, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    etag = await page_etag(conn, resource, table, after, limit, projection)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    items, next_cursor = await fetch_page(conn, resource, table, after, limit, projection)
+    return FastJSONResponse(
+        {"items": items, "next_cursor": next_cursor, "limit": limit, "count": len(items)},
+        headers=headers
+    )
@@ -1,48 +1,150 @@
-
 """
 Namespace Manager - Handles isolated database instances
+
+All namespaces share one bounded connection pool. Each namespace lives in
+its own Postgres schema; connections acquired for a namespace have their
+search_path pointed at that schema, so the same unqualified SQL reaches
+the right tables. Namespaces are initialized lazily on first access and
+released again after a period of inactivity.
 """
 
 import asyncio
 import hashlib
+import os
+import re
+import time
 from typing import Dict, List, Optional, Any
+from ..core.connection import ConnectionManager
 from ..core.luxdb import LuxDB
 
 
+def namespace_schema_name(namespace_id: str) -> str:
+    """Postgres schema holding a namespace (safe identifier, unique per namespace)"""
+    slug = re.sub(r"[^a-z0-9_]", "_", namespace_id.lower())[:40]
+    digest = hashlib.sha256(namespace_id.encode()).hexdigest()[:8]
+    return f"ns_{slug}_{digest}"
+
+
+class _SchemaAcquireContext:
+    """Acquires a shared connection and routes it to the namespace schema"""
+
+    def __init__(self, acquire_context, search_path: str):
+        self._acquire_context = acquire_context
+        self._search_path = search_path
+
+    async def __aenter__(self):
+        conn = await self._acquire_context.__aenter__()
+        try:
+            # Session-level setting; the pool runs RESET ALL when the connection is released
+            await conn.execute(f"SET search_path TO {self._search_path}")
+        except BaseException as e:
+            await self._acquire_context.__aexit__(type(e), e, e.__traceback__)
+            raise
+        return conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._acquire_context.__aexit__(exc_type, exc, tb)
+
+
+class SchemaRoutedPool:
+    """
+    View of the shared pool bound to one namespace schema
+    """
+
+    def __init__(self, pool, schema_name: str, on_acquire=None):
+        self._pool = pool
+        self.schema_name = schema_name
+        self._search_path = f"{schema_name}, public"
+        self._on_acquire = on_acquire
+
+    def acquire(self, *args, **kwargs) -> _SchemaAcquireContext:
+        if self._on_acquire:
+            self._on_acquire()
+        return _SchemaAcquireContext(self._pool.acquire(*args, **kwargs), self._search_path)
+
+    async def release(self, connection, *args, **kwargs):
+        return await self._pool.release(connection, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+
+class NamespaceConnectionManager:
+    """
+    ConnectionManager facade for a namespace - routes the shared pool, never owns it
+    """
+
+    def __init__(self, shared: ConnectionManager, schema_name: str, on_acquire=None):
+        self.shared = shared
+        self.schema_name = schema_name
+        self._on_acquire = on_acquire
+        self._pool: Optional[SchemaRoutedPool] = None
+
+    async def initialize(self) -> None:
+        await self.get_pool()
+
+    async def get_pool(self) -> SchemaRoutedPool:
+        if self._pool is None:
+            self._pool = SchemaRoutedPool(await self.shared.get_pool(), self.schema_name, self._on_acquire)
+        return self._pool
+
+    async def close(self) -> None:
+        # The shared pool belongs to NamespaceManager
+        self._pool = None
+
+
 class NamespaceManager:
     """
     Manages multiple isolated LuxDB namespaces
-    Each namespace has its own set of tables with prefixed names
+    Each namespace has its own Postgres schema on a shared connection pool
     """
-    
-    def __init__(self, db_config: Dict[str, Any]):
+
+    def __init__(self, db_config: Dict[str, Any], max_connections: int = None, idle_timeout: float = None):
         self.db_config = db_config
-        self.namespaces: Dict[str, LuxDB] = {}
-        self._master_db: Optional[LuxDB] = None
-        
+        self.max_connections = max_connections or int(os.getenv("LUXDB_NAMESPACE_POOL_SIZE", "20"))
+        self.idle_timeout = idle_timeout or float(os.getenv("LUXDB_NAMESPACE_IDLE_TIMEOUT", "600"))
+        self.connection_manager = ConnectionManager(
+            **db_config,
+            min_connections=1,
+            max_connections=self.max_connections
+        )
+        # Registered namespaces (id -> config) and the ones currently initialized
+        self.registered: Dict[str, Dict[str, Any]] = {}
+        self.namespaces: Dict[str, "NamespacedLuxDB"] = {}
+        self._last_used: Dict[str, float] = {}
+        self._init_locks: Dict[str, asyncio.Lock] = {}
+        self._idle_task: Optional[asyncio.Task] = None
+        self.stats = {"initialized": 0, "released": 0}
+
     async def initialize(self):
         """Initialize the namespace manager"""
-        # Create master database connection for namespace management
-        self._master_db = LuxDB(**self.db_config)
-        await self._master_db.initialize()
-        
-        # Create namespaces table
+        # Create namespaces table (public schema of the shared pool)
         await self._setup_namespace_tables()
-        
-        # Load existing namespaces
+
+        # Register existing namespaces - their schemas are opened on first access
         await self._load_existing_namespaces()
-    
+        self._idle_task = asyncio.create_task(self._release_idle_loop())
+
     async def close(self):
         """Close all database connections"""
+        if self._idle_task:
+            self._idle_task.cancel()
+            await asyncio.gather(self._idle_task, return_exceptions=True)
+            self._idle_task = None
         for db in self.namespaces.values():
             await db.close()
-        if self._master_db:
-            await self._master_db.close()
-    
+        self.namespaces.clear()
+        await self.connection_manager.close()
+
     async def _setup_namespace_tables(self):
         """Create tables for namespace management"""
-        pool = await self._master_db.connection_manager.get_pool()
+        pool = await self.connection_manager.get_pool()
         async with pool.acquire() as conn:
+            # Extensions live in public, reachable from every namespace search_path
+            await conn.execute("""
+                CREATE EXTENSION IF NOT EXISTS vector;
+                CREATE EXTENSION IF NOT EXISTS pgcrypto;
+            """)
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS luxdb_namespaces (
                     namespace_id VARCHAR(255) PRIMARY KEY,
@@ -51,211 +153,205 @@ class NamespaceManager:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
-                
+
                 CREATE INDEX IF NOT EXISTS idx_namespaces_hash ON luxdb_namespaces (namespace_hash);
                 CREATE INDEX IF NOT EXISTS idx_namespaces_created ON luxdb_namespaces (created_at);
             """)
-    
+
     async def _load_existing_namespaces(self):
-        """Load existing namespaces from database"""
-        pool = await self._master_db.connection_manager.get_pool()
+        """Register existing namespaces from database (without initializing them)"""
+        pool = await self.connection_manager.get_pool()
         async with pool.acquire() as conn:
-            rows = await conn.fetch("SELECT namespace_id FROM luxdb_namespaces")
+            rows = await conn.fetch("SELECT namespace_id, config FROM luxdb_namespaces")
             for row in rows:
-                namespace_id = row['namespace_id']
-                await self._create_namespace_database(namespace_id)
-    
+                self.registered[row['namespace_id']] = row['config'] or {}
+
     def _generate_namespace_hash(self, namespace_id: str) -> str:
         """Generate unique hash for namespace"""
         return hashlib.sha256(f"luxdb_ns_{namespace_id}".encode()).hexdigest()
-    
+
+    def _touch(self, namespace_id: str) -> None:
+        self._last_used[namespace_id] = time.monotonic()
+
     async def _create_namespace_database(self, namespace_id: str) -> LuxDB:
-        """Create database connection for namespace"""
-        if namespace_id in self.namespaces:
-            return self.namespaces[namespace_id]
-        
-        # Create namespaced database instance
-        db = NamespacedLuxDB(namespace_id, **self.db_config)
-        await db.initialize()
-        
-        self.namespaces[namespace_id] = db
+        """Initialize namespace schema on first access"""
+        db = self.namespaces.get(namespace_id)
+        if db is not None:
+            return db
+
+        lock = self._init_locks.setdefault(namespace_id, asyncio.Lock())
+        async with lock:
+            db = self.namespaces.get(namespace_id)
+            if db is None:
+                db = NamespacedLuxDB(
+                    namespace_id,
+                    NamespaceConnectionManager(
+                        self.connection_manager,
+                        namespace_schema_name(namespace_id),
+                        on_acquire=lambda: self._touch(namespace_id)
+                    )
+                )
+                await db.initialize()
+                self.namespaces[namespace_id] = db
+                self.stats["initialized"] += 1
+        self._touch(namespace_id)
         return db
-    
+
+    async def release_idle(self, idle_timeout: float = None) -> List[str]:
+        """Release namespaces not used for idle_timeout seconds"""
+        cutoff = time.monotonic() - (idle_timeout if idle_timeout is not None else self.idle_timeout)
+        released = [ns for ns in self.namespaces if self._last_used.get(ns, 0) < cutoff]
+        for namespace_id in released:
+            db = self.namespaces.pop(namespace_id)
+            self._last_used.pop(namespace_id, None)
+            await db.close()
+        self.stats["released"] += len(released)
+        return released
+
+    async def _release_idle_loop(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 2))
+            try:
+                await self.release_idle()
+            except Exception as e:
+                print(f"⚠️ Namespace idle release failed: {e}")
+
     async def create_namespace(self, namespace_id: str, config: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create new namespace"""
-        if namespace_id in self.namespaces:
+        if namespace_id in self.registered:
             raise ValueError(f"Namespace {namespace_id} already exists")
-        
+
         namespace_hash = self._generate_namespace_hash(namespace_id)
         config = config or {}
-        
+
         # Save namespace to master database
-        pool = await self._master_db.connection_manager.get_pool()
+        pool = await self.connection_manager.get_pool()
         async with pool.acquire() as conn:
             await conn.execute("""
                 INSERT INTO luxdb_namespaces (namespace_id, namespace_hash, config)
                 VALUES ($1, $2, $3)
             """, namespace_id, namespace_hash, config)
-        
-        # Create namespace database
+        self.registered[namespace_id] = config
+
+        # Create namespace schema
         db = await self._create_namespace_database(namespace_id)
-        
+
         return {
             "namespace_id": namespace_id,
             "namespace_hash": namespace_hash,
+            "schema": db.schema_name,
             "config": config,
             "status": "created"
         }
-    
+
     async def delete_namespace(self, namespace_id: str) -> Dict[str, Any]:
         """Delete namespace and all its data"""
-        if namespace_id not in self.namespaces:
+        if namespace_id not in self.registered:
             raise ValueError(f"Namespace {namespace_id} not found")
-        
-        # Close database connection
-        await self.namespaces[namespace_id].close()
-        del self.namespaces[namespace_id]
-        
-        # Drop all namespace tables
-        pool = await self._master_db.connection_manager.get_pool()
+
+        # Release namespace database
+        db = self.namespaces.pop(namespace_id, None)
+        if db is not None:
+            await db.close()
+        self._last_used.pop(namespace_id, None)
+
+        pool = await self.connection_manager.get_pool()
         async with pool.acquire() as conn:
-            # Get namespace prefix
-            prefix = f"ns_{namespace_id}_"
-            
-            # Drop all tables with namespace prefix
-            tables_result = await conn.fetch("""
-                SELECT tablename FROM pg_tables 
-                WHERE schemaname = 'public' AND tablename LIKE $1
-            """, f"{prefix}%")
-            
-            for table_row in tables_result:
-                table_name = table_row['tablename']
-                await conn.execute(f"DROP TABLE IF EXISTS {table_name} CASCADE")
-            
+            await conn.execute(f"DROP SCHEMA IF EXISTS {namespace_schema_name(namespace_id)} CASCADE")
+
             # Remove from namespaces table
             await conn.execute(
                 "DELETE FROM luxdb_namespaces WHERE namespace_id = $1",
                 namespace_id
             )
-        
+        self.registered.pop(namespace_id, None)
+
         return {"namespace_id": namespace_id, "status": "deleted"}
-    
+
     async def list_namespaces(self) -> List[str]:
         """List all available namespaces"""
-        return list(self.namespaces.keys())
-    
+        return list(self.registered.keys())
+
     async def get_namespace_info(self, namespace_id: str) -> Dict[str, Any]:
         """Get information about namespace"""
-        if namespace_id not in self.namespaces:
-            raise ValueError(f"Namespace {namespace_id} not found")
-        
-        db = self.namespaces[namespace_id]
+        db = await self.get_database(namespace_id)
         health = await db.health_check()
-        
-        pool = await self._master_db.connection_manager.get_pool()
+
+        pool = await self.connection_manager.get_pool()
         async with pool.acquire() as conn:
             info = await conn.fetchrow("""
                 SELECT namespace_hash, config, created_at, updated_at
                 FROM luxdb_namespaces WHERE namespace_id = $1
             """, namespace_id)
-        
+
         return {
             "namespace_id": namespace_id,
             "namespace_hash": info['namespace_hash'],
+            "schema": db.schema_name,
             "config": info['config'],
             "created_at": info['created_at'].isoformat(),
             "updated_at": info['updated_at'].isoformat(),
             "health": health
         }
-    
+
     async def get_database(self, namespace_id: str) -> LuxDB:
-        """Get database connection for namespace"""
-        if namespace_id not in self.namespaces:
+        """Get database connection for namespace (initialized on first access)"""
+        if namespace_id not in self.registered:
             raise ValueError(f"Namespace {namespace_id} not found")
-        return self.namespaces[namespace_id]
+        return await self._create_namespace_database(namespace_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Shared pool and namespace activity"""
+        pool = self.connection_manager._pool
+        return {
+            **self.stats,
+            "registered": len(self.registered),
+            "active": len(self.namespaces),
+            "pool_size": pool.get_size() if pool is not None else 0,
+            "pool_idle": pool.get_idle_size() if pool is not None else 0,
+            "max_connections": self.max_connections,
+            "idle_timeout": self.idle_timeout
+        }
 
 
 class NamespacedLuxDB(LuxDB):
     """
-    LuxDB instance with namespaced table names
+    LuxDB instance bound to a namespace schema on the shared pool
     """
-    
-    def __init__(self, namespace_id: str, **kwargs):
-        super().__init__(**kwargs)
+
+    def __init__(self, namespace_id: str, connection_manager: NamespaceConnectionManager, **kwargs):
+        super().__init__(use_existing_pool=False, **kwargs)
         self.namespace_id = namespace_id
-        self.table_prefix = f"ns_{namespace_id}_"
-    
+        self.schema_name = connection_manager.schema_name
+        self.connection_manager = connection_manager
+        # Tables are unqualified - search_path selects the namespace schema
+        self.table_prefix = ""
+
     async def _setup_core_tables(self) -> None:
         """
-        Create namespaced core tables
+        Create the namespace schema and its core tables
         """
         pool = await self.connection_manager.get_pool()
         async with pool.acquire() as conn:
-            # Enable extensions
-            await conn.execute("""
-                CREATE EXTENSION IF NOT EXISTS vector;
-                CREATE EXTENSION IF NOT EXISTS pgcrypto;
-            """)
-            
-            # Namespaced souls table
-            souls_table = f"{self.table_prefix}souls"
-            await conn.execute(f"""
-                CREATE TABLE IF NOT EXISTS {souls_table} (
-                    soul_hash CHAR(64) PRIMARY KEY,
-                    global_ulid CHAR(26) NOT NULL,
-                    alias VARCHAR(255),
-                    genotype JSONB NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(alias)
-                );
-                
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}souls_genotype ON {souls_table} USING gin (genotype);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}souls_alias ON {souls_table} (alias);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}souls_created_at ON {souls_table} (created_at);
-            """)
-            
-            # Namespaced beings table
-            beings_table = f"{self.table_prefix}beings"
-            await conn.execute(f"""
-                CREATE TABLE IF NOT EXISTS {beings_table} (
-                    ulid CHAR(26) PRIMARY KEY,
-                    soul_hash CHAR(64) NOT NULL,
-                    alias VARCHAR(255),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (soul_hash) REFERENCES {souls_table}(soul_hash)
-                );
-                
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}beings_soul_hash ON {beings_table} (soul_hash);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}beings_created_at ON {beings_table} (created_at);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}beings_updated_at ON {beings_table} (updated_at);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}beings_alias ON {beings_table} (alias);
-            """)
-            
-            # Namespaced relationships table
-            relationships_table = f"{self.table_prefix}relationships"
-            await conn.execute(f"""
-                CREATE TABLE IF NOT EXISTS {relationships_table} (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    source_ulid CHAR(26) NOT NULL,
-                    target_ulid CHAR(26) NOT NULL,
-                    relation_type VARCHAR(100) NOT NULL DEFAULT 'connection',
-                    strength FLOAT DEFAULT 1.0,
-                    metadata JSONB DEFAULT '{{}}',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (source_ulid) REFERENCES {beings_table}(ulid) ON DELETE CASCADE,
-                    FOREIGN KEY (target_ulid) REFERENCES {beings_table}(ulid) ON DELETE CASCADE
-                );
-                
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}relationships_source ON {relationships_table} (source_ulid);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}relationships_target ON {relationships_table} (target_ulid);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}relationships_type ON {relationships_table} (relation_type);
-                CREATE INDEX IF NOT EXISTS idx_{self.table_prefix}relationships_strength ON {relationships_table} (strength);
-                CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.table_prefix}unique_relationship 
-                ON {relationships_table} (source_ulid, target_ulid, relation_type);
-            """)
-    
+            await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self.schema_name}")
+            await self._adopt_prefixed_tables(conn)
+
+        # Same tables as a standalone LuxDB, created inside the namespace schema
+        await super()._setup_core_tables()
+
+    async def _adopt_prefixed_tables(self, conn) -> None:
+        """Move tables of the old ns_<id>_ prefix layout from public into the namespace schema"""
+        legacy_prefix = f"ns_{self.namespace_id}_"
+        for table in ("souls", "beings", "relationships"):
+            exists = await conn.fetchval("""
+                SELECT EXISTS (SELECT 1 FROM pg_tables WHERE schemaname = 'public' AND tablename = $1)
+                   AND NOT EXISTS (SELECT 1 FROM pg_tables WHERE schemaname = $2 AND tablename = $3)
+            """, f"{legacy_prefix}{table}", self.schema_name, table)
+            if exists:
+                await conn.execute(f'ALTER TABLE public."{legacy_prefix}{table}" SET SCHEMA {self.schema_name}')
+                await conn.execute(f'ALTER TABLE {self.schema_name}."{legacy_prefix}{table}" RENAME TO {table}')
+                print(f"📦 Moved {legacy_prefix}{table} into schema {self.schema_name}")
+
     def get_table_name(self, base_name: str) -> str:
         """Get namespaced table name"""
-        return f"{self.table_prefix}{base_name}"
+        return f"{self.schema_name}.{base_name}"
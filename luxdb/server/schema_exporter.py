@@ -1,13 +1,109 @@
 
 """
 Schema Exporter - Export and import namespace schemas
+
+Besides the whole-document JSON export, tables can be streamed one by one
+as gzip-compressed NDJSON or binary COPY through server-side cursors, and
+imported with COPY into unlogged staging tables followed by a set-based
+merge. Streamed dumps are directories with a manifest.json and one file
+per table, so memory use does not depend on the namespace size.
 """
 
+import asyncio
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import os
+import re
+import uuid
+import zlib
+from decimal import Decimal
+from typing import Dict, List, Any, AsyncIterable, AsyncIterator, Callable, Optional
+from datetime import date, datetime
 from ..core.luxdb import LuxDB
 
+EXPORT_FORMATS = ("ndjson", "copy")
+STREAM_BATCH_SIZE = int(os.getenv("LUXDB_EXPORT_BATCH_SIZE", "5000"))
+STREAM_CHUNK_SIZE = 64 * 1024
+MANIFEST_FILENAME = "manifest.json"
+
+# Merge order (foreign keys) and conflict keys of the namespace tables
+CORE_TABLES = {
+    "souls": {"key": ["soul_hash"], "stage": 0},
+    "beings": {"key": ["ulid"], "stage": 1},
+    "relationships": {"key": ["source_ulid", "target_ulid", "relation_type"], "stage": 2, "immutable": ["id"]},
+}
+DYNAMIC_TABLE_SPEC = {"key": ["being_ulid", "key"], "stage": 2}
+
+_IMPORT_ID_PATTERN = re.compile(r"[a-z0-9_]{1,32}")
+
+ProgressCallback = Callable[[str, int, bool], None]
+
+
+def table_filename(table: str, fmt: str) -> str:
+    """File name of a table inside a streamed dump directory"""
+    return f"{table}.{fmt}.gz"
+
+
+def _encode_value(value: Any, data_type: str) -> Any:
+    """Database value -> JSON value"""
+    if value is None:
+        return None
+    if data_type in ("json", "jsonb") and isinstance(value, str):
+        return json.loads(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def _decode_value(value: Any, data_type: str) -> Any:
+    """JSON value -> value accepted by COPY for the column type"""
+    if value is None:
+        return None
+    if data_type in ("json", "jsonb"):
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    if data_type.startswith("timestamp"):
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+    if data_type == "date":
+        return date.fromisoformat(value) if isinstance(value, str) else value
+    if data_type == "uuid":
+        return uuid.UUID(str(value))
+    if data_type == "numeric":
+        return Decimal(str(value))
+    if data_type in ("double precision", "real"):
+        return float(value)
+    if data_type in ("integer", "bigint", "smallint"):
+        return int(value)
+    if data_type == "boolean":
+        return bool(value)
+    if data_type == "bytea":
+        return bytes.fromhex(value) if isinstance(value, str) else value
+    return str(value) if not isinstance(value, str) else value
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream into gzip format"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def gunzip_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Decompress a gzip byte stream"""
+    decompressor = zlib.decompressobj(31)
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
 
 class SchemaExporter:
     """
@@ -251,6 +347,328 @@ class SchemaExporter:
         
         return imported_count
 
+    # Streaming export / import
+
+    async def describe_namespace(self, namespace_id: str, db: LuxDB) -> Dict[str, Any]:
+        """Manifest of exportable tables: columns, conflict keys, merge stage, row estimates"""
+        prefix = getattr(db, 'table_prefix', "")
+        pool = await db.connection_manager.get_pool()
+
+        async with pool.acquire() as conn:
+            dynamic_rows = await conn.fetch("""
+                SELECT tablename FROM pg_tables
+                WHERE schemaname = current_schema() AND tablename LIKE $1
+                ORDER BY tablename
+            """, f"{prefix}attr_%")
+            names = list(CORE_TABLES) + [row['tablename'][len(prefix):] for row in dynamic_rows]
+            physical = [f"{prefix}{name}" for name in names]
+
+            column_rows = await conn.fetch("""
+                SELECT table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = ANY($1::text[])
+                ORDER BY table_name, ordinal_position
+            """, physical)
+            estimate_rows = await conn.fetch("""
+                SELECT relname, GREATEST(reltuples, 0)::bigint AS estimate
+                FROM pg_class WHERE relname = ANY($1::text[]) AND relkind = 'r'
+            """, physical)
+
+        columns: Dict[str, List[Dict[str, str]]] = {}
+        for row in column_rows:
+            columns.setdefault(row['table_name'], []).append({"name": row['column_name'], "type": row['data_type']})
+        estimates = {row['relname']: row['estimate'] for row in estimate_rows}
+
+        tables = []
+        for name, table in zip(names, physical):
+            if table not in columns:
+                continue
+            spec = CORE_TABLES.get(name, DYNAMIC_TABLE_SPEC)
+            tables.append({
+                "name": name,
+                "columns": columns[table],
+                "key": spec["key"],
+                "immutable": spec.get("immutable", []),
+                "stage": spec["stage"],
+                "estimated_rows": estimates.get(table, 0)
+            })
+
+        return {
+            "export_info": {
+                "namespace_id": namespace_id,
+                "exported_at": datetime.utcnow().isoformat(),
+                "luxdb_version": "1.0.0",
+                "schema_version": "2.0"
+            },
+            "tables": tables
+        }
+
+    async def _table_info(self, db: LuxDB, table: str) -> Dict[str, Any]:
+        manifest = await self.describe_namespace(getattr(db, 'namespace_id', None), db)
+        for info in manifest["tables"]:
+            if info["name"] == table:
+                return info
+        raise ValueError(f"Unknown table: {table}")
+
+    async def stream_table(self, db: LuxDB, table: str, fmt: str = "ndjson",
+                           compress: bool = True, batch_size: int = None) -> AsyncIterator[bytes]:
+        """
+        Return a byte stream of one table (validated before the first chunk).
+
+        ndjson rows are read through a server-side cursor, copy uses
+        COPY ... TO STDOUT (FORMAT binary). Output is gzip-compressed by default.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        info = await self._table_info(db, table)
+        target = f"{getattr(db, 'table_prefix', '')}{table}"
+
+        if fmt == "ndjson":
+            chunks = self._ndjson_chunks(db, info, target, batch_size or STREAM_BATCH_SIZE)
+        else:
+            chunks = self._copy_chunks(db, info, target)
+        return gzip_chunks(chunks) if compress else chunks
+
+    def _select_query(self, info: Dict[str, Any], target: str) -> str:
+        column_list = ", ".join(f'"{column["name"]}"' for column in info["columns"])
+        order_by = ", ".join(f'"{key}"' for key in info["key"])
+        return f"SELECT {column_list} FROM {target} ORDER BY {order_by}"
+
+    async def _ndjson_chunks(self, db: LuxDB, info: Dict[str, Any], target: str, batch_size: int) -> AsyncIterator[bytes]:
+        columns = [(column["name"], column["type"]) for column in info["columns"]]
+        pool = await db.connection_manager.get_pool()
+
+        async with pool.acquire() as conn:
+            # Server-side cursors need a transaction; repeatable read gives a consistent snapshot
+            async with conn.transaction(isolation='repeatable_read', readonly=True):
+                lines = []
+                async for row in conn.cursor(self._select_query(info, target), prefetch=batch_size):
+                    record = {name: _encode_value(row[name], data_type) for name, data_type in columns}
+                    lines.append(json.dumps(record, ensure_ascii=False, default=str))
+                    if len(lines) >= batch_size:
+                        yield ("\n".join(lines) + "\n").encode("utf-8")
+                        lines = []
+                if lines:
+                    yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    async def _copy_chunks(self, db: LuxDB, info: Dict[str, Any], target: str) -> AsyncIterator[bytes]:
+        pool = await db.connection_manager.get_pool()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=16)
+        finished = object()
+
+        async def put(chunk: bytes) -> None:
+            await queue.put(bytes(chunk))
+
+        async def produce() -> None:
+            try:
+                async with pool.acquire() as conn:
+                    await conn.copy_from_query(self._select_query(info, target), output=put, format='binary')
+            finally:
+                await queue.put(finished)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is finished:
+                    break
+                yield chunk
+            await producer  # re-raise COPY errors
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+    def _staging_table(self, db: LuxDB, table: str, import_id: str) -> str:
+        if not _IMPORT_ID_PATTERN.fullmatch(import_id or ""):
+            raise ValueError(f"Invalid import id: {import_id}")
+        return f"{getattr(db, 'table_prefix', '')}{table}__import_{import_id}".lower()
+
+    async def import_table_stream(self, db: LuxDB, import_id: str, table: str, chunks: AsyncIterable[bytes],
+                                  fmt: str = "ndjson", compressed: bool = True, batch_size: int = None) -> int:
+        """Load one table stream into its staging table; returns the number of rows loaded"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        info = await self._table_info(db, table)
+        target = f"{getattr(db, 'table_prefix', '')}{table}"
+        staging = self._staging_table(db, table, import_id)
+        column_names = [column["name"] for column in info["columns"]]
+
+        if compressed:
+            chunks = gunzip_chunks(chunks)
+
+        pool = await db.connection_manager.get_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(f"""
+                DROP TABLE IF EXISTS {staging};
+                CREATE UNLOGGED TABLE {staging} (LIKE {target} INCLUDING DEFAULTS);
+            """)
+
+            if fmt == "copy":
+                status = await conn.copy_to_table(staging, source=chunks, columns=column_names, format='binary')
+                return int(status.split()[-1])
+
+            loaded = 0
+            async for records in self._ndjson_records(chunks, info, batch_size or STREAM_BATCH_SIZE):
+                await conn.copy_records_to_table(staging, records=records, columns=column_names)
+                loaded += len(records)
+            return loaded
+
+    async def _ndjson_records(self, chunks: AsyncIterable[bytes], info: Dict[str, Any], batch_size: int) -> AsyncIterator[List[tuple]]:
+        columns = [(column["name"], column["type"]) for column in info["columns"]]
+
+        def decode(line: bytes) -> tuple:
+            record = json.loads(line)
+            return tuple(_decode_value(record.get(name), data_type) for name, data_type in columns)
+
+        buffer = b""
+        records: List[tuple] = []
+        async for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            records.extend(decode(line) for line in lines if line.strip())
+            if len(records) >= batch_size:
+                yield records
+                records = []
+        if buffer.strip():
+            records.append(decode(buffer))
+        if records:
+            yield records
+
+    async def commit_import(self, namespace_id: str, db: LuxDB, import_id: str, tables: List[str]) -> Dict[str, Any]:
+        """Merge staged tables into the namespace in one transaction (foreign key order) and drop staging"""
+        manifest = await self.describe_namespace(namespace_id, db)
+        infos = sorted((info for info in manifest["tables"] if info["name"] in tables), key=lambda info: info["stage"])
+        missing = set(tables) - {info["name"] for info in infos}
+        if missing:
+            raise ValueError(f"Unknown tables: {', '.join(sorted(missing))}")
+
+        prefix = getattr(db, 'table_prefix', "")
+        merged: Dict[str, int] = {}
+        pool = await db.connection_manager.get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                for info in infos:
+                    staging = self._staging_table(db, info["name"], import_id)
+                    status = await conn.execute(self._merge_query(info, f"{prefix}{info['name']}", staging))
+                    merged[info["name"]] = int(status.split()[-1])
+                for info in infos:
+                    await conn.execute(f"DROP TABLE IF EXISTS {self._staging_table(db, info['name'], import_id)}")
+
+        return {
+            "namespace_id": namespace_id,
+            "import_id": import_id,
+            "imported_at": datetime.utcnow().isoformat(),
+            "tables": merged,
+            "rows_imported": sum(merged.values())
+        }
+
+    def _merge_query(self, info: Dict[str, Any], target: str, staging: str) -> str:
+        column_list = ", ".join(f'"{column["name"]}"' for column in info["columns"])
+        key_list = ", ".join(f'"{key}"' for key in info["key"])
+        updates = [
+            f'"{column["name"]}" = EXCLUDED."{column["name"]}"'
+            for column in info["columns"]
+            if column["name"] not in info["key"] and column["name"] not in info["immutable"]
+        ]
+        on_conflict = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        # DISTINCT ON - a key repeated in the stream must not hit the same row twice
+        return f"""
+            INSERT INTO {target} ({column_list})
+            SELECT DISTINCT ON ({key_list}) {column_list} FROM {staging} ORDER BY {key_list}
+            ON CONFLICT ({key_list}) {on_conflict}
+        """
+
+    async def abort_import(self, namespace_id: str, db: LuxDB, import_id: str) -> None:
+        """Drop staging tables of an unfinished import"""
+        manifest = await self.describe_namespace(namespace_id, db)
+        pool = await db.connection_manager.get_pool()
+        async with pool.acquire() as conn:
+            for info in manifest["tables"]:
+                await conn.execute(f"DROP TABLE IF EXISTS {self._staging_table(db, info['name'], import_id)}")
+
+    async def export_namespace_to_path(self, namespace_id: str, db: LuxDB, path: str, fmt: str = "ndjson",
+                                       jobs: int = 4, progress: ProgressCallback = None) -> Dict[str, Any]:
+        """Stream every table into a dump directory, up to `jobs` tables at a time"""
+        os.makedirs(path, exist_ok=True)
+        manifest = await self.describe_namespace(namespace_id, db)
+        manifest["export_info"]["format"] = fmt
+        semaphore = asyncio.Semaphore(max(1, jobs))
+
+        async def dump(info: Dict[str, Any]) -> None:
+            async with semaphore:
+                info["file"] = table_filename(info["name"], fmt)
+                stream = await self.stream_table(db, info["name"], fmt)
+                info["bytes"] = await write_stream_to_file(stream, os.path.join(path, info["file"]),
+                                                           lambda written, done: progress and progress(info["name"], written, done))
+
+        await asyncio.gather(*(dump(info) for info in manifest["tables"]))
+        write_manifest(path, manifest)
+        return manifest
+
+    async def import_namespace_from_path(self, namespace_id: str, db: LuxDB, path: str,
+                                         jobs: int = 4, progress: ProgressCallback = None) -> Dict[str, Any]:
+        """Load a dump directory: parallel staging loads, then one merge transaction"""
+        manifest = read_manifest(path)
+        fmt = manifest["export_info"].get("format", "ndjson")
+        import_id = uuid.uuid4().hex[:16]
+        semaphore = asyncio.Semaphore(max(1, jobs))
+
+        async def load(info: Dict[str, Any]) -> None:
+            async with semaphore:
+                chunks = read_file_chunks(os.path.join(path, info["file"]),
+                                          lambda read, done: progress and progress(info["name"], read, done))
+                await self.import_table_stream(db, import_id, info["name"], chunks, fmt)
+
+        try:
+            await asyncio.gather(*(load(info) for info in manifest["tables"]))
+            return await self.commit_import(namespace_id, db, import_id, [info["name"] for info in manifest["tables"]])
+        except Exception:
+            await self.abort_import(namespace_id, db, import_id)
+            raise
+
+
+def write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    with open(os.path.join(path, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def write_stream_to_file(chunks: AsyncIterable[bytes], filename: str,
+                               progress: Callable[[int, bool], Any] = None) -> int:
+    """Write a byte stream to a file; returns the number of bytes written"""
+    written = 0
+    with open(filename, 'wb') as f:
+        async for chunk in chunks:
+            f.write(chunk)
+            written += len(chunk)
+            if progress:
+                progress(written, False)
+    if progress:
+        progress(written, True)
+    return written
+
+
+async def read_file_chunks(filename: str, progress: Callable[[int, bool], Any] = None,
+                           chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a file as a byte stream"""
+    read = 0
+    with open(filename, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            read += len(chunk)
+            if progress:
+                progress(read, False)
+            yield chunk
+    if progress:
+        progress(read, True)
+
 
 def save_schema_to_file(schema: Dict[str, Any], filename: str):
     """Save schema to JSON file"""
@@ -6,20 +6,55 @@ LuxDB Server - Multi-tenant database server
 import asyncio
 import json
 import logging
+import os
 from typing import Dict, Optional, Any, List
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
 
 from ..core.luxdb import LuxDB
+from ..core.loop_monitor import loop_monitor
+from ..core.memory_accounting import memory_accountant
+from ..core.query_stats import query_stats
 from .namespace import NamespaceManager
 from .schema_exporter import SchemaExporter
 from .auth import AuthManager
+from .listing import DEFAULT_PAGE_SIZE, list_page
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional, extras "server"
+    BrotliMiddleware = None
 
 
 logger = logging.getLogger(__name__)
 
+COMPRESS_MIN_SIZE = int(os.getenv("LUXDB_COMPRESS_MIN_SIZE", "1024"))
+MAX_BATCH_SIZE = int(os.getenv("LUXDB_MAX_BATCH_SIZE", "5000"))
+
+# Table streams are gzipped NDJSON already - the JSON export and manifest are compressed as usual
+GZIPPED_STREAM_PATHS = ("/schema/tables/", "/schema/imports/")
+
+
+class _CompressionMiddleware:
+    """Brotli/gzip above a size threshold, except for already-gzipped schema streams"""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressed = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and any(part in scope["path"] for part in GZIPPED_STREAM_PATHS):
+            await self.app(scope, receive, send)
+        else:
+            await self.compressed(scope, receive, send)
+
 
 class LuxDBServer:
     """
@@ -63,9 +98,13 @@ class LuxDBServer:
         async def lifespan(app: FastAPI):
             # Startup
             await self.namespace_manager.initialize()
+            loop_monitor.start()
+            memory_accountant.start()
             logger.info(f"🚀 LuxDB Server started on {self.host}:{self.port}")
             yield
             # Shutdown
+            await loop_monitor.stop()
+            await memory_accountant.stop()
             await self.namespace_manager.close()
             logger.info("🔄 LuxDB Server stopped")
         
@@ -84,6 +123,7 @@ class LuxDBServer:
             allow_methods=["*"],
             allow_headers=["*"],
         )
+        app.add_middleware(_CompressionMiddleware)
         
         # Routes
         self._add_routes(app)
@@ -136,15 +176,10 @@ class LuxDBServer:
         
         # Soul operations
         @app.get("/namespaces/{namespace_id}/souls")
-        async def list_souls(namespace_id: str):
-            """List all souls in namespace"""
-            try:
-                db = await self.namespace_manager.get_database(namespace_id)
-                from ..models.soul import Soul
-                souls = await Soul.load_all()
-                return [soul.to_dict() for soul in souls]
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=str(e))
+        async def list_souls(namespace_id: str, request: Request, cursor: Optional[str] = None,
+                             limit: int = DEFAULT_PAGE_SIZE, fields: Optional[str] = None):
+            """List souls in namespace (cursor-paginated, ETag-validated)"""
+            return await self._list_resource(namespace_id, "souls", request, cursor, limit, fields)
         
         @app.post("/namespaces/{namespace_id}/souls")
         async def create_soul(namespace_id: str, soul_data: Dict[str, Any]):
@@ -160,17 +195,40 @@ class LuxDBServer:
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
         
+        @app.post("/namespaces/{namespace_id}/souls:batch")
+        async def create_souls_batch(namespace_id: str, payload: Dict[str, Any]):
+            """Create many souls with one bulk write (atomic per request)"""
+            db = await self._get_namespace_db(namespace_id)
+            items = payload.get("items", [])
+            self._check_batch_size(items)
+            
+            from ..models.soul import Soul
+            from ..repository.soul_repository import SoulRepository
+            
+            souls, errors = [], []
+            for index, item in enumerate(items):
+                try:
+                    souls.append(await Soul.create(item["genotype"], item.get("alias")))
+                except Exception as e:
+                    errors.append({"index": index, "error": str(e)})
+            if errors:
+                raise HTTPException(status_code=422, detail={"errors": errors})
+            
+            result = await SoulRepository.set_many(souls, pool=await db.connection_manager.get_pool())
+            if not result.get("success"):
+                raise HTTPException(status_code=400, detail=result.get("error"))
+            return {
+                "success": True,
+                "created": result["saved"],
+                "souls": [{"soul_hash": soul.soul_hash, "alias": soul.alias} for soul in souls]
+            }
+        
         # Being operations
         @app.get("/namespaces/{namespace_id}/beings")
-        async def list_beings(namespace_id: str):
-            """List all beings in namespace"""
-            try:
-                db = await self.namespace_manager.get_database(namespace_id)
-                from ..models.being import Being
-                beings = await Being.load_all()
-                return [being.to_dict() for being in beings]
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=str(e))
+        async def list_beings(namespace_id: str, request: Request, cursor: Optional[str] = None,
+                              limit: int = DEFAULT_PAGE_SIZE, fields: Optional[str] = None):
+            """List beings in namespace (cursor-paginated, ETag-validated)"""
+            return await self._list_resource(namespace_id, "beings", request, cursor, limit, fields)
         
         @app.post("/namespaces/{namespace_id}/beings")
         async def create_being(namespace_id: str, being_data: Dict[str, Any]):
@@ -193,6 +251,42 @@ class LuxDBServer:
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
         
+        @app.post("/namespaces/{namespace_id}/beings:batch")
+        async def create_beings_batch(namespace_id: str, payload: Dict[str, Any]):
+            """Create many beings with one bulk write (atomic per request, idempotent by ulid)"""
+            db = await self._get_namespace_db(namespace_id)
+            items = payload.get("items", [])
+            self._check_batch_size(items)
+            pool = await db.connection_manager.get_pool()
+            
+            from ..models.being import Being
+            from ..repository.soul_repository import BeingRepository, SoulRepository
+            
+            souls = await SoulRepository.get_many_by_hash([item.get("soul_hash") for item in items], pool=pool)
+            beings, errors = [], []
+            for index, item in enumerate(items):
+                soul = souls.get(item.get("soul_hash"))
+                if soul is None:
+                    errors.append({"index": index, "error": f"Soul {item.get('soul_hash')} not found"})
+                    continue
+                data = item.get("data") or {}
+                validation_errors = soul.validate_data(data)
+                if validation_errors:
+                    errors.append({"index": index, "error": ", ".join(validation_errors)})
+                    continue
+                beings.append(Being(ulid=item.get("ulid"), soul_hash=soul.soul_hash, data=data))
+            if errors:
+                raise HTTPException(status_code=422, detail={"errors": errors})
+            
+            result = await BeingRepository.save_many(beings, pool=pool)
+            if not result.get("success"):
+                raise HTTPException(status_code=400, detail=result.get("error"))
+            return {
+                "success": True,
+                "created": result["saved"],
+                "beings": [{"ulid": being.ulid, "soul_hash": being.soul_hash} for being in beings]
+            }
+        
         # Schema export/import
         @app.get("/namespaces/{namespace_id}/schema/export")
         async def export_schema(namespace_id: str):
@@ -214,23 +308,122 @@ class LuxDBServer:
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
         
+        # Streaming export/import (one gzip stream per table)
+        @app.get("/namespaces/{namespace_id}/schema/manifest")
+        async def get_schema_manifest(namespace_id: str):
+            """Tables available for streaming export"""
+            try:
+                db = await self.namespace_manager.get_database(namespace_id)
+                return await self.schema_exporter.describe_namespace(namespace_id, db)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        @app.get("/namespaces/{namespace_id}/schema/tables/{table}")
+        async def export_table(namespace_id: str, table: str, format: str = "ndjson"):
+            """Stream one table as gzip-compressed NDJSON or binary COPY"""
+            try:
+                db = await self.namespace_manager.get_database(namespace_id)
+                stream = await self.schema_exporter.stream_table(db, table, format)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return StreamingResponse(stream, media_type="application/gzip")
+        
+        @app.put("/namespaces/{namespace_id}/schema/imports/{import_id}/tables/{table}")
+        async def import_table(namespace_id: str, import_id: str, table: str, request: Request, format: str = "ndjson"):
+            """Load one gzip table stream into a staging table"""
+            try:
+                db = await self.namespace_manager.get_database(namespace_id)
+                rows = await self.schema_exporter.import_table_stream(db, import_id, table, request.stream(), format)
+                return {"success": True, "table": table, "rows_staged": rows}
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        @app.post("/namespaces/{namespace_id}/schema/imports/{import_id}/commit")
+        async def commit_import(namespace_id: str, import_id: str, payload: Dict[str, Any]):
+            """Merge staged tables into the namespace"""
+            try:
+                db = await self.namespace_manager.get_database(namespace_id)
+                result = await self.schema_exporter.commit_import(namespace_id, db, import_id, payload.get("tables", []))
+                return {"success": True, "result": result}
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        @app.delete("/namespaces/{namespace_id}/schema/imports/{import_id}")
+        async def abort_import(namespace_id: str, import_id: str):
+            """Drop staging tables of an unfinished import"""
+            try:
+                db = await self.namespace_manager.get_database(namespace_id)
+                await self.schema_exporter.abort_import(namespace_id, db, import_id)
+                return {"success": True}
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        # Query statistics
+        @app.get("/stats/queries")
+        async def get_query_stats(limit: int = 20, order_by: str = "total_ms"):
+            """Per-statement query statistics and recent slow queries"""
+            return query_stats.get_stats(limit=limit, order_by=order_by)
+        
+        @app.delete("/stats/queries")
+        async def reset_query_stats():
+            """Reset collected query statistics"""
+            query_stats.reset()
+            return {"success": True}
+        
+        # Memory accounting
+        @app.get("/stats/memory")
+        async def get_memory_stats(refresh: bool = True, format: str = "json"):
+            """Entry counts and approximate sizes of registered containers per subsystem"""
+            if refresh or memory_accountant.latest is None:
+                memory_accountant.snapshot()
+            if format == "prometheus":
+                return PlainTextResponse(memory_accountant.to_prometheus(), media_type="text/plain; version=0.0.4")
+            return memory_accountant.latest
+        
         # Health check
         @app.get("/health")
         async def health_check():
             """Server health check"""
             try:
+                # Only namespaces already open - health checks must not initialize idle ones
                 health_data = {}
-                for namespace_id in await self.namespace_manager.list_namespaces():
-                    db = await self.namespace_manager.get_database(namespace_id)
+                for namespace_id, db in list(self.namespace_manager.namespaces.items()):
                     health_data[namespace_id] = await db.health_check()
                 
                 return {
                     "status": "healthy",
-                    "namespaces": health_data
+                    "namespaces": health_data,
+                    "namespace_pool": self.namespace_manager.get_stats(),
+                    "event_loop": loop_monitor.get_stats(),
+                    "memory": memory_accountant.get_stats()
                 }
             except Exception as e:
                 return {"status": "error", "error": str(e)}
     
+    async def _get_namespace_db(self, namespace_id: str) -> LuxDB:
+        try:
+            return await self.namespace_manager.get_database(namespace_id)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    
+    def _check_batch_size(self, items: List[Any]):
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="items must be a list")
+        if len(items) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=413, detail=f"Batch too large ({len(items)} > {MAX_BATCH_SIZE})")
+    
+    async def _list_resource(self, namespace_id: str, resource: str, request: Request,
+                             cursor: Optional[str], limit: int, fields: Optional[str]):
+        """Serve one page of a namespace table"""
+        db = await self._get_namespace_db(namespace_id)
+        pool = await db.connection_manager.get_pool()
+        async with pool.acquire() as conn:
+            return await list_page(
+                conn, resource, db.get_table_name(resource),
+                if_none_match=request.headers.get("if-none-match"),
+                cursor=cursor, limit=limit, fields=fields
+            )
+    
     async def start(self):
         """Start the server"""
         config = uvicorn.Config(
@@ -0,0 +1,277 @@
+"""
+Pula długo żyjących procesów Node.js dla funkcji JavaScript w Soul.
+
+Każdy worker ładuje module_source danej Soul raz (kluczem jest soul_hash),
+a wywołania przyjmuje jako JSON-RPC rozdzielany znakami nowej linii:
+
+    -> {"id": 1, "method": "load", "soul_hash": "...", "source": "...", "functions": ["add"]}
+    -> {"id": 2, "method": "call", "soul_hash": "...", "function": "add", "args": [1, 2]}
+    <- {"id": 2, "ok": true, "result": 3}
+
+Worker obsługuje jedno wywołanie naraz, więc współbieżność równa się
+rozmiarowi puli. Po max_calls wywołaniach worker jest wymieniany,
+a po przekroczeniu czasu - zabijany (jego stan jest wtedy nieznany).
+"""
+
+import asyncio
+import itertools
+import json
+import os
+from typing import Any, Dict, List, Optional, Set
+
+_WORKER_SCRIPT = r"""
+const vm = require('vm');
+const readline = require('readline');
+const modules = new Map();
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+function load(msg) {
+    const sandbox = {
+        console: { log: (...a) => console.error(...a), error: (...a) => console.error(...a) },
+        setTimeout, clearTimeout, Promise
+    };
+    const builtins = new Set(Object.keys(sandbox));
+    const context = vm.createContext(sandbox);
+    const exports = (msg.functions || [])
+        .filter(name => /^[A-Za-z_$][\w$]*$/.test(name))
+        .map(name => `${name}: typeof ${name} === 'function' ? ${name} : undefined`)
+        .join(', ');
+    const collected = vm.runInContext(`${msg.source}\n;({${exports}})`, context, { filename: `soul_${msg.soul_hash}.js` });
+    const functions = {};
+    for (const [name, fn] of Object.entries(collected)) {
+        if (typeof fn === 'function') functions[name] = fn;
+    }
+    for (const name of Object.keys(sandbox)) {
+        if (!builtins.has(name) && typeof sandbox[name] === 'function' && !(name in functions)) functions[name] = sandbox[name];
+    }
+    modules.set(msg.soul_hash, functions);
+    return Object.keys(functions);
+}
+
+async function call(msg) {
+    const functions = modules.get(msg.soul_hash);
+    if (!functions) throw new Error(`Soul ${msg.soul_hash} not loaded`);
+    const fn = functions[msg.function];
+    if (!fn) throw new Error(`Function ${msg.function} not found`);
+    return await fn(...(msg.args || []));
+}
+
+readline.createInterface({ input: process.stdin }).on('line', async (line) => {
+    let msg;
+    try {
+        msg = JSON.parse(line);
+    } catch (e) {
+        return;
+    }
+    try {
+        const result = msg.method === 'load' ? load(msg) : await call(msg);
+        send({ id: msg.id, ok: true, result: result === undefined ? null : result });
+    } catch (e) {
+        send({ id: msg.id, ok: false, error: String(e && e.stack || e) });
+    }
+});
+"""
+
+
+class JSWorkerError(Exception):
+    """Błąd wykonania po stronie workera JavaScript"""
+
+
+class JSWorker:
+    """Jeden proces Node.js z potokiem JSON-RPC"""
+
+    def __init__(self, node_path: str = "node"):
+        self.node_path = node_path
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.loaded: Set[str] = set()
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.process = await asyncio.create_subprocess_exec(
+            self.node_path, "-e", _WORKER_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=16 * 1024 * 1024
+        )
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def _read_responses(self) -> None:
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    response = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(JSWorkerError("JavaScript worker exited"))
+            self._pending.clear()
+
+    async def request(self, payload: Dict[str, Any], timeout: float = None) -> Any:
+        if not self.alive:
+            raise JSWorkerError("JavaScript worker is not running")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        self.process.stdin.write(json.dumps({"id": request_id, **payload}).encode() + b"\n")
+        await self.process.stdin.drain()
+        try:
+            response = await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+        if not response.get("ok"):
+            raise JSWorkerError(response.get("error", "Unknown JavaScript error"))
+        return response.get("result")
+
+    async def ensure_loaded(self, soul_hash: str, source: str, functions: List[str], timeout: float = None) -> None:
+        if soul_hash not in self.loaded:
+            await self.request({"method": "load", "soul_hash": soul_hash, "source": source, "functions": functions}, timeout)
+            self.loaded.add(soul_hash)
+
+    async def close(self) -> None:
+        if self.alive:
+            self.process.kill()
+            await self.process.wait()
+        if self._reader_task:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+
+class JSWorkerPool:
+    """Pula workerów Node.js - wywołanie pobiera wolnego workera z kolejki"""
+
+    def __init__(self, size: int = None, max_calls_per_worker: int = None,
+                 call_timeout: float = None, node_path: str = None):
+        self.size = size or int(os.getenv("LUXDB_JS_WORKERS", str(min(os.cpu_count() or 2, 4))))
+        self.max_calls_per_worker = max_calls_per_worker or int(os.getenv("LUXDB_JS_MAX_CALLS", "1000"))
+        self.call_timeout = call_timeout or float(os.getenv("LUXDB_JS_CALL_TIMEOUT", "30"))
+        self.node_path = node_path or os.getenv("LUXDB_NODE_PATH", "node")
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: Set[JSWorker] = set()
+        self._start_lock: Optional[asyncio.Lock] = None
+
+        self.stats = {"calls": 0, "errors": 0, "timeouts": 0, "loads": 0, "recycled": 0, "spawned": 0, "cancelled": 0}
+
+    async def _spawn(self) -> JSWorker:
+        worker = JSWorker(self.node_path)
+        await worker.start()
+        self._workers.add(worker)
+        self.stats["spawned"] += 1
+        return worker
+
+    async def _ensure_started(self) -> None:
+        if self._idle is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._idle is None:
+                idle = asyncio.Queue()
+                for _ in range(self.size):
+                    idle.put_nowait(await self._spawn())
+                self._idle = idle
+
+    async def _retire(self, worker: JSWorker) -> None:
+        self._workers.discard(worker)
+        await worker.close()
+
+    async def _release(self, worker: JSWorker, healthy: bool) -> None:
+        """Zwraca workera do kolejki albo wymienia go na nowy"""
+        if not healthy or not worker.alive or worker.calls >= self.max_calls_per_worker:
+            if healthy and worker.alive:
+                self.stats["recycled"] += 1
+            await self._retire(worker)
+            try:
+                worker = await self._spawn()
+            except asyncio.CancelledError:
+                # Miejsce w puli nie może przepaść - pusty worker zostanie uruchomiony przy wywołaniu
+                self._idle.put_nowait(JSWorker(self.node_path))
+                raise
+            except Exception as e:
+                print(f"❌ Nie można uruchomić workera JavaScript: {e}")
+                # Miejsce w puli zostaje odtworzone przy następnym wywołaniu
+                worker = JSWorker(self.node_path)
+        self._idle.put_nowait(worker)
+
+    async def call(self, soul_hash: str, source: str, function_name: str, args: list = None,
+                   functions: List[str] = None, timeout: float = None) -> Any:
+        """Wykonuje funkcję JavaScript z module_source danej Soul"""
+        await self._ensure_started()
+        timeout = timeout or self.call_timeout
+
+        worker = await self._idle.get()
+        healthy = True
+        self.stats["calls"] += 1
+        try:
+            if not worker.alive:
+                await self._retire(worker)
+                worker = await self._spawn()
+
+            if soul_hash not in worker.loaded:
+                await worker.ensure_loaded(soul_hash, source, functions or [function_name], timeout)
+                self.stats["loads"] += 1
+
+            worker.calls += 1
+            return await worker.request(
+                {"method": "call", "soul_hash": soul_hash, "function": function_name, "args": list(args or [])},
+                timeout
+            )
+        except asyncio.CancelledError:
+            # Node nadal wykonuje anulowane wywołanie - worker do wymiany, nie do kolejki
+            healthy = False
+            self.stats["cancelled"] += 1
+            raise
+        except asyncio.TimeoutError:
+            healthy = False
+            self.stats["timeouts"] += 1
+            raise TimeoutError(f"JavaScript function {function_name} exceeded {timeout}s")
+        except JSWorkerError:
+            self.stats["errors"] += 1
+            raise
+        except Exception:
+            healthy = False
+            self.stats["errors"] += 1
+            raise
+        finally:
+            await self._release(worker, healthy)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "max_calls_per_worker": self.max_calls_per_worker,
+            "call_timeout": self.call_timeout,
+            "idle": self._idle.qsize() if self._idle else 0,
+            "live_workers": sum(1 for worker in self._workers if worker.alive),
+            **self.stats
+        }
+
+    async def shutdown(self) -> None:
+        workers, self._workers = list(self._workers), set()
+        for worker in workers:
+            await worker.close()
+        self._idle = None
+
+
+# Globalna instancja
+js_worker_pool = JSWorkerPool()
@@ -2,19 +2,19 @@
 Multi-language execution bridge for Soul modules
 """
 
-import subprocess
+import hashlib
 import json
-import tempfile
-import os
 from typing import Dict, Any, List, Optional, Callable
 import re # Import added for re.search in LanguageDetector
 
 class JavaScriptWrapper:
     """Wrapper dla wykonywania JavaScript w kontekście Soul"""
 
-    def __init__(self, js_source: str, module_name: str):
+    def __init__(self, js_source: str, module_name: str, soul_hash: Optional[str] = None):
         self.js_source = js_source
         self.module_name = module_name
+        # Kluczem załadowanego modułu w workerze jest soul_hash (lub hash źródła)
+        self.soul_hash = soul_hash or hashlib.sha256(js_source.encode()).hexdigest()
         self.functions = self._extract_functions()
 
     def _extract_functions(self) -> List[str]:
@@ -35,63 +35,32 @@ class JavaScriptWrapper:
         """Zwraca listę dostępnych funkcji"""
         return self.functions
 
-    def create_python_callable(self, func_name: str) -> Callable:
-        """Tworzy Python callable dla funkcji JavaScript"""
-        def js_function_wrapper(*args, **kwargs):
-            return self._execute_js_function(func_name, args, kwargs)
+    def create_python_callable(self, func_name: str, timeout: Optional[float] = None) -> Callable:
+        """Tworzy Python callable (async) dla funkcji JavaScript"""
+        async def js_function_wrapper(*args, **kwargs):
+            return await self._execute_js_function(func_name, args, kwargs, timeout)
 
         js_function_wrapper.__name__ = func_name
         js_function_wrapper.__doc__ = f"JavaScript function {func_name} from {self.module_name}"
 
         return js_function_wrapper
 
-    def _execute_js_function(self, func_name: str, args: tuple, kwargs: dict) -> Any:
-        """Wykonuje funkcję JavaScript"""
-        try:
-            # Przygotuj kod JavaScript dla wykonania
-            execution_code = f"""
-{self.js_source}
-
-// Wykonaj funkcję
-const args = {json.dumps(list(args))};
-const kwargs = {json.dumps(kwargs)};
-const result = {func_name}(...args);
-console.log(JSON.stringify({{ success: true, result: result }}));
-"""
-
-            # Zapisz do tymczasowego pliku
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-                f.write(execution_code)
-                temp_file = f.name
-
-            try:
-                # Wykonaj przez Node.js (jeśli dostępny)
-                result = subprocess.run(
-                    ['node', temp_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-
-                if result.returncode == 0:
-                    output = result.stdout.strip()
-                    if output:
-                        response = json.loads(output)
-                        if response.get('success'):
-                            return response.get('result')
-
-                # Fallback - zwróć informację o błędzie
-                return {
-                    "error": "JavaScript execution failed",
-                    "stderr": result.stderr,
-                    "function": func_name
-                }
-
-            finally:
-                # Usuń tymczasowy plik
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
+    async def _execute_js_function(self, func_name: str, args: tuple, kwargs: dict,
+                                   timeout: Optional[float] = None) -> Any:
+        """Wykonuje funkcję JavaScript w puli workerów Node.js"""
+        from .js_worker_pool import JSWorkerError, js_worker_pool
 
+        try:
+            return await js_worker_pool.call(
+                self.soul_hash, self.js_source, func_name, list(args),
+                functions=self.functions, timeout=timeout
+            )
+        except JSWorkerError as e:
+            return {
+                "error": "JavaScript execution failed",
+                "stderr": str(e),
+                "function": func_name
+            }
         except Exception as e:
             return {
                 "error": f"JavaScript bridge error: {str(e)}",
@@ -0,0 +1,93 @@
+"""
+LuxDB Password Hasher
+=====================
+
+PBKDF2 poza pętlą zdarzeń - hashowanie działa na ograniczonej puli
+wątków (hashlib zwalnia GIL) albo procesów, z limitem równoczesnych
+operacji, żeby seria logowań nie zagłodziła websocketów.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+PBKDF2_ITERATIONS = 100000
+
+
+def hash_password_sync(password: str, iterations: int = PBKDF2_ITERATIONS) -> str:
+    """Hashuje hasło z solą (format 'salt:hash')"""
+    salt = secrets.token_hex(32)
+    password_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+    return f"{salt}:{password_hash.hex()}"
+
+
+def verify_password_sync(password: str, password_hash: str, iterations: int = PBKDF2_ITERATIONS) -> bool:
+    """Weryfikuje hasło (porównanie w stałym czasie)"""
+    try:
+        salt, hash_part = password_hash.split(':')
+        password_check = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations)
+        return hmac.compare_digest(password_check.hex(), hash_part)
+    except Exception:
+        return False
+
+
+class PasswordHasher:
+    """Asynchroniczny hasher z ograniczoną pulą wykonawców"""
+
+    def __init__(self, max_workers: int = None, max_concurrency: int = None, use_processes: bool = False):
+        self.max_workers = max_workers or int(os.getenv("LUXDB_PBKDF2_WORKERS", "2"))
+        self.max_concurrency = max_concurrency or int(os.getenv("LUXDB_PBKDF2_CONCURRENCY", str(self.max_workers * 2)))
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.completed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="luxdb-pbkdf2")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+            finally:
+                self.in_flight -= 1
+                self.completed += 1
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run(hash_password_sync, password)
+
+    async def verify_password(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password_sync, password, password_hash)
+
+    def get_stats(self):
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "completed": self.completed
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Globalna instancja
+password_hasher = PasswordHasher(use_processes=os.getenv("LUXDB_PBKDF2_PROCESSES", "0") == "1")
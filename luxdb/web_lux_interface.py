@@ -16,6 +16,7 @@ import json
 import os
 from typing import Optional
 import asyncio
+from collections import deque
 from datetime import datetime
 from luxdb.core.globals import Globals
 from luxdb.core.postgre_db import Postgre_db
@@ -34,26 +35,202 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 from luxdb.core.session_data_manager import SessionManager
 session_manager = SessionManager()
 
+class ClientConnection:
+    """Outbound queue and writer task for a single websocket"""
+
+    def __init__(self, websocket: WebSocket, max_queue: int, policy: str, on_overflow_disconnect):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.policy = policy
+        self.pending: deque = deque()  # (coalesce_key, encoded message)
+        self.wakeup = asyncio.Event()
+        self.drained = asyncio.Event()
+        self.drained.set()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_context: Optional[Dict[str, Any]] = None
+        self._on_overflow_disconnect = on_overflow_disconnect
+        self.writer_task = asyncio.create_task(self._writer())
+
+    def enqueue(self, message: str, coalesce_key: Optional[str] = None) -> bool:
+        """Queue an already encoded message, applying the slow-consumer policy"""
+        if self.closed:
+            return False
+
+        if coalesce_key is not None and self.policy == "coalesce":
+            # Replace the pending message with the same key instead of queueing another one
+            for index, (key, _) in enumerate(self.pending):
+                if key == coalesce_key:
+                    del self.pending[index]
+                    self.coalesced += 1
+                    break
+
+        if len(self.pending) >= self.max_queue:
+            if self.policy == "disconnect":
+                self.closed = True
+                self._on_overflow_disconnect(self)
+                return False
+            if self.policy == "coalesce":
+                self._collapse()
+            if len(self.pending) >= self.max_queue:
+                # drop: discard the oldest message, the client only falls behind
+                self.pending.popleft()
+                self.dropped += 1
+                # The dropped message may have carried a context delta - resend the full context next time
+                self.last_context = None
+
+        self.pending.append((coalesce_key, message))
+        self.drained.clear()
+        self.wakeup.set()
+        return True
+
+    def _collapse(self):
+        """Keep only the newest message for every coalesce key"""
+        seen = set()
+        collapsed = deque()
+        for key, message in reversed(self.pending):
+            if key is not None:
+                if key in seen:
+                    self.coalesced += 1
+                    continue
+                seen.add(key)
+            collapsed.appendleft((key, message))
+        self.pending = collapsed
+
+    async def _writer(self):
+        try:
+            while not self.closed:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+                while self.pending and not self.closed:
+                    _, message = self.pending.popleft()
+                    await self.websocket.send_text(message)
+                    self.sent += 1
+                if not self.pending:
+                    self.drained.set()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"⚠️ WebSocket writer stopped: {e}")
+            self.closed = True
+        finally:
+            self.drained.set()
+
+    async def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until every queued message has been written (or the writer stopped)"""
+        try:
+            await asyncio.wait_for(self.drained.wait(), timeout)
+            return not self.pending
+        except asyncio.TimeoutError:
+            return False
+
+    def context_delta(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Return only the context keys that changed since the last update sent to this client"""
+        previous = self.last_context
+        self.last_context = context
+        if previous is None:
+            return {"full": True, "changed": context, "removed": []}
+        return {
+            "full": False,
+            "changed": {key: value for key, value in context.items() if previous.get(key) != value},
+            "removed": [key for key in previous if key not in context]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.pending),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "closed": self.closed
+        }
+
+    async def close(self):
+        self.closed = True
+        self.wakeup.set()
+        self.writer_task.cancel()
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    """
+    Websocket fan-out with a per-connection send queue.
+
+    slow_consumer_policy decides what happens when a client's queue is full:
+    "drop" discards its oldest message, "disconnect" closes the client,
+    "coalesce" keeps only the newest message per coalesce key.
+    """
+
+    def __init__(self, max_queue: int = 256, slow_consumer_policy: str = "coalesce"):
+        if slow_consumer_policy not in ("drop", "disconnect", "coalesce"):
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.max_queue = max_queue
+        self.slow_consumer_policy = slow_consumer_policy
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.slow_disconnects = 0
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients.keys())
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.clients[websocket] = ClientConnection(
+            websocket, self.max_queue, self.slow_consumer_policy, self._disconnect_slow_consumer
+        )
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        client = self.clients.pop(websocket, None)
+        if client:
+            asyncio.create_task(client.close())
+
+    def _disconnect_slow_consumer(self, client: ClientConnection):
+        self.slow_disconnects += 1
+        print("🐌 Disconnecting slow websocket consumer")
+        self.disconnect(client.websocket)
+        asyncio.create_task(client.websocket.close(code=1013))
+
+    async def send_personal_message(self, message: str, websocket: WebSocket, coalesce_key: str = None):
+        client = self.clients.get(websocket)
+        if client:
+            client.enqueue(message, coalesce_key)
+
+    async def send_json(self, websocket: WebSocket, payload: Dict[str, Any], coalesce_key: str = None):
+        await self.send_personal_message(json.dumps(payload), websocket, coalesce_key)
+
+    async def flush(self, websocket: WebSocket, timeout: float = 1.0) -> bool:
+        """Wait for the client's queue to be written - use before closing the handler"""
+        client = self.clients.get(websocket)
+        return await client.flush(timeout) if client else True
+
+    async def broadcast(self, message, coalesce_key: str = None):
+        """Encode once and enqueue for every client; never waits on a slow socket"""
+        encoded = message if isinstance(message, str) else json.dumps(message)
+        for client in list(self.clients.values()):
+            client.enqueue(encoded, coalesce_key)
+
+    def context_delta(self, websocket: WebSocket, context: Dict[str, Any]) -> Dict[str, Any]:
+        client = self.clients.get(websocket)
+        if client is None:
+            return {"full": True, "changed": context, "removed": []}
+        return client.context_delta(context)
+
+    def get_stats(self) -> Dict[str, Any]:
+        clients = [client.stats() for client in self.clients.values()]
+        return {
+            "connections": len(clients),
+            "policy": self.slow_consumer_policy,
+            "queued": sum(c["queued"] for c in clients),
+            "dropped": sum(c["dropped"] for c in clients),
+            "coalesced": sum(c["coalesced"] for c in clients),
+            "slow_disconnects": self.slow_disconnects
+        }
 
-manager = ConnectionManager()
+manager = ConnectionManager(
+    max_queue=int(os.getenv("LUX_WS_MAX_QUEUE", "256")),
+    slow_consumer_policy=os.getenv("LUX_WS_SLOW_CONSUMER_POLICY", "coalesce")
+)
 
 async def initialize_lux_assistant():
     """Initialize Lux Assistant with system context"""
@@ -83,6 +260,10 @@ async def startup_event():
         # Initialize Session Manager
         await session_manager.initialize()
 
+        # Stale connection / expired session detection (heartbeats are flushed by heartbeat_table)
+        from luxdb.core.auth_session import auth_manager
+        auth_manager.start_maintenance()
+
         # Initialize Lux Assistant with unified system
         await initialize_lux_assistant()
 
@@ -164,32 +345,36 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # Send welcome with context
             context = await user_session.build_conversation_context()
-            await websocket.send_text(json.dumps({
+            manager.context_delta(websocket, context)  # full snapshot becomes the delta baseline
+            await manager.send_json(websocket, {
                 "type": "system",
                 "message": f"🌟 Witaj! Jestem Lux - Twój kontekstowy asystent!\n\nTwoja sesja: {user_session.session.session_id[:8]}...\nAktywne projekty: {', '.join(user_session.session.project_tags) if user_session.session.project_tags else 'Brak'}",
                 "session_context": context,
                 "timestamp": "now"
-            }))
+            })
         elif init_data.get('type') == 'ping':
-            await websocket.send_text(json.dumps({
+            await manager.send_json(websocket, {
                 'type': 'pong',
                 'timestamp': init_data.get('timestamp'),
                 'server_time': datetime.now().isoformat()
-            }))
+            })
+            await manager.flush(websocket)
             return # Pong handled, don't proceed further in this loop
         elif init_data.get('type') == 'connection':
             print(f"🔗 Client connected: {init_data.get('fingerprint', 'unknown')}")
-            await websocket.send_text(json.dumps({
+            await manager.send_json(websocket, {
                 'type': 'connection_ack',
                 'status': 'connected',
                 'server_time': datetime.now().isoformat()
-            }))
+            })
+            await manager.flush(websocket)
             return # Connection ack handled, don't proceed further in this loop
         else:
-            await websocket.send_text(json.dumps({
+            await manager.send_json(websocket, {
                 "type": "error",
                 "message": "Proszę zainicjalizować sesję"
-            }))
+            })
+            await manager.flush(websocket)
             return
 
         # Main conversation loop
@@ -198,21 +383,21 @@ async def websocket_endpoint(websocket: WebSocket):
             message_data = json.loads(data)
 
             if message_data.get('type') == 'ping':
-                await websocket.send_text(json.dumps({
+                await manager.send_json(websocket, {
                     'type': 'pong',
                     'timestamp': message_data.get('timestamp'),
                     'server_time': datetime.now().isoformat()
-                }))
+                })
                 continue
 
             # Handle connection info (if client reconnects or sends it again)
             if message_data.get('type') == 'connection':
                 print(f"🔗 Client connected: {message_data.get('fingerprint', 'unknown')}")
-                await websocket.send_text(json.dumps({
+                await manager.send_json(websocket, {
                     'type': 'connection_ack',
                     'status': 'connected',
                     'server_time': datetime.now().isoformat()
-                }))
+                })
                 continue
 
 
@@ -220,54 +405,57 @@ async def websocket_endpoint(websocket: WebSocket):
                 user_message = message_data["message"]
 
                 # Send thinking indicator with context
-                await websocket.send_text(json.dumps({
+                await manager.send_json(websocket, {
                     "type": "thinking",
                     "message": f"🤔 Analizuję w kontekście {len(user_session.session.active_events)} aktywnych eventów...",
-                }))
+                })
 
                 # Process with Session Assistant
                 response = await user_session.process_message(user_message)
 
-                # Send contextual response
+                # Send contextual response - only the part of the context that changed
                 context = await user_session.build_conversation_context()
-                await websocket.send_text(json.dumps({
+                await manager.send_json(websocket, {
                     "type": "lux_response",
                     "message": response,
-                    "session_context": context,
+                    "session_context_delta": manager.context_delta(websocket, context),
                     "active_projects": list(user_session.session.project_tags),
                     "recent_activity": user_session.get_recent_actions_summary(),
                     "timestamp": "now"
-                }))
+                })
 
             elif message_data["type"] == "user_action":
                 # Track user action as event
                 action_data = message_data.get("action", {})
                 await user_session.track_event_from_frontend(action_data)
 
-                await websocket.send_text(json.dumps({
+                await manager.send_json(websocket, {
                     "type": "action_tracked",
                     "message": f"Akcja {action_data.get('type', 'unknown')} została zarejestrowana"
-                }))
+                })
 
     except WebSocketDisconnect:
         print("🔌 WebSocket disconnected normally")
-        manager.disconnect(websocket)
         # Session will be cleaned up automatically by TTL
 
     except Exception as e:
         print(f"❌ WebSocket error: {e}")
-        manager.disconnect(websocket)
-        # Consider sending an error message to the client before closing if possible
+        # Send the error through the queue so it is not interleaved with queued messages
         try:
-            await websocket.send_text(json.dumps({
+            await manager.send_json(websocket, {
                 'type': 'error',
                 'message': f'Server error: {str(e)}',
                 'timestamp': datetime.now().isoformat()
-            }))
+            })
+            await manager.flush(websocket)
             await websocket.close()
         except:
             pass # Ignore errors during closing
 
+    finally:
+        # Always release the ClientConnection and its writer task
+        manager.disconnect(websocket)
+
 # Helper function to process websocket messages (moved from main loop for clarity)
 async def process_websocket_message(message_data: Dict[str, Any]):
     """Processes a message received from the WebSocket client."""
@@ -346,6 +534,30 @@ async def logout(session_data: dict = Depends(verify_token)):
             "message": f"Logout error: {str(e)}"
         }, status_code=500)
 
+@app.post("/api/connection/heartbeat")
+async def connection_heartbeat(request: HeartbeatRequest, session_data: dict = Depends(verify_token)):
+    """Rejestruje heartbeat połączenia sesji (zapis do bazy jest zbiorczy)"""
+    from luxdb.core.auth_session import auth_manager
+    from luxdb.core.heartbeat_table import heartbeat_table
+
+    if not auth_manager.owns_connection(session_data, request.connection_ulid):
+        raise HTTPException(status_code=403, detail="Connection does not belong to this session")
+
+    heartbeat_table.beat(request.connection_ulid)
+    return {"success": True}
+
+@app.get("/api/connection/heartbeat/stats")
+async def connection_heartbeat_stats():
+    """Statystyki koaleskowanych heartbeatów"""
+    from luxdb.core.heartbeat_table import heartbeat_table
+
+    return heartbeat_table.get_stats()
+
+@app.get("/api/ws/stats")
+async def get_websocket_stats():
+    """Websocket send queue statistics"""
+    return manager.get_stats()
+
 @app.get("/api/tools")
 async def get_available_tools():
     """Get list of available tools/beings"""
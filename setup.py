@@ -123,6 +123,11 @@ setup(
             "fastapi>=0.104.0",
             "uvicorn>=0.24.0",
             "python-multipart>=0.0.6",
+            "orjson>=3.9.0",
+            "brotli-asgi>=1.4.0",
+        ],
+        "parquet": [
+            "pyarrow>=14.0.0",
         ]
     },
     entry_points={
@@ -76,6 +76,10 @@ class SessionContext {
         if (data.session_context) {
             this.updateSessionContext(data.session_context);
         }
+
+        if (data.session_context_delta) {
+            this.applySessionContextDelta(data.session_context_delta);
+        }
         
         if (data.active_projects) {
             this.activeProjects = new Set(data.active_projects);
@@ -90,7 +94,16 @@ class SessionContext {
         this.hideThinking();
     }
 
+    applySessionContextDelta(delta) {
+        // Serwer wysyła tylko zmienione klucze kontekstu
+        const base = delta.full ? {} : { ...(this.sessionContext || {}) };
+        Object.assign(base, delta.changed || {});
+        (delta.removed || []).forEach(key => delete base[key]);
+        this.updateSessionContext(base);
+    }
+
     updateSessionContext(context) {
+        this.sessionContext = context;
         // Aktualizuj wyświetlanie kontekstu
         const contextElement = document.getElementById('session-context');
         if (contextElement) {
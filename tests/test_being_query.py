@@ -0,0 +1,116 @@
+"""
+Being Query Tests
+=================
+
+Kompilacja BeingQuery do SQL (where, order_by, agregaty) - bez bazy danych.
+"""
+
+import json
+
+import pytest
+
+from luxdb.repository.being_aggregates import Avg, Count, Percentile, Sum
+from luxdb.repository.being_query import BeingQuery
+
+
+class FakeSoul:
+    soul_hash = "soul123"
+    genotype = {"attributes": {
+        "level": {"py_type": "int"},
+        "name": {"py_type": "str"},
+        "tags": {"py_type": "List[str]"},
+        "born": {"py_type": "datetime"},
+    }}
+
+
+def query():
+    return BeingQuery(FakeSoul())
+
+
+def test_equality_uses_containment():
+    sql, params = query().where(name="Lux").compile()
+    assert sql == "SELECT ulid, soul_hash, data, created_at, updated_at, ttl_expires FROM beings " \
+                  "WHERE soul_hash = $1 AND data @> $2::jsonb"
+    assert params[0] == "soul123"
+    assert json.loads(params[1]) == {"name": "Lux"}
+
+
+def test_comparison_is_typed_and_guarded():
+    sql, params = query().where(level__gte=5).compile()
+    assert "data ? $2 AND (data #>> $3::text[])::numeric >= $4::numeric" in sql
+    assert params[1:] == ["level", ["level"], 5]
+
+
+def test_nested_comparison_infers_cast_from_value():
+    sql, params = BeingQuery("soul123").where(stats__hp__gt=1.5).compile(select="ulid")
+    assert "(data #>> $3::text[])::numeric > $4::numeric" in sql
+    assert params[2:] == [["stats", "hp"], 1.5]
+
+
+def test_in_lookup_compiles_to_jsonpath():
+    sql, params = query().where(level__in=[1, 2]).compile()
+    assert sql.endswith("data @? $2::jsonpath")
+    assert params[1] == '$."level" ? (@ == 1 || @ == 2)'
+    assert query().where(level__in=[]).compile()[0].endswith("FALSE")
+
+
+def test_contains_on_list_and_text():
+    sql, params = query().where(tags__contains="fire").compile()
+    assert sql.endswith("data @> $2::jsonb")
+    assert json.loads(params[1]) == {"tags": ["fire"]}
+
+    sql, params = query().where(name__contains="ux").compile()
+    assert sql.endswith("strpos((data #>> $2::text[]), $3) > 0")
+    assert params[1:] == [["name"], "ux"]
+
+
+def test_exists_and_none():
+    assert query().where(name__exists=True).compile()[0].endswith("data ? $2")
+    assert query().where(name=None).compile()[0].endswith("NOT (data ? $2)")
+
+
+def test_columns_compare_directly():
+    sql, params = query().where(ulid__in=["a", "b"], created_at__gte="2026-01-01T00:00:00").compile()
+    assert "ulid = ANY($2)" in sql and "created_at >= $3" in sql
+    assert params[1] == ["a", "b"]
+
+
+def test_order_limit_offset():
+    sql, params = query().order_by("-level", "created_at").limit(10).offset(20).compile()
+    assert sql.endswith(
+        "ORDER BY (data #>> $2::text[])::numeric DESC NULLS LAST, created_at ASC, ulid LIMIT $3 OFFSET $4"
+    )
+    assert params[1:] == [["level"], 10, 20]
+
+
+def test_unknown_attribute_is_rejected():
+    with pytest.raises(ValueError):
+        query().where(missing=1).compile()
+
+
+def test_compile_aggregate_groups_and_filters():
+    sql, params = query().group_by("name").order_by("-beings").compile_aggregate({
+        "beings": Count(),
+        "active": Count(filter={"active": True}),
+        "total_level": Sum("level"),
+    })
+    assert sql.startswith('SELECT (data #>> $1::text[]) AS "name", COUNT(*) AS "beings", ')
+    assert 'COUNT(*) FILTER (WHERE data @> $2::jsonb) AS "active"' in sql
+    assert 'SUM((data #>> $3::text[])::numeric) AS "total_level"' in sql
+    assert sql.endswith('WHERE soul_hash = $4 GROUP BY 1 ORDER BY "beings" DESC NULLS LAST, "name"')
+    assert json.loads(params[1]) == {"active": True}
+
+
+def test_compile_aggregate_percentile_and_validation():
+    sql, params = query().compile_aggregate({"p95": Percentile("level", 0.95), "avg": Avg("level")})
+    assert 'percentile_cont($1::float8) WITHIN GROUP (ORDER BY (data #>> $2::text[])::numeric) AS "p95"' in sql
+    assert params[0] == 0.95
+
+    with pytest.raises(ValueError):
+        query().compile_aggregate({})
+    with pytest.raises(ValueError):
+        query().compile_aggregate({"bad name": Count()})
+    with pytest.raises(ValueError):
+        query().group_by("name").order_by("level").compile_aggregate({"beings": Count()})
+    with pytest.raises(ValueError):
+        Percentile("level", 1.5)
@@ -0,0 +1,60 @@
+"""
+Bulk Transfer Tests
+===================
+
+Podział przestrzeni kluczy i zapytania zakresowe eksportu - bez bazy danych.
+"""
+
+from luxdb.cli_bulk_transfer import range_query, split_keyspace, ulid_floor, ulid_timestamp
+
+LOW = "01J0000000" + "ABCDEFGHJKMNPQRS"
+HIGH = "01K0000000" + "ZZZZZZZZZZZZZZZZ"
+
+
+def test_ulid_floor_roundtrips_timestamp():
+    ms = ulid_timestamp(LOW)
+    floor = ulid_floor(ms)
+    assert len(floor) == 26
+    assert ulid_timestamp(floor) == ms
+    assert floor == "01J0000000" + "0" * 16
+    assert floor <= LOW < ulid_floor(ms + 1)
+
+
+def test_split_ulid_keyspace_is_ordered_and_open_ended():
+    ranges = split_keyspace("ulid", 4, LOW, HIGH)
+    assert len(ranges) == 4
+    assert ranges[0][0] is None and ranges[-1][1] is None
+    for (_, hi), (lo, _) in zip(ranges, ranges[1:]):
+        assert hi == lo
+    cuts = [hi for _, hi in ranges[:-1]]
+    assert cuts == sorted(cuts)
+    assert all(LOW < cut <= HIGH for cut in cuts)
+
+
+def test_split_ulid_keyspace_without_bounds_is_one_range():
+    assert split_keyspace("ulid", 4) == [(None, None)]
+    assert split_keyspace("ulid", 4, "not-a-ulid!", HIGH) == [(None, None)]
+    assert split_keyspace("ulid", 1, LOW, HIGH) == [(None, None)]
+
+
+def test_split_narrow_ulid_keyspace_drops_duplicate_cuts():
+    ranges = split_keyspace("ulid", 8, LOW, LOW)
+    assert ranges == [(None, None)]
+
+
+def test_split_hex_and_uuid_keyspaces():
+    assert split_keyspace("hex", 4) == [(None, "4000"), ("4000", "8000"), ("8000", "c000"), ("c000", None)]
+    ranges = split_keyspace("uuid", 2)
+    assert ranges == [(None, "80000000-0000-0000-0000-000000000000"), ("80000000-0000-0000-0000-000000000000", None)]
+
+
+def test_range_query_bounds_and_resume():
+    info = {"name": "beings", "columns": [{"name": "ulid"}, {"name": "data"}]}
+    sql, params = range_query(info, {"lo": "A", "hi": "B"}, "A1")
+    assert sql == 'SELECT "ulid", "data" FROM beings WHERE "ulid" >= $1 AND "ulid" < $2 AND "ulid" > $3 ORDER BY "ulid"'
+    assert params == ["A", "B", "A1"]
+
+    info = {"name": "relationships", "columns": [{"name": "id"}]}
+    sql, params = range_query(info, {"lo": None, "hi": "8"}, None)
+    assert sql == 'SELECT "id" FROM relationships WHERE "id" < $1::uuid ORDER BY "id"'
+    assert params == ["8"]
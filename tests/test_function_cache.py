@@ -0,0 +1,77 @@
+"""
+Function Cache Tests
+====================
+
+Klucze, konfiguracja i warstwy (pamięć / SQLite) cache funkcji Soul - bez bazy danych.
+"""
+
+import asyncio
+import time
+
+from luxdb.core.function_cache import DiskCacheStore, FunctionCache, make_cache_key, resolve_cache_config
+
+
+def test_cache_key_ignores_being_context_and_kwarg_order():
+    key = make_cache_key("add", (1, 2), {"a": 1, "b": 2, "being_context": {"ulid": "x"}})
+    assert key == make_cache_key("add", (1, 2), {"b": 2, "a": 1, "being_context": {"ulid": "y"}})
+    assert key != make_cache_key("add", (2, 1), {"a": 1, "b": 2})
+    assert key != make_cache_key("sub", (1, 2), {"a": 1, "b": 2})
+
+
+def test_resolve_cache_config():
+    genotype = {"functions": {
+        "add": {"pure": True},
+        "report": {"cache": {"ttl": 30, "max_entries": 10, "disk": True}},
+        "impure": {"pure": True, "cache": False},
+        "plain": {}
+    }}
+    assert resolve_cache_config(genotype, "add") == {"ttl": None, "max_entries": 1024, "disk": False}
+    assert resolve_cache_config(genotype, "report") == {"ttl": 30, "max_entries": 10, "disk": True}
+    assert resolve_cache_config(genotype, "impure") is None
+    assert resolve_cache_config(genotype, "plain") is None
+    assert resolve_cache_config(genotype, "missing") is None
+
+
+def test_cached_results_are_copies(tmp_path):
+    cache = FunctionCache(DiskCacheStore(str(tmp_path / "cache.sqlite")))
+    config = {"ttl": None, "max_entries": 10, "disk": False}
+    result = {"items": [1, 2]}
+
+    async def scenario():
+        await cache.put("soul", "f", "k", result, config)
+        result["items"].append(3)
+        _, first = await cache.get("soul", "f", "k", config)
+        first["items"].append(4)
+        return await cache.get("soul", "f", "k", config)
+
+    hit, value = asyncio.run(scenario())
+    assert hit and value == {"items": [1, 2]}
+
+
+def test_lru_evicts_per_function(tmp_path):
+    cache = FunctionCache(DiskCacheStore(str(tmp_path / "cache.sqlite")))
+    config = {"ttl": None, "max_entries": 2, "disk": False}
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await cache.put("soul", "f", key, key, config)
+        return [(await cache.get("soul", "f", key, config))[0] for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [False, True, True]
+    assert cache.get_stats("soul")["f"]["evictions"] == 1
+
+
+def test_disk_hit_keeps_expiry(tmp_path):
+    store = DiskCacheStore(str(tmp_path / "cache.sqlite"))
+    config = {"ttl": 100, "max_entries": 10, "disk": True}
+
+    async def scenario():
+        await FunctionCache(store).put("soul", "f", "k", [1], config)
+        fresh = FunctionCache(store)
+        return fresh, await fresh.get("soul", "f", "k", config)
+
+    fresh, (hit, value) = asyncio.run(scenario())
+    assert hit and value == [1]
+    assert fresh.get_stats("soul")["f"]["disk_hits"] == 1
+    (_, expires_at), = fresh._entries["soul"]["f"].values()
+    assert 0 < expires_at - time.time() <= 100
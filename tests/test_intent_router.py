@@ -0,0 +1,50 @@
+"""
+Intent Router Tests
+===================
+
+Routing intencji do funkcji Soul - bez bazy danych.
+"""
+
+from luxdb.core.intent_router import IntentRouter, build_function_documents, content_tokens
+
+
+def make_router(definitions=None):
+    names = ["delete_all_records", "get_status", "add"]
+    genotype = {"functions": definitions or {}}
+    return IntentRouter(build_function_documents(names, genotype))
+
+
+def test_exact_name_routes():
+    router = make_router()
+    assert router.route("add") == ("add", 1.0)
+    assert router.route("get_status") == ("get_status", 1.0)
+    assert router.route("get status") == ("get_status", 1.0)
+
+
+def test_command_word_routes():
+    router = make_router()
+    assert router.route("run delete_all_records") == ("delete_all_records", 1.0)
+    assert router.route("please execute add") == ("add", 1.0)
+
+
+def test_stop_words_do_not_route():
+    router = make_router()
+    intent = "what is the weather of the day"
+    assert router.route(intent) is None
+    assert router.suggest(intent) == []
+
+
+def test_fuzzy_match_is_only_suggested():
+    router = make_router({"get_status": {"description": "report current system status"}})
+    assert router.route("show me the system status report") is None
+    suggestions = router.suggest("show me the system status report")
+    assert suggestions and suggestions[0][0] == "get_status"
+
+
+def test_candidates_restrict_exact_match():
+    router = make_router()
+    assert router.route("add", candidates=["get_status"]) is None
+
+
+def test_content_tokens_drop_stop_words():
+    assert content_tokens("Run the calculateTotal of all_items") == ["calculate", "total", "items"]
@@ -0,0 +1,84 @@
+"""
+LLM Gateway Tests
+=================
+
+Cache, klucze zapytań i limiter bramy LLM - bez sieci i bazy danych.
+"""
+
+import asyncio
+import time
+
+from luxdb.core.function_cache import DiskCacheStore
+from luxdb.core.llm_gateway import LLMBackend, LLMGateway, RateLimiter, make_request_key
+
+
+class RecordingBackend(LLMBackend):
+    name = "recording"
+
+    def __init__(self, content="ok"):
+        self.content = content
+        self.calls = 0
+
+    async def complete(self, model, messages, params):
+        self.calls += 1
+        return {"content": self.content, "usage": {}}
+
+
+def make_gateway(tmp_path):
+    return LLMGateway(disk_store=DiskCacheStore(str(tmp_path / "llm.sqlite")))
+
+
+def test_request_key_is_order_independent():
+    messages = [{"role": "user", "content": "hi"}]
+    assert make_request_key("m", messages, {"a": 1, "b": 2}) == make_request_key("m", messages, {"b": 2, "a": 1})
+    assert make_request_key("m", messages, {"a": 1}) != make_request_key("m", messages, {"a": 2})
+    assert make_request_key("m1", messages, {}) != make_request_key("m2", messages, {})
+
+
+def test_fake_backend_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("LUXDB_LLM_BACKEND", raising=False)
+    assert make_gateway(tmp_path).default_backend == "openai"
+    monkeypatch.setenv("LUXDB_LLM_BACKEND", "fake")
+    assert make_gateway(tmp_path).default_backend == "fake"
+
+
+def test_disk_hit_keeps_expiry(tmp_path):
+    gateway = make_gateway(tmp_path)
+    backend = RecordingBackend()
+    messages = [{"role": "user", "content": "q"}]
+
+    async def scenario():
+        await gateway.chat(messages, backend=backend, ttl=100)
+        gateway.clear_cache()
+        return await gateway.chat(messages, backend=backend, ttl=100)
+
+    response = asyncio.run(scenario())
+    assert response.cached and backend.calls == 1
+    (_, expires_at), = gateway._entries.values()
+    assert expires_at is not None and 0 < expires_at - time.time() <= 100
+
+
+def test_tool_call_responses_are_not_cached(tmp_path):
+    gateway = make_gateway(tmp_path)
+    backend = RecordingBackend(content=None)
+    messages = [{"role": "user", "content": "call a tool"}]
+
+    async def scenario():
+        await gateway.chat(messages, backend=backend)
+        await gateway.chat(messages, backend=backend)
+
+    asyncio.run(scenario())
+    assert backend.calls == 2
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=20, burst=1)
+
+    async def scenario():
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.09
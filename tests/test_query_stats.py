@@ -0,0 +1,64 @@
+"""
+Query Stats Tests
+=================
+
+Normalizacja SQL i kolektor statystyk zapytań - bez bazy danych.
+"""
+
+from luxdb.core.query_stats import QueryStatsCollector, _rows_from_status, normalize_sql
+
+
+def test_normalize_replaces_literals_and_placeholders():
+    assert normalize_sql("SELECT * FROM beings WHERE ulid = $1 AND data->>'alias' = 'it''s'") == \
+        "SELECT * FROM beings WHERE ulid = ? AND data->>? = ?"
+    assert normalize_sql("SELECT * FROM t LIMIT 10 OFFSET 2.5") == "SELECT * FROM t LIMIT ? OFFSET ?"
+
+
+def test_normalize_collapses_in_lists_and_whitespace():
+    assert normalize_sql("SELECT 1 FROM t WHERE id IN (1, 2,\n 3)") == "SELECT ? FROM t WHERE id IN (?)"
+    assert normalize_sql("  SELECT\n\t*   FROM  t  ") == "SELECT * FROM t"
+
+
+def test_normalize_keeps_identifiers_with_digits():
+    assert normalize_sql("SELECT col1 FROM table2 WHERE x = 3") == "SELECT col1 FROM table2 WHERE x = ?"
+
+
+def test_collector_groups_by_normalized_query():
+    collector = QueryStatsCollector(slow_query_threshold_ms=1000)
+    collector.record("SELECT * FROM beings WHERE ulid = $1", 2.0, rows=1)
+    collector.record("SELECT * FROM beings WHERE ulid = $2", 4.0, rows=1)
+    collector.record("DELETE FROM beings", 1.0, error=True)
+
+    stats = collector.get_stats()
+    assert stats["statements"] == 2
+    assert stats["total_calls"] == 3
+    top = stats["queries"][0]
+    assert top["query"] == "SELECT * FROM beings WHERE ulid = ?"
+    assert top["calls"] == 2 and top["rows"] == 2 and top["max_ms"] == 4.0
+    assert collector.stats["DELETE FROM beings"].errors == 1
+
+
+def test_collector_logs_slow_queries_and_caps_statements():
+    collector = QueryStatsCollector(slow_query_threshold_ms=10, max_statements=1)
+    collector.record("SELECT a FROM t", 50.0)
+    collector.record("SELECT b FROM t", 1.0)
+
+    assert set(collector.stats) == {"SELECT a FROM t", "<other>"}
+    (slow,) = collector.slow_queries
+    assert slow["query"] == "SELECT a FROM t" and slow["call_site"]
+
+    collector.reset()
+    assert not collector.stats and not collector.slow_queries
+
+
+def test_disabled_collector_records_nothing():
+    collector = QueryStatsCollector(enabled=False)
+    collector.record("SELECT 1", 1.0)
+    assert collector.stats == {}
+
+
+def test_rows_from_status():
+    assert _rows_from_status("INSERT 0 5") == 5
+    assert _rows_from_status("UPDATE 3") == 3
+    assert _rows_from_status("CREATE TABLE") == 0
+    assert _rows_from_status(None) == 0
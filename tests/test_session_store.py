@@ -0,0 +1,80 @@
+"""
+Session Store Tests
+===================
+
+ExpiryIndex, BoundedCache i approximate_size - bez bazy danych.
+"""
+
+from luxdb.core.session_store import BoundedCache, ExpiryIndex, approximate_size
+
+
+def test_expiry_index_pops_due_in_deadline_order():
+    index = ExpiryIndex()
+    index.schedule("b", 20)
+    index.schedule("a", 10)
+    index.schedule("c", 30)
+
+    assert index.pop_due(25) == ["a", "b"]
+    assert len(index) == 1
+    assert "c" in index
+    assert index.next_deadline() == 30
+
+
+def test_expiry_index_reschedule_skips_stale_entries():
+    index = ExpiryIndex()
+    index.schedule("a", 10)
+    index.schedule("a", 50)
+    index.schedule("b", 20)
+
+    assert index.deadline("a") == 50
+    assert index.pop_due(30) == ["b"]
+    assert index.pop_oldest() == "a"
+    assert index.pop_oldest() is None
+
+
+def test_expiry_index_remove_and_compaction():
+    index = ExpiryIndex()
+    for deadline in range(500):
+        index.schedule("hot", deadline)
+    index.schedule("cold", 1000)
+    index.remove("hot")
+
+    assert len(index._heap) <= 2 * len(index) + 64 + 1
+    assert index.next_deadline() == 1000
+    assert index.pop_due(2000) == ["cold"]
+
+
+def test_bounded_cache_evicts_least_recently_used():
+    cache = BoundedCache(max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # "a" staje się najświeższy
+    cache["c"] = 3
+
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+
+def test_approximate_size_grows_with_content():
+    small = approximate_size({"k": "v"})
+    large = approximate_size({"k": "v" * 10_000})
+    assert large > small + 9_000
+
+
+def test_approximate_size_extrapolates_sampled_collections():
+    items = [f"{i:0100d}" for i in range(1000)]
+    size = approximate_size(items, max_items=10)
+    exact = approximate_size(items, max_items=1000)
+    assert abs(size - exact) < exact * 0.05
+
+
+def test_approximate_size_handles_cycles_and_objects():
+    class Node:
+        def __init__(self):
+            self.payload = "p" * 100
+            self.children = []
+
+    node = Node()
+    node.children.append(node)
+    assert approximate_size(node) > 100